@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark: local HTML extraction (LocalContentService) vs. the Jina reader on recorded pages
+
+Record fixtures once (network access needed): every result URL of the search
+fixture is fetched directly and through the Jina reader, and both responses are
+saved with their latencies. The benchmark then replays them offline: it times
+extraction in one process and in a process pool, compares the recorded network
+latencies, and checks that the local markdown carries the same text as Jina's
+(word recall and precision against the Jina output).
+
+Usage:
+    python benchmarks/bench_content_fetch.py --record [--fixture PATH] [--urls URL ...]
+    python benchmarks/bench_content_fetch.py [--processes N] [--repeat N]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Set
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from services.content_service import LocalContentService
+from utils.html_extractor import extract_page
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURE = os.path.join(BENCH_DIR, '..', '..', 'app', 'example_google_custom_search_response.json')
+DEFAULT_PAGES = os.path.join(BENCH_DIR, 'fixtures', 'pages')
+JINA_URL = 'https://r.jina.ai'
+WORD = re.compile(r'[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]')
+LINK_TARGET = re.compile(r'\]\([^)]*\)')
+
+def record(pages_dir: str, urls: List[str]) -> int:
+    """Fetch every URL directly and through Jina, saving bodies and latencies"""
+    os.makedirs(pages_dir, exist_ok=True)
+    session = requests.Session()
+    session.headers['User-Agent'] = LocalContentService.USER_AGENT
+    index = []
+    for number, url in enumerate(urls):
+        entry: Dict[str, Any] = {'name': f"page{number:03d}", 'url': url}
+        try:
+            start = time.perf_counter()
+            response = session.get(url, timeout=30)
+            entry.update(direct_ms=round((time.perf_counter() - start) * 1000), direct_status=response.status_code,
+                         content_type=response.headers.get('Content-Type', ''),
+                         encoding=response.encoding if 'charset' in response.headers.get('Content-Type', '') else None)
+            with open(os.path.join(pages_dir, f"{entry['name']}.html"), 'wb') as f:
+                f.write(response.content)
+            
+            start = time.perf_counter()
+            response = requests.get(f"{JINA_URL}/{url}", timeout=60)
+            entry.update(jina_ms=round((time.perf_counter() - start) * 1000), jina_status=response.status_code)
+            with open(os.path.join(pages_dir, f"{entry['name']}.jina.md"), 'w', encoding='utf-8') as f:
+                f.write(response.text)
+        except requests.exceptions.RequestException as e:
+            print(f"  ❌ {url}: {e}")
+            continue
+        print(f"  {entry['name']}: direct {entry['direct_ms']} ms, jina {entry['jina_ms']} ms - {url}")
+        index.append(entry)
+    
+    with open(os.path.join(pages_dir, 'index.json'), 'w') as f:
+        json.dump(index, f, indent=2)
+    print(f"Recorded {len(index)} of {len(urls)} pages to {pages_dir}")
+    return 0
+
+def words(text: str) -> Set[str]:
+    """Content words of reader-style text, without its header and link targets"""
+    _, _, content = text.partition('Markdown Content:')
+    return set(WORD.findall(LINK_TARGET.sub(']', content or text).lower()))
+
+def _extract(args):
+    body, url, encoding = args
+    return extract_page(body, url, encoding)
+
+def load_pages(pages_dir: str) -> List[Dict[str, Any]]:
+    """Recorded pages with both a direct HTML response and a Jina response"""
+    with open(os.path.join(pages_dir, 'index.json'), 'r') as f:
+        index = json.load(f)
+    pages = []
+    for entry in index:
+        if entry.get('direct_status') != 200 or entry.get('jina_status') != 200:
+            continue
+        if 'html' not in (entry.get('content_type') or '').lower():
+            continue
+        with open(os.path.join(pages_dir, f"{entry['name']}.html"), 'rb') as f:
+            entry['body'] = f.read()
+        with open(os.path.join(pages_dir, f"{entry['name']}.jina.md"), 'r', encoding='utf-8') as f:
+            entry['jina'] = f.read()
+        pages.append(entry)
+    return pages
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--record', action='store_true', help='fetch and save fixtures instead of benchmarking')
+    parser.add_argument('--fixture', default=DEFAULT_FIXTURE, help='search response whose result URLs to record')
+    parser.add_argument('--urls', nargs='*', help='URLs to record instead of the search fixture results')
+    parser.add_argument('--pages', default=DEFAULT_PAGES, help='directory of recorded pages')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--repeat', type=int, default=20, help='copies of the pages per pool batch')
+    parser.add_argument('--min-chars', type=int, default=300, help='shortest content not sent to the fallback')
+    args = parser.parse_args()
+    
+    if args.record:
+        urls = args.urls
+        if not urls:
+            with open(args.fixture, 'r') as f:
+                urls = [item['link'] for item in json.load(f).get('items', []) if item.get('link')]
+        return record(args.pages, urls)
+    
+    if not os.path.exists(os.path.join(args.pages, 'index.json')):
+        print(f"❌ No recorded pages in {args.pages}; run with --record first")
+        return 1
+    pages = load_pages(args.pages)
+    if not pages:
+        print("❌ No page was recorded successfully by both backends")
+        return 1
+    
+    # Output equivalence: how much of Jina's text the local extraction keeps, and how much it adds
+    recalls, precisions, fallbacks, extract_ms = [], [], 0, []
+    for page in pages:
+        start = time.perf_counter()
+        local = extract_page(page['body'], page['url'], page.get('encoding'))
+        extract_ms.append((time.perf_counter() - start) * 1000)
+        if len(local.markdown) < args.min_chars:
+            fallbacks += 1
+            continue
+        local_words, jina_words = words(local.as_reader_text(page['url'])), words(page['jina'])
+        if jina_words and local_words:
+            recall = len(local_words & jina_words) / len(jina_words)
+            precision = len(local_words & jina_words) / len(local_words)
+            recalls.append(recall)
+            precisions.append(precision)
+            if recall < 0.6:
+                print(f"  ⚠️  {page['name']}: recall {recall:.2f} - {page['url']}")
+    
+    # Extraction throughput, in one process and across a pool
+    batch = [(page['body'], page['url'], page.get('encoding')) for page in pages] * args.repeat
+    start = time.perf_counter()
+    for item in batch:
+        _extract(item)
+    serial_time = time.perf_counter() - start
+    with ProcessPoolExecutor(args.processes) as pool:
+        list(pool.map(_extract, batch[:args.processes]))  # Warm up the workers
+        start = time.perf_counter()
+        list(pool.map(_extract, batch, chunksize=4))
+        pool_time = time.perf_counter() - start
+    
+    direct_ms = statistics.median(page['direct_ms'] for page in pages)
+    jina_ms = statistics.median(page['jina_ms'] for page in pages)
+    size_kb = statistics.median(len(page['body']) for page in pages) / 1024
+    
+    print(f"Pages: {len(pages)} (median HTML size {size_kb:.0f} KB), "
+          f"sent to fallback: {fallbacks} (< {args.min_chars} chars extracted)")
+    if recalls:
+        print(f"Text vs Jina - median recall: {statistics.median(recalls):.2f}, "
+              f"median precision: {statistics.median(precisions):.2f}")
+    print(f"Extraction: {statistics.median(extract_ms):.1f} ms/page median; "
+          f"{len(batch) / serial_time:.0f} pages/s in 1 process, "
+          f"{len(batch) / pool_time:.0f} pages/s in {args.processes} processes")
+    print(f"Recorded latency - direct fetch: {direct_ms:.0f} ms, Jina: {jina_ms:.0f} ms (median)")
+    print(f"Local total: ~{direct_ms + statistics.median(extract_ms):.0f} ms/page vs Jina {jina_ms:.0f} ms/page")
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
\ No newline at end of file
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark: JobWorkflow throughput against local fake backends
+
+Starts stand-ins for Google Custom Search (seeded from the recorded search
+response), the Jina reader and Ollama or Anthropic (see fake_backends), then
+runs the whole search-fetch-classify-analyze-save pipeline on a temporary
+SQLite database once per thread count. Reports jobs/s and the p50/p95 latency
+of each stage, and how they change with concurrency. Nothing leaves the machine.
+
+Stage latencies are taken at the client, so they include waits for limiter
+slots and generation slots: search (one result page), fetch, classify,
+analyze, save, and job (one job through every stage).
+
+Usage:
+    python benchmarks/bench_pipeline.py [--threads 1 2 4 8] [--queries N] [--results N]
+        [--ai ollama|anthropic] [--reader-latency-ms MS] [--reader-429-rate R]
+        [--tokens-per-second N] [--llm-slots N] [--pages DIR] [--queue] [--json PATH]
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from config import config
+from core.job_workflow import JobWorkflow
+from parsers.content_analyzer import ContentAnalyzer
+from parsers.job_parser import JobParser
+from repositories.factory import create_sqlite_repository
+from repositories.work_queue import WorkQueue
+from services.ai_service import AnalysisType, AnthropicService, OllamaService
+from services.content_service import ContentService
+from services.search_service import SearchService
+from utils.adaptive_limiter import AdaptiveLimiter
+from utils.circuit_breaker import CircuitBreaker
+
+from fake_backends import FakeLLMBackend, FakeReaderBackend, FakeSearchBackend
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURE = os.path.join(BENCH_DIR, '..', '..', 'app', 'example_google_custom_search_response.json')
+STAGES = ('search', 'fetch', 'classify', 'analyze', 'save', 'job')
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(math.ceil(fraction * len(ordered)) - 1, 0))]
+
+class StageTimer:
+    """Wall-clock latencies of calls, grouped by pipeline stage"""
+    
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+    
+    def wrap(self, obj: Any, method: str, stage: Callable[[tuple, dict], str]) -> None:
+        """Time every call of obj.method under the stage it names for its arguments"""
+        original = getattr(obj, method)
+        
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.samples[stage(args, kwargs)].append(elapsed)
+        
+        setattr(obj, method, timed)
+    
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            stage: {
+                'count': len(self.samples[stage]),
+                'p50_ms': round(percentile(self.samples[stage], 0.5) * 1000, 1),
+                'p95_ms': round(percentile(self.samples[stage], 0.95) * 1000, 1),
+            }
+            for stage in STAGES if self.samples.get(stage)
+        }
+
+def _ai_stage(args: tuple, kwargs: dict) -> str:
+    analysis_type = kwargs.get('analysis_type', args[1] if len(args) > 1 else None)
+    return 'classify' if analysis_type == AnalysisType.JOB_POSTING_CLASSIFICATION else 'analyze'
+
+def run_once(args, threads: int, search: FakeSearchBackend, reader: FakeReaderBackend,
+             llm: FakeLLMBackend) -> Dict[str, Any]:
+    """One pipeline run with fresh limiters, breakers and database"""
+    limits = config.get('limits', {})
+    breaker_options = config.get('circuit_breaker', {})
+    
+    def guards(name: str) -> Dict[str, Any]:
+        return {'limiter': AdaptiveLimiter(name, **limits.get(name, {})),
+                'breaker': CircuitBreaker(name, **breaker_options)}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        repository = create_sqlite_repository(os.path.join(tmp, 'bench.db'))
+        search_service = SearchService('bench-key', 'bench-cx', base_url=f"{search.url}/customsearch/v1",
+                                       **guards('search'))
+        content_service = ContentService(base_url=reader.url, **guards('content'))
+        if args.ai == 'anthropic':
+            ai_service = AnthropicService('bench-key', base_url=llm.url, **guards('anthropic'))
+        else:
+            ai_service = OllamaService(host=llm.url, **guards('ollama'))
+        work_queue = WorkQueue(repository.db, repository.db_type) if args.queue else None
+        workflow = JobWorkflow(search_service, ai_service, JobParser(), ContentAnalyzer(ai_service, content_service),
+                               repository, work_queue=work_queue, threads=threads)
+        
+        timer = StageTimer()
+        timer.wrap(search_service, '_get', lambda a, k: 'search')
+        timer.wrap(content_service, 'fetch_content', lambda a, k: 'fetch')
+        timer.wrap(ai_service, 'analyze_content', _ai_stage)
+        timer.wrap(repository, 'save_processed_job', lambda a, k: 'save')
+        timer.wrap(workflow, '_handle_item', lambda a, k: 'job')
+        
+        saved = 0
+        handled = 0
+        output = io.StringIO()
+        start = time.perf_counter()
+        try:
+            # The workflow narrates every job; keep the benchmark's own output readable
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                for number in range(args.queries):
+                    saved += len(workflow.search_and_process_jobs(f"bench query {number}", 'd3', args.results))
+                    handled += workflow.job_parser.stats['jobs_parsed']
+        finally:
+            elapsed = time.perf_counter() - start
+            workflow.close()
+    
+    return {
+        'threads': threads,
+        'results': handled,
+        'saved': saved,
+        'seconds': round(elapsed, 2),
+        'jobs_per_second': round(handled / elapsed, 2),
+        'stages': timer.summary(),
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8], help='thread counts to compare')
+    parser.add_argument('--queries', type=int, default=2, help='searches per run')
+    parser.add_argument('--results', type=int, default=30, help='results per search (at most 100)')
+    parser.add_argument('--fixture', default=DEFAULT_FIXTURE, help='recorded search response to seed results from')
+    parser.add_argument('--pages', help='directory of recorded pages (see bench_content_fetch.py --record)')
+    parser.add_argument('--ai', choices=['ollama', 'anthropic'], default='ollama', help='LLM API to emulate')
+    parser.add_argument('--search-latency-ms', type=float, default=150)
+    parser.add_argument('--reader-latency-ms', type=float, default=400, help='median reader latency')
+    parser.add_argument('--reader-429-rate', type=float, default=0.02, help='share of reader requests rate-limited')
+    parser.add_argument('--tokens-per-second', type=float, default=400, help='LLM output token rate')
+    parser.add_argument('--prompt-tokens-per-second', type=float, default=8000, help='LLM prompt token rate')
+    parser.add_argument('--llm-slots', type=int, default=2, help='generations the LLM runs at once')
+    parser.add_argument('--queue', action='store_true', help='run through the durable work queue')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+    
+    with open(args.fixture, 'r') as f:
+        items = json.load(f).get('items', [])
+    pages = None
+    if args.pages:
+        with open(os.path.join(args.pages, 'index.json'), 'r') as f:
+            index = json.load(f)
+        pages = []
+        for entry in index:
+            if entry.get('jina_status') == 200:
+                with open(os.path.join(args.pages, f"{entry['name']}.jina.md"), 'r', encoding='utf-8') as f:
+                    pages.append(f.read())
+    
+    search = FakeSearchBackend(items, results_per_query=args.results, latency_ms=args.search_latency_ms)
+    reader = FakeReaderBackend(items, pages, latency_ms=args.reader_latency_ms, rate_limit_rate=args.reader_429_rate)
+    llm = FakeLLMBackend(args.tokens_per_second, args.prompt_tokens_per_second, slots=args.llm_slots)
+    
+    runs = []
+    with search, reader, llm:
+        for threads in args.threads:
+            run = run_once(args, threads, search, reader, llm)
+            runs.append(run)
+            stages = ', '.join(f"{stage} {figures['p50_ms']:.0f}/{figures['p95_ms']:.0f}"
+                               for stage, figures in run['stages'].items())
+            print(f"threads {threads:>3}: {run['results']} jobs ({run['saved']} saved) in {run['seconds']:.1f} s, "
+                  f"{run['jobs_per_second']:.2f} jobs/s - p50/p95 ms: {stages}")
+    
+    base = runs[0]
+    print(f"\nScaling vs {base['threads']} thread(s):")
+    print(f"  {'threads':>7} {'jobs/s':>7} {'speedup':>7}  " + ' '.join(f"{stage + ' p95':>12}" for stage in STAGES))
+    for run in runs:
+        p95s = ' '.join(f"{run['stages'].get(stage, {}).get('p95_ms', float('nan')):>12.0f}" for stage in STAGES)
+        print(f"  {run['threads']:>7} {run['jobs_per_second']:>7.2f} "
+              f"{run['jobs_per_second'] / base['jobs_per_second']:>6.2f}x  {p95s}")
+    print(f"Fake backends - search: {dict(search.stats)}, reader: {dict(reader.stats)}, llm: {dict(llm.stats)}")
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'settings': {name: value for name, value in vars(args).items() if name != 'json'},
+                       'runs': runs}, f, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
\ No newline at end of file
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark: generate_web_report.get_job_data with eager vs. lazy analysis JSON
+
+Seeds a temporary SQLite database with N processed jobs and measures the peak and
+retained Python heap (tracemalloc) of loading them for the report.
+
+Usage:
+    python benchmarks/bench_report_memory.py [--rows N]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from generate_web_report import get_job_data
+from repositories.factory import create_sqlite_repository
+from repositories.models import ProcessedJobModel
+
+@dataclass
+class LegacyProcessedJob:
+    """Reference copy of the original ProcessedJob: no __slots__, analysis parsed eagerly"""
+    job_url: str
+    job_title: str
+    company: Optional[str]
+    location: Optional[str]
+    posted_time: str
+    employment_type: str
+    salary: Optional[str]
+    logo_url: Optional[str]
+    recommendation: str
+    confidence: int
+    fit_score: int
+    analysis_json: Dict[str, Any]
+    processed_at: datetime
+    content_hash: str
+    processing_version: str = "1.0"
+
+def legacy_get_job_data() -> List[Dict[str, Any]]:
+    """Reference copy of the original get_job_data conversion"""
+    jobs = [
+        LegacyProcessedJob(
+            job_url=m.job_url, job_title=m.job_title, company=m.company, location=m.location,
+            posted_time=m.posted_time, employment_type=m.employment_type, salary=m.salary,
+            logo_url=m.logo_url, recommendation=m.recommendation, confidence=m.confidence,
+            fit_score=m.fit_score, analysis_json=m.get_analysis_dict(), processed_at=m.processed_at,
+            content_hash=m.content_hash, processing_version=m.processing_version
+        )
+        for m in ProcessedJobModel.select().order_by(ProcessedJobModel.processed_at.desc())
+    ]
+    return [
+        {
+            'id': None, 'title': job.job_title, 'company': job.company, 'location': job.location,
+            'url': job.job_url, 'date_posted': job.posted_time, 'salary_range': job.salary,
+            'content_hash': job.content_hash, 'recommendation': job.recommendation,
+            'confidence': job.confidence, 'fit_score': job.fit_score,
+            'analysis_summary': job.analysis_json,
+            'created_at': job.processed_at.isoformat() if job.processed_at else None,
+            'updated_at': None
+        }
+        for job in jobs
+    ]
+
+def make_analysis(i: int) -> Dict[str, Any]:
+    """A realistic fit analysis payload"""
+    return {
+        'recommendation': ('apply', 'maybe', 'skip')[i % 3],
+        'confidence': i % 5 + 1,
+        'fit_score': (i * 7) % 5 + 1,
+        'summary': {
+            'role': f'Senior Software Engineer {i}',
+            'company': f'Company {i % 997}',
+            'location': 'Remote (US)',
+            'salary_range': '$150,000 - $200,000',
+            'key_technologies': ['Python', 'TypeScript', 'PostgreSQL', 'AWS', 'React', 'LLMs'],
+        },
+        'job_summary': 'Build and operate the core platform, owning services end to end. ' * 4,
+        'fit_summary': 'Strong overlap with backend and AI product experience; some domain gaps. ' * 3,
+        'why_good_fit': [f'Reason {n} this role matches the resume well' for n in range(4)],
+        'potential_concerns': [f'Concern {n} about seniority or domain' for n in range(3)],
+    }
+
+def seed(rows: int) -> None:
+    """Insert rows in bulk"""
+    now = datetime.now()
+    batch = []
+    for i in range(rows):
+        batch.append({
+            'job_url': f'https://boards.greenhouse.io/company{i % 997}/jobs/{i}',
+            'job_title': f'Senior Software Engineer {i}',
+            'company': f'Company {i % 997}',
+            'location': 'Remote',
+            'posted_time': '2 days ago',
+            'employment_type': 'Full-time',
+            'salary': '$150,000 - $200,000',
+            'logo_url': None,
+            'recommendation': ('apply', 'maybe', 'skip')[i % 3],
+            'confidence': i % 5 + 1,
+            'fit_score': (i * 7) % 5 + 1,
+            'analysis_json': json.dumps(make_analysis(i)),
+            'processed_at': now - timedelta(minutes=i),
+            'content_hash': f'{i:064x}',
+            'processing_version': '1.0',
+        })
+        if len(batch) == 1000:
+            ProcessedJobModel.insert_many(batch).execute()
+            batch = []
+    if batch:
+        ProcessedJobModel.insert_many(batch).execute()
+
+def measure(fn) -> tuple:
+    """Return (peak, retained) bytes allocated while running fn"""
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak, retained
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = create_sqlite_repository(os.path.join(tmp, 'bench.db'))
+        seed(args.rows)
+        
+        legacy_peak, legacy_retained = measure(legacy_get_job_data)
+        lazy_peak, lazy_retained = measure(lambda: get_job_data(repo))
+        repo.close()
+    
+    mb = 1024 * 1024
+    print(f"Rows: {args.rows}")
+    print(f"Eager dataclasses: peak {legacy_peak / mb:8.1f} MB, retained {legacy_retained / mb:8.1f} MB")
+    print(f"Slots + lazy JSON: peak {lazy_peak / mb:8.1f} MB, retained {lazy_retained / mb:8.1f} MB")
+    print(f"Retained: {lazy_retained / legacy_retained:.0%} of eager")
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
\ No newline at end of file
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: ExtractionEngine vs. the original per-pattern re.search extractors
+
+Usage:
+    python benchmarks/bench_text_extractors.py [--repeat N] [--fixture PATH]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import timeit
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from utils.text_extractors import ExtractionEngine
+
+DEFAULT_FIXTURE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'app', 'example_google_custom_search_response.json'
+)
+
+def legacy_extract(item: Dict[str, Any]) -> tuple:
+    """Reference copy of the original JobParser extraction (string patterns, tried one by one)"""
+    title = item.get('title', '')
+    snippet = item.get('snippet', '')
+    link = item.get('link', '')
+    
+    company = None
+    match = re.search(r'@\s*([^\|\-]+?)(?:\s*$|\s*\||\s*\-)', title)
+    company = match.group(1).strip() if match else None
+    if not company and 'greenhouse.io' in link:
+        match = re.search(r'boards\.greenhouse\.io/([^/]+)/', link)
+        company = match.group(1).replace('-', ' ').title() if match else None
+    if not company:
+        metatags = item.get('pagemap', {}).get('metatags', [{}])
+        if metatags:
+            og_title = metatags[0].get('og:title', '')
+            for pattern in [r'\-\s*([^\-\|]+?)\s*$', r'\|\s*([^\-\|]+?)\s*$',
+                            r'at\s+([^\-\|]+?)(?:\s*$|\s*\||\s*\-)']:
+                match = re.search(pattern, og_title)
+                if match:
+                    company = match.group(1).strip()
+                    break
+    
+    location = None
+    for pattern in [r'Remote\s*-\s*([^\-\|]+)', r'([^\-\|]+)\s*-\s*Remote',
+                    r'\-\s*([^\-\|,]+(?:,\s*[^\-\|]+)*)\s*$']:
+        match = re.search(pattern, title)
+        if match:
+            potential_location = match.group(1).strip()
+            text_lower = potential_location.lower()
+            if not any(term in text_lower for term in ['engineer', 'developer', 'software', 'job', 'position']):
+                location = potential_location
+                break
+    if not location:
+        match = re.search(r'Location[:\.]?\s*([^\n\r\.]+)', snippet)
+        location = match.group(1).strip() if match else None
+    if not location and re.search(r'\bremote\b', title.lower()):
+        location = 'Remote'
+    
+    salary = None
+    for pattern in [r'\$([\d,]+)\s*[–\-]\s*\$([\d,]+)',
+                    r'Compensation[:\.]?\s*\$([\d,]+)\s*[–\-]\s*\$([\d,]+)',
+                    r'([\d,]+)K\s*[–\-]\s*([\d,]+)K']:
+        match = re.search(pattern, snippet)
+        if match:
+            salary = f"${match.group(1)} - ${match.group(2)}"
+            break
+    
+    match = re.search(r'(\d+\s+(?:day|hour|minute|second)s?\s+ago)', snippet)
+    posted_time = match.group(1) if match else 'Unknown'
+    
+    return company or None, location or None, salary, posted_time
+
+def load_items(fixture: str, repeat: int) -> List[Dict[str, Any]]:
+    """Load recorded search items, repeated to a useful batch size"""
+    with open(fixture, 'r') as f:
+        items = json.load(f).get('items', [])
+    return items * repeat
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fixture', default=DEFAULT_FIXTURE)
+    parser.add_argument('--repeat', type=int, default=1000, help='copies of the fixture items per batch')
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+    
+    items = load_items(args.fixture, args.repeat)
+    engine = ExtractionEngine()
+    
+    # Both implementations must agree before timing means anything
+    expected = [legacy_extract(item) for item in items]
+    actual = [(f.company, f.location, f.salary, f.posted_time) for f in engine.extract_batch(items)]
+    if expected != actual:
+        mismatches = [(e, a) for e, a in zip(expected, actual) if e != a]
+        print(f"❌ Results differ on {len(mismatches)} items, e.g. {mismatches[0]}")
+        return 1
+    
+    legacy_time = min(timeit.repeat(lambda: [legacy_extract(item) for item in items],
+                                    number=1, repeat=args.rounds))
+    engine_time = min(timeit.repeat(lambda: engine.extract_batch(items),
+                                    number=1, repeat=args.rounds))
+    
+    print(f"Items per batch: {len(items)}")
+    print(f"Legacy extractors: {legacy_time * 1e6 / len(items):8.2f} µs/item")
+    print(f"ExtractionEngine:  {engine_time * 1e6 / len(items):8.2f} µs/item")
+    print(f"Speedup: {legacy_time / engine_time:.2f}x")
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
\ No newline at end of file
@@ -0,0 +1,316 @@
+"""
+Local stand-ins for the external services, for offline end-to-end benchmarks
+
+Each backend is a threaded HTTP server on a free localhost port that speaks
+just enough of the real API for the service clients:
+
+- FakeSearchBackend: Google Custom Search, paging through results seeded from
+  a recorded response. Every result gets its own job URL on bench.example.com.
+- FakeReaderBackend: the Jina reader, serving a stored page for each job URL
+  with a configurable latency and share of 429 responses.
+- FakeLLMBackend: Ollama's /api/chat and Anthropic's /v1/messages, answering
+  at configurable prompt and output token rates on a limited number of
+  generation slots, as a GPU or a rate-limited API would.
+"""
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit, parse_qs
+
+JOB_HOST = 'bench.example.com'
+JOB_URL_PATTERN = re.compile(r'/jobs/(\d+)')
+# Filler vocabulary of synthetic pages, so each posting's text (and SimHash) is its own
+VOCABULARY = (
+    'python typescript react postgres kubernetes aws terraform kafka graphql docker rust go '
+    'design build ship own scale mentor review test deploy monitor improve collaborate lead '
+    'platform product api service pipeline model data customer team roadmap reliability '
+    'latency throughput security compliance analytics search payments billing growth '
+    'benefits equity remote hybrid onsite salary health vacation learning budget parental'
+).split()
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count, about four characters per token"""
+    return max(len(text) // 4, 1)
+
+def _seeded(text: str) -> random.Random:
+    """A random generator that makes the same choices for the same text"""
+    return random.Random(int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], 'big'))
+
+class _Handler(BaseHTTPRequestHandler):
+    """Dispatches requests to the server's backend"""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        self.server.backend.handle(self, 'GET')
+    
+    def do_POST(self):
+        self.server.backend.handle(self, 'POST')
+    
+    def do_HEAD(self):
+        self.server.backend.handle(self, 'HEAD')
+    
+    def send(self, status: int, body: str, content_type: str = 'application/json',
+             headers: Optional[Dict[str, str]] = None) -> None:
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', f"{content_type}; charset=utf-8")
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(data)
+    
+    def read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+    
+    def log_message(self, format, *args):
+        pass
+
+class FakeBackend:
+    """Base of the fake services: runs the HTTP server and counts requests"""
+    
+    def __init__(self):
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+    
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self) -> 'FakeBackend':
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.backend = self
+        threading.Thread(target=self._server.serve_forever, name=type(self).__name__, daemon=True).start()
+        return self
+    
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+    
+    def __enter__(self) -> 'FakeBackend':
+        return self.start()
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.stats[name] += value
+    
+    def handle(self, request: _Handler, method: str) -> None:
+        raise NotImplementedError
+
+class FakeSearchBackend(FakeBackend):
+    """Custom Search API serving pages of results seeded from a recorded response"""
+    
+    def __init__(self, fixture_items: List[Dict[str, Any]], results_per_query: int = 100, latency_ms: float = 150):
+        """
+        Args:
+            fixture_items: Result items of a recorded response, reused round-robin
+            results_per_query: Total results each query has
+            latency_ms: Time to answer a page
+        """
+        super().__init__()
+        self.items = fixture_items
+        self.results_per_query = results_per_query
+        self.latency = latency_ms / 1000
+        self._queries: Dict[str, int] = {}
+    
+    def item(self, number: int) -> Dict[str, Any]:
+        """Result number (over all queries) as a fixture item with its own job URL"""
+        item = dict(self.items[number % len(self.items)])
+        link = f"https://{JOB_HOST}/jobs/{number}"
+        item.update(link=link, displayLink=JOB_HOST, formattedUrl=link)
+        return item
+    
+    def handle(self, request: _Handler, method: str) -> None:
+        params = {name: values[0] for name, values in parse_qs(urlsplit(request.path).query).items()}
+        with self._lock:
+            query_number = self._queries.setdefault(params.get('q', ''), len(self._queries))
+        start = int(params.get('start', 1))
+        count = min(int(params.get('num', 10)), max(self.results_per_query - start + 1, 0))
+        first = query_number * self.results_per_query + start - 1
+        
+        time.sleep(self.latency)
+        self.count('requests')
+        body = {
+            'kind': 'customsearch#search',
+            'searchInformation': {'totalResults': str(self.results_per_query)},
+            'items': [self.item(first + offset) for offset in range(count)],
+        }
+        request.send(200, json.dumps(body))
+
+class FakeReaderBackend(FakeBackend):
+    """Jina reader serving a stored page per job URL"""
+    
+    def __init__(self, fixture_items: List[Dict[str, Any]], pages: Optional[List[str]] = None,
+                 latency_ms: float = 400, jitter: float = 0.5, rate_limit_rate: float = 0.0,
+                 retry_after: Optional[float] = 1.0, seed: int = 0):
+        """
+        Args:
+            fixture_items: Search result items synthetic pages are written from
+            pages: Recorded reader pages to serve instead, round-robin. Jobs that
+                   share a page are near-duplicates, whose analyses get reused.
+            latency_ms: Median time to answer
+            jitter: Sigma of the log-normal latency spread (0 for a fixed latency)
+            rate_limit_rate: Share of requests answered with 429
+            retry_after: Retry-After of 429 responses in seconds (None to omit it)
+            seed: Seed of the latency and rate limit draws
+        """
+        super().__init__()
+        self.items = fixture_items
+        self.pages = pages
+        self.latency = latency_ms / 1000
+        self.jitter = jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+    
+    def page(self, url: str) -> Optional[str]:
+        """Reader text of a job URL, or None for URLs the search backend did not hand out"""
+        match = JOB_URL_PATTERN.search(url)
+        if not match:
+            return None
+        number = int(match.group(1))
+        if self.pages:
+            return self.pages[number % len(self.pages)]
+        
+        item = self.items[number % len(self.items)]
+        rng = _seeded(url)
+        sections = []
+        for heading in ('About the role', 'What you will do', 'What we are looking for', 'Benefits'):
+            words = [rng.choice(VOCABULARY) for _ in range(rng.randint(60, 120))]
+            sections.append(f"## {heading}\n\n{' '.join(words).capitalize()}.")
+        return (f"Title: {item.get('title', '')}\n\nURL Source: {url}\n\nMarkdown Content:\n"
+                f"# {item.get('title', '')}\n\n{item.get('snippet', '')}\n\n" + '\n\n'.join(sections) + '\n')
+    
+    def handle(self, request: _Handler, method: str) -> None:
+        with self._lock:
+            limited = self._random.random() < self.rate_limit_rate
+            delay = self.latency * math.exp(self._random.gauss(0, self.jitter)) if self.jitter else self.latency
+        if limited:
+            self.count('rate_limited')
+            headers = {'Retry-After': str(self.retry_after)} if self.retry_after is not None else {}
+            request.send(429, 'Too Many Requests', 'text/plain', headers)
+            return
+        
+        time.sleep(delay)
+        self.count('requests')
+        page = self.page(request.path.lstrip('/'))
+        if page is None:
+            request.send(404, 'Not Found', 'text/plain')
+        else:
+            request.send(200, page, 'text/plain')
+
+class FakeLLMBackend(FakeBackend):
+    """Ollama and Anthropic chat APIs answering at fixed token rates"""
+    
+    CLASSIFICATION_MARKER = 'Respond with EXACTLY ONE WORD'
+    
+    def __init__(self, tokens_per_second: float = 400, prompt_tokens_per_second: float = 8000,
+                 slots: int = 2, listing_rate: float = 0.1):
+        """
+        Args:
+            tokens_per_second: Output token rate of one generation
+            prompt_tokens_per_second: Prompt processing rate of one generation
+            slots: Generations run at once; further requests queue for a slot
+            listing_rate: Share of pages classified as job listings rather than postings
+        """
+        super().__init__()
+        self.tokens_per_second = tokens_per_second
+        self.prompt_tokens_per_second = prompt_tokens_per_second
+        self.listing_rate = listing_rate
+        self._slots = threading.Semaphore(slots)
+        self._active = 0
+    
+    def answer(self, prompt: str) -> str:
+        """The model's reply: one word for a classification prompt, a fit analysis otherwise"""
+        rng = _seeded(prompt)
+        if self.CLASSIFICATION_MARKER in prompt:
+            return 'LISTING' if rng.random() < self.listing_rate else 'INDIVIDUAL'
+        
+        recommendation = rng.choice(['apply', 'maybe', 'maybe', 'skip'])
+        technologies = sorted(rng.sample(VOCABULARY[:12], 4))
+        return json.dumps({
+            'recommendation': recommendation,
+            'confidence': rng.randint(2, 5),
+            'fit_score': {'apply': 4, 'maybe': 3, 'skip': 2}[recommendation],
+            'summary': {
+                'role': 'Software Engineer',
+                'company': 'Bench Co',
+                'location': 'Remote',
+                'salary_range': 'Not specified',
+                'key_technologies': technologies,
+            },
+            'job_summary': ' '.join(rng.choice(VOCABULARY) for _ in range(60)),
+            'fit_summary': ' '.join(rng.choice(VOCABULARY) for _ in range(40)),
+            'why_good_fit': [' '.join(rng.choice(VOCABULARY) for _ in range(12)) for _ in range(3)],
+            'potential_concerns': [' '.join(rng.choice(VOCABULARY) for _ in range(12)) for _ in range(2)],
+        }, indent=2)
+    
+    def generate(self, prompt: str) -> tuple:
+        """Wait for a slot and the generation time; returns (reply, prompt tokens, output tokens)"""
+        reply = self.answer(prompt)
+        prompt_tokens, output_tokens = _estimate_tokens(prompt), _estimate_tokens(reply)
+        with self._slots:
+            with self._lock:
+                self._active += 1
+                self.stats['max_active'] = max(self.stats['max_active'], self._active)
+            try:
+                time.sleep(prompt_tokens / self.prompt_tokens_per_second + output_tokens / self.tokens_per_second)
+            finally:
+                with self._lock:
+                    self._active -= 1
+        self.count('requests')
+        self.count('output_tokens', output_tokens)
+        return reply, prompt_tokens, output_tokens
+    
+    def handle(self, request: _Handler, method: str) -> None:
+        path = urlsplit(request.path).path
+        if method != 'POST' or path not in ('/api/chat', '/v1/messages'):
+            request.send(404, json.dumps({'error': 'not found'}))
+            return
+        
+        body = request.read_json()
+        prompt = '\n'.join(
+            message['content'] if isinstance(message['content'], str)
+            else ''.join(block.get('text', '') for block in message['content'])
+            for message in body.get('messages', [])
+        )
+        reply, prompt_tokens, output_tokens = self.generate(prompt)
+        
+        if path == '/api/chat':
+            request.send(200, json.dumps({
+                'model': body.get('model'),
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'message': {'role': 'assistant', 'content': reply},
+                'done': True,
+                'done_reason': 'stop',
+                'prompt_eval_count': prompt_tokens,
+                'eval_count': output_tokens,
+            }))
+        else:
+            request.send(200, json.dumps({
+                'id': f"msg_bench{self.stats['requests']}",
+                'type': 'message',
+                'role': 'assistant',
+                'model': body.get('model'),
+                'content': [{'type': 'text', 'text': reply}],
+                'stop_reason': 'end_turn',
+                'stop_sequence': None,
+                'usage': {'input_tokens': prompt_tokens, 'output_tokens': output_tokens},
+            }))
\ No newline at end of file
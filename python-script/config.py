@@ -17,10 +17,20 @@ class Config:
         defaults = {
             'database': {
                 'type': 'sqlite',
-                'path': 'jobs.db'
+                'path': 'jobs.db',
+                # Write-behind buffer for saves: flush after max_batch jobs or max_delay seconds
+                'write_buffer': {'max_batch': 50, 'max_delay': 2.0},
+                # LRU of per-URL job state, warmed with jobs processed in the last warm_days days;
+                # URLs found unprocessed are trusted for negative_ttl seconds
+                'read_cache': {'max_entries': 10000, 'warm_days': 7, 'negative_ttl': 30},
+                # Bloom filter of processed URLs, stored next to the database
+                'seen_filter': {'capacity': 1000000, 'error_rate': 0.001, 'sync_interval': 30},
+                # Persisted pipeline state shared by workers; leases are renewed by a heartbeat
+                'work_queue': {'lease_seconds': 60, 'max_attempts': 3}
             },
             'ai': {
                 'provider': 'ollama',  # or 'anthropic'
+                'base_url': None,  # Ollama host or Anthropic API URL; None for the provider's default
                 'model': 'qwen2.5:14b-instruct-q4_K_M',
                 'max_tokens': 20000,
                 'temperature': 0.5
@@ -30,12 +40,45 @@ class Config:
                 'cx': '',  # Will be overridden by env var
                 'base_url': 'https://www.googleapis.com/customsearch/v1',
                 'default_date_restrict': 'd3',
-                'max_results': 10
+                'max_results': 10,
+                # Narrow each query's dateRestrict to the time since its last search (None to disable)
+                'incremental': {'index_lag_hours': 12}
             },
             'content': {
+                'backend': 'jina',  # or 'local': fetch pages directly and extract them in a process pool
                 'base_url': 'https://r.jina.ai',
                 'timeout': 30,
-                'max_retries': 3
+                'max_retries': 3,
+                'fallback': 'jina'  # Local backend: service for pages it cannot extract (or None)
+            },
+            'worker': {
+                'poll_interval': 30,  # Seconds between checks of an empty work queue
+                'threads': 1  # Jobs processed at once
+            },
+            # Adaptive concurrency limits per external service (see utils.adaptive_limiter)
+            'limits': {
+                'search': {'initial_limit': 1, 'max_limit': 4},
+                'content': {'initial_limit': 2, 'max_limit': 16},
+                'pages': {'initial_limit': 4, 'max_limit': 32},
+                'ollama': {'initial_limit': 1, 'max_limit': 4},
+                'anthropic': {'initial_limit': 2, 'max_limit': 16}
+            },
+            # Per-stage timings of each run (see utils.instrumentation); None to skip a file
+            'instrumentation': {
+                'report': 'run_report.json',
+                'trace': None  # e.g. 'run_trace.json', for chrome://tracing or Perfetto
+            },
+            # Shared by every external service (see utils.circuit_breaker)
+            'circuit_breaker': {'failure_threshold': 5, 'reset_seconds': 30, 'max_reset_seconds': 600},
+            # Work queue order: freshness plus fit signals from the search result (see data.PREFERENCES)
+            'scheduler': {
+                'half_life_hours': 48,
+                'max_delay_hours': 24,
+                'freshness_weight': 0.5,
+                'preferred_terms': ['ai', 'llm', 'machine learning', 'full stack', 'backend', 'frontend',
+                                    'python', 'typescript'],
+                'avoided_terms': ['intern', 'director', 'manager', 'principal'],
+                'preferred_locations': ['remote', 'atlanta']
             }
         }
         
@@ -82,6 +125,8 @@ class Config:
         # Content service config
         if os.getenv('JINA_BASE_URL'):
             config['content']['base_url'] = os.getenv('JINA_BASE_URL')
+        if os.getenv('CONTENT_BACKEND'):
+            config['content']['backend'] = os.getenv('CONTENT_BACKEND')
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value using dot notation"""
@@ -1,18 +1,45 @@
 """
 Main job processing workflow orchestration
 """
-from typing import List, Optional
+from typing import List, Optional, Iterable, Iterator, Dict, Any, Callable
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 import json
+import threading
 import tqdm
 from job_types import Job
 from repositories.base import ProcessedJob, JobRepository
+from repositories.work_queue import WorkQueue, WorkItem, WorkState
+from repositories.search_watermarks import SearchWatermarks
+from core.scheduler import PriorityScheduler
 from services.search_service import SearchService
 from services.ai_service import AIService, AnalysisType
 from parsers.job_parser import JobParser
 from parsers.content_analyzer import ContentAnalyzer, JobPostingType
-from utils.error_handling import JobSeekrError
+from utils.error_handling import JobSeekrError, LeaseLostError, CircuitOpenError, ContentNotModifiedError
+from utils.json_stream import iter_json_items
+from utils.adaptive_limiter import limiter_metrics
+from utils.circuit_breaker import breaker_metrics
+from utils.instrumentation import RunRecorder, current_run, start_run, span, tag
 from data import RESUME, PREFERENCES
 
+def _counted(items: Iterable, counts: Counter) -> Iterator:
+    """Pass items through, counting them in counts['items']"""
+    for item in items:
+        counts['items'] += 1
+        yield item
+
+def _bounded_map(pool: ThreadPoolExecutor, fn: Callable, items: Iterable, window: int) -> Iterator:
+    """Like pool.map, but takes items from the iterable only as results are consumed"""
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
 class JobWorkflow:
     """Main workflow orchestrator for job search and processing"""
     
@@ -22,39 +49,145 @@ class JobWorkflow:
         ai_service: AIService,
         job_parser: JobParser,
         content_analyzer: ContentAnalyzer,
-        repository: JobRepository
+        repository: JobRepository,
+        work_queue: Optional[WorkQueue] = None,
+        scheduler: Optional[PriorityScheduler] = None,
+        watermarks: Optional[SearchWatermarks] = None,
+        threads: int = 1,
+        report_path: Optional[str] = None,
+        trace_path: Optional[str] = None
     ):
         self.search_service = search_service
         self.ai_service = ai_service
         self.job_parser = job_parser
         self.content_analyzer = content_analyzer
         self.repository = repository
+        self.work_queue = work_queue
+        self.scheduler = scheduler
+        self.watermarks = watermarks
+        # Jobs processed at once; each external service's limiter decides how many
+        # of their requests actually run concurrently
+        self.threads = threads
+        # Per-stage timings of each run (JSON), and its spans in Chrome trace-event format
+        self.report_path = report_path
+        self.trace_path = trace_path
+        self.run_stats = Counter()
+        # Updated by the pool threads processing items
+        self._stats_lock = threading.Lock()
+        self._newest_posted_at: Optional[datetime] = None
+        self._recorder: RunRecorder = current_run()
+        # Behind a write buffer, saved items are marked saved only once their rows are written
+        self._unwritten: Dict[str, WorkItem] = {}
+        add_flush_listener = getattr(repository, 'add_flush_listener', None)
+        self._deferred_finish = work_queue is not None and add_flush_listener is not None
+        if self._deferred_finish:
+            add_flush_listener(self._on_written)
     
-    def search_and_process_jobs(self, search_term: str, date_restrict: Optional[str] = None) -> List[Job]:
+    def search_and_process_jobs(self, search_term: str, date_restrict: Optional[str] = None,
+                                max_results: int = 10) -> List[Job]:
         """
         Complete workflow: search, parse, filter, and process jobs
         
+        Search result pages are fetched, parsed and processed lazily, so memory use
+        does not grow with the number of results. With search watermarks, a search
+        without a date restriction only covers the time since the term's last
+        search, and stops requesting pages once a page's worth of results in a row
+        were posted before it. The watermark only advances when the results seen
+        reach back to it: a search cut off by max_results first leaves it in place,
+        so the postings it did not get to are searched again next time. Without a
+        work queue, which would retry them, jobs that failed or were parked also
+        keep it in place.
+        
         Args:
             search_term: Search term to query for
             date_restrict: Optional date restriction (e.g., 'd3' for last 3 days)
+            max_results: Maximum number of search results to process
             
         Returns:
             List[Job]: List of successfully processed jobs
         """
-        try:
-            # Step 1: Search for jobs
-            print(f"🔍 Searching for jobs: {search_term}")
-            search_results = self.search_service.search_jobs(search_term, date_restrict)
+        print(f"🔍 Searching for jobs: {search_term}")
+        fetched_at = datetime.now(timezone.utc)
+        cutoff = None
+        if self.watermarks is not None and date_restrict is None:
+            date_restrict = self.watermarks.date_restrict(search_term, fetched_at)
+            cutoff = self.watermarks.cutoff(search_term)
+            print(f"   Incremental search since {cutoff.isoformat(timespec='minutes') if cutoff else 'never'}: "
+                  f"dateRestrict={date_restrict}")
+        received = Counter()
+        items = self.search_service.iter_search_items(search_term, date_restrict, max_results)
+        processed_jobs = self._run(_counted(items, received), fetched_at, cutoff)
+        
+        if self.watermarks is not None:
+            # Complete when the results ran out, or paging stopped at the last search's results
+            exhausted = received['items'] < min(max_results, self.search_service.MAX_RESULTS)
+            unfinished = 0 if self.work_queue is not None else self.run_stats['failed'] + self.run_stats['parked']
+            if unfinished:
+                print(f"   Search watermark kept: {unfinished} jobs were not processed and are searched again")
+            elif ((exhausted or self.run_stats['stopped_at_watermark'])
+                    and self.watermarks.covers(search_term, date_restrict, fetched_at)):
+                self.watermarks.advance(search_term, fetched_at, self._newest_posted_at)
+            else:
+                print(f"   Search watermark kept: results were cut off at {max_results} "
+                      f"before reaching back to the last search")
+        return processed_jobs
+    
+    def process_search_results_file(self, path: str) -> List[Job]:
+        """
+        Process a saved Google Custom Search response, streaming items from disk
+        
+        Args:
+            path: Path to the saved JSON response
             
-            # Step 2: Parse search results into Job objects
-            print("📝 Parsing search results...")
-            jobs = self.job_parser.parse_search_results(search_results)
-            print(f"Found {len(jobs)} job listings")
+        Returns:
+            List[Job]: List of successfully processed jobs
+        """
+        print(f"📂 Reading search results from {path}")
+        return self._run(iter_json_items(path))
+    
+    def process_queued_jobs(self) -> List[Job]:
+        """
+        Process jobs already in the work queue, e.g. as one of several workers
+        
+        Returns:
+            List[Job]: List of successfully processed jobs
+        """
+        if self.work_queue is None:
+            raise JobSeekrError("Processing queued jobs requires a work queue")
+        self.run_stats = Counter()
+        self.job_parser.stats.clear()
+        self._recorder = start_run(trace=self.trace_path is not None)
+        processed_jobs = self._process_jobs([])
+        if self.run_stats['claimed']:
+            self._show_summary(processed_jobs)
+            self._write_run_report()
+        return processed_jobs
+    
+    def _run(self, items: Iterable[Dict[str, Any]], fetched_at: Optional[datetime] = None,
+             cutoff: Optional[datetime] = None) -> List[Job]:
+        """
+        Parse and process raw search items, then show the run summary
+        
+        Args:
+            items: Iterable of raw search result items, consumed lazily
+            fetched_at: When the items were fetched (default: now)
+            cutoff: Posting time (UTC) up to which results were seen by an earlier search
             
-            # Step 3: Process jobs
+        Returns:
+            List[Job]: List of successfully processed jobs
+        """
+        self.run_stats = Counter()
+        self.job_parser.stats.clear()
+        self._newest_posted_at = None
+        self._recorder = start_run(trace=self.trace_path is not None)
+        
+        try:
+            # Parse search results into Job objects as they arrive and process them
+            jobs = self._until_watermark(self.job_parser.iter_jobs(items, fetched_at), cutoff)
             processed_jobs = self._process_jobs(jobs)
+            print(f"Found {self.job_parser.stats['jobs_parsed']} job listings")
             
-            # Step 4: Show summary
+            # Show summary
             self._show_summary(processed_jobs)
             
             return processed_jobs
@@ -63,66 +196,336 @@ class JobWorkflow:
             print(f"❌ Workflow failed: {str(e)}")
             raise JobSeekrError(f"Job workflow failed: {str(e)}")
     
-    def _process_jobs(self, jobs: List[Job]) -> List[Job]:
+        finally:
+            # Also for failed runs, which are the ones worth a look
+            self._write_run_report()
+    
+    def _until_watermark(self, jobs: Iterable[Job], cutoff: Optional[datetime]) -> Iterator[Job]:
+        """
+        Pass jobs through until a search page's worth in a row were posted before the cutoff
+        
+        Consumption stops there, so no further result pages are requested. Also
+        records the newest posting time seen, which becomes the query's watermark.
+        """
+        run = 0
+        for job in jobs:
+            posted_at = job.posted_at()
+            if posted_at and (self._newest_posted_at is None or posted_at > self._newest_posted_at):
+                self._newest_posted_at = posted_at
+            
+            if cutoff is not None and posted_at is not None and posted_at <= cutoff:
+                self._count('older_than_watermark')
+                run += 1
+            else:
+                run = 0
+            yield job
+            
+            if run >= self.search_service.PAGE_SIZE:
+                self._count('stopped_at_watermark')
+                return
+    
+    def _process_jobs(self, jobs: Iterable[Job]) -> List[Job]:
         """
-        Process a list of jobs through the complete pipeline
+        Process jobs through the complete pipeline
+        
+        With a work queue, jobs are queued as they are discovered and claimed in
+        batches along the way, so items left unfinished by an earlier run are
+        resumed too. Each stage's result is stored
+        as it completes, and a resumed item continues from its last stage. With a
+        scheduler, jobs are claimed in priority (deadline) order instead of search
+        result order.
         
         Args:
-            jobs: List of Job objects to process
+            jobs: Iterable of Job objects to process, consumed one at a time
             
         Returns:
             List[Job]: List of successfully processed jobs
         """
-        processed_jobs = []
+        print("\\n🔄 Processing jobs...")
         
-        print(f"\\n🔄 Processing {len(jobs)} jobs...")
+        if self.work_queue is None:
+            items = (WorkItem(job) for job in jobs)
+        else:
+            items = self._queue_and_claim(jobs)
         
-        for job in tqdm.tqdm(jobs, desc="Processing jobs"):
+        if self.threads > 1:
+            with ThreadPoolExecutor(self.threads, thread_name_prefix='job') as pool:
+                results = _bounded_map(pool, self._handle_item, items, 2 * self.threads)
+                processed_jobs = [job for job in tqdm.tqdm(results, desc="Processing jobs") if job]
+        else:
+            processed_jobs = [job for job in map(self._handle_item, tqdm.tqdm(items, desc="Processing jobs")) if job]
+        
+        return processed_jobs
+    
+    def _queue_and_claim(self, jobs: Iterable[Job]) -> Iterator[WorkItem]:
+        """
+        Queue discovered jobs, claiming queued items as discovery goes on
+        
+        A batch is claimed after every search page's worth of discovered jobs, so
+        fetches and LLM calls overlap the requests for later pages, and a run that
+        dies mid-search has already processed part of what it found. Items left by
+        earlier runs are claimed along the way; whatever is still claimable when
+        discovery ends is claimed last.
+        """
+        batch_size = self.search_service.PAGE_SIZE
+        discovered = 0
+        for job in jobs:
+            discovered += 1
+            if self.repository.is_job_processed(job.url):
+                print(f"Already processed: {job.title}")
+                self._count('already_processed')
+            else:
+                schedule = self.scheduler.schedule(job)._asdict() if self.scheduler else {}
+                with span('queue', op='enqueue'):
+                    queued = self.work_queue.enqueue(job, **schedule)
+                if not queued:
+                    self._count('already_queued')
+            if discovered % batch_size == 0:
+                yield from self.work_queue.claim(batch_size)
+        yield from self.work_queue.iter_claims()
+    
+    def _handle_item(self, item: WorkItem) -> Optional[Job]:
+        """
+        Process one work item, recording rather than raising its errors
+        
+        The item runs in a 'job' span, tagged with its outcome; the spans of its
+        service calls nest inside it.
+        
+        Returns:
+            Optional[Job]: The job if it was saved
+        """
+        with span('job', resumed=item.state != WorkState.DISCOVERED):
+            self._count('claimed', item.id is not None)
+            if item.state != WorkState.DISCOVERED:
+                print(f"Resuming {item.job.title} after {item.state.value}")
+                self._count('resumed')
             try:
-                # Skip if already processed
-                if self.repository.is_job_processed(job.url):
-                    print(f"Already processed: {job.title}")
-                    continue
-                
-                # Analyze content and check if it's an individual job posting
-                print(f"Analyzing: {job.title}")
-                content, posting_type = self.content_analyzer.analyze_job_posting(job.url)
-                
-                if posting_type != JobPostingType.INDIVIDUAL:
-                    print(f"❌ Skipping {job.title} - {posting_type.value}")
-                    continue
-                
-                print(f"✅ Processing {job.title}")
-                
-                # Generate content hash for change detection
-                content_hash = self.content_analyzer.generate_content_hash(content)
-                
-                # Check if content has changed (commented out for now)
-                # if not self.repository.has_content_changed(job.url, content_hash):
-                #     print(f"Content unchanged: {job.title}")
-                #     continue
-                
-                # Analyze job fit with AI
-                analysis = self.content_analyzer.analyze_job_fit(content, RESUME, PREFERENCES)
-                if not analysis:
-                    print(f"AI analysis failed: {job.title}")
-                    continue
-                
-                # Save to database
-                processed_job = ProcessedJob.from_job_and_analysis(job, analysis, content_hash)
-                self.repository.save_processed_job(processed_job)
-                
-                print(f"✓ {job.title} - {analysis['recommendation']} (fit: {analysis['fit_score']})")
-                processed_jobs.append(job)
-                
+                if self._process_item(item):
+                    return item.job
+            except LeaseLostError as e:
+                # Another worker took the item over after our lease expired
+                print(f"Abandoning {item.job.title}: {e}")
+                self._count('leases_lost')
+                tag(outcome='lease_lost')
+            except CircuitOpenError as e:
+                print(f"Parking {item.job.title}: {e}")
+                self._park(item, e)
             except json.JSONDecodeError as e:
-                print(f"Failed to parse AI response for {job.title}: {e}")
-                continue
+                print(f"Failed to parse AI response for {item.job.title}: {e}")
+                self._fail(item, f"Invalid AI response: {e}")
             except Exception as e:
-                print(f"Error processing {job.title}: {str(e)}")
-                continue
+                print(f"Error processing {item.job.title}: {str(e)}")
+                tag(error=type(e).__name__)
+                self._fail(item, str(e))
+            return None
+    
+    def _process_item(self, item: WorkItem) -> bool:
+        """
+        Run the remaining stages of one work item
         
-        return processed_jobs
+        Args:
+            item: Work item, at the stage it last completed
+            
+        Returns:
+            bool: True if the job was saved
+        """
+        job = item.job
+        
+        if item.state == WorkState.DISCOVERED:
+            # Skip if already processed
+            if self.repository.is_job_processed(job.url):
+                print(f"Already processed: {job.title}")
+                self._count('already_processed')
+                self._finish(item, WorkState.SKIPPED, 'already processed')
+                return False
+            
+            if self._preempted(item):
+                return False
+            
+            # Fetch content
+            print(f"Analyzing: {job.title}")
+            content = self.content_analyzer.fetch_content(job.url)
+            if not content:
+                print(f"❌ Skipping {job.title} - {JobPostingType.NONE.value}")
+                self._fail(item, 'No content fetched')
+                return False
+            
+            # Generate content hash for change detection, and a fingerprint for near-duplicates;
+            # the page's validators are kept with the job for conditional re-fetches
+            validators = self.content_analyzer.validators(job.url)
+            self._advance(
+                item, WorkState.FETCHED,
+                content=content,
+                content_hash=self.content_analyzer.generate_content_hash(content),
+                content_fingerprint=self.content_analyzer.generate_content_fingerprint(content),
+                **(validators._asdict() if validators else {})
+            )
+        
+        # Exact job fields from the page's JobPosting data (re-read from the content on resume)
+        posting = self.content_analyzer.find_job_posting(item.content)
+        if posting:
+            item.job = job = posting.apply_to(job)
+        
+        if item.state == WorkState.FETCHED:
+            # Reuse the analysis of a near-duplicate posting (e.g. the same role
+            # syndicated under a different URL) instead of calling the AI again
+            duplicate = self.repository.find_near_duplicate(item.content_fingerprint)
+            if duplicate:
+                processed_job = ProcessedJob.from_job_and_analysis(
+                    job, duplicate.analysis_json, item.content_hash, item.content_fingerprint,
+                    (item.etag, item.last_modified)
+                )
+                self._save(item, processed_job)
+                print(f"♻️  {job.title} - near-duplicate of {duplicate.job_url}, reusing analysis")
+                self._count('near_duplicates_reused')
+                tag(near_duplicate=True)
+                return True
+            
+            # Check if it's an individual job posting; JobPosting data settles it without the AI
+            posting_type = self.content_analyzer.classify_structured(item.content, job.structuredData)
+            if posting_type:
+                self._count('structured_classifications')
+                tag(structured_classification=True)
+            else:
+                posting_type = self.content_analyzer.classify_content(item.content)
+            if posting_type != JobPostingType.INDIVIDUAL:
+                print(f"❌ Skipping {job.title} - {posting_type.value}")
+                self._finish(item, WorkState.SKIPPED, posting_type.value)
+                return False
+            self._advance(item, WorkState.CLASSIFIED)
+        
+        if item.state == WorkState.CLASSIFIED:
+            if self._preempted(item):
+                return False
+            print(f"✅ Processing {job.title}")
+            
+            # Check if content has changed (commented out for now)
+            # if not self.repository.has_content_changed(job.url, item.content_hash):
+            #     print(f"Content unchanged: {job.title}")
+            #     return False
+            
+            # Analyze job fit with AI
+            analysis = self.content_analyzer.analyze_job_fit(item.content, RESUME, PREFERENCES)
+            if not analysis:
+                print(f"AI analysis failed: {job.title}")
+                self._fail(item, 'AI analysis failed')
+                return False
+            self._advance(item, WorkState.ANALYZED, analysis=analysis)
+        
+        # Save to database
+        processed_job = ProcessedJob.from_job_and_analysis(
+            job, item.analysis, item.content_hash, item.content_fingerprint, (item.etag, item.last_modified)
+        )
+        self._save(item, processed_job)
+        
+        print(f"✓ {job.title} - {item.analysis['recommendation']} (fit: {item.analysis['fit_score']})")
+        return True
+    
+    def _count(self, name: str, amount: int = 1) -> None:
+        """Add to a run counter, which several threads may update at once"""
+        with self._stats_lock:
+            self.run_stats[name] += amount
+    
+    def _preempted(self, item: WorkItem) -> bool:
+        """
+        Give the item back if a waiting item has an earlier deadline
+        
+        Checked before the expensive stages, so fetches and LLM calls go to the
+        most urgent items even when better candidates are queued mid-run. The
+        released item keeps its completed stages and is claimed again later.
+        """
+        if self.scheduler is None or self.work_queue is None or item.deadline is None:
+            return False
+        next_deadline = self.work_queue.next_deadline()
+        if next_deadline is None or next_deadline >= item.deadline:
+            return False
+        with span('queue', op='release'):
+            self.work_queue.release(item)
+        self._count('preempted')
+        tag(outcome='preempted')
+        return True
+    
+    def _advance(self, item: WorkItem, state: WorkState, **artifacts) -> None:
+        """Record a completed stage, persisting it when a work queue is used"""
+        if self.work_queue is None:
+            for name, value in artifacts.items():
+                setattr(item, name, value)
+            item.state = state
+        else:
+            with span('queue', op='advance'):
+                self.work_queue.advance(item, state, **artifacts)
+    
+    def _save(self, item: WorkItem, processed_job: ProcessedJob) -> None:
+        """
+        Save a processed job and mark its item saved
+        
+        Behind a write buffer the save only queues the row, so the item keeps its
+        artifacts and lease until the buffer reports the row written (see
+        _on_written). A crash before the flush leaves the item to be saved again
+        instead of marked saved with nothing stored.
+        """
+        if not self._deferred_finish:
+            self.repository.save_processed_job(processed_job)
+            self._finish(item, WorkState.SAVED)
+            return
+        
+        # Registered first: the buffer may write the row before save_processed_job returns
+        with self._stats_lock:
+            self._unwritten[processed_job.job_url] = item
+        try:
+            self.repository.save_processed_job(processed_job)
+        except Exception:
+            with self._stats_lock:
+                self._unwritten.pop(processed_job.job_url, None)
+            raise
+        tag(outcome=WorkState.SAVED.value)
+    
+    def _on_written(self, processed_jobs: List[ProcessedJob]) -> None:
+        """Mark the items of jobs the write buffer has written as saved; runs in the flushing thread"""
+        for processed_job in processed_jobs:
+            with self._stats_lock:
+                item = self._unwritten.pop(processed_job.job_url, None)
+            if item is None:
+                continue
+            try:
+                self.work_queue.finish(item, WorkState.SAVED)
+            except LeaseLostError:
+                # The new owner saves it again
+                self._count('leases_lost')
+    
+    def _finish(self, item: WorkItem, state: WorkState, reason: Optional[str] = None) -> None:
+        tag(outcome=state.value)
+        if self.work_queue is None:
+            item.state = state
+        else:
+            with span('queue', op='finish'):
+                self.work_queue.finish(item, state, reason)
+    
+    def _fail(self, item: WorkItem, error: str) -> None:
+        tag(outcome='failed')
+        if self.work_queue is None:
+            item.state = WorkState.FAILED
+            self._count('failed')
+            return
+        try:
+            with span('queue', op='fail'):
+                self.work_queue.fail(item, error)
+            self._count('failed_attempts')
+        except LeaseLostError:
+            # The new owner retries it
+            self._count('leases_lost')
+    
+    def _park(self, item: WorkItem, error: CircuitOpenError) -> None:
+        """Keep an item whose service is down, with its completed stages, for when the service is probed again"""
+        self._count('parked')
+        tag(outcome='parked')
+        if self.work_queue is None:
+            return
+        try:
+            with span('queue', op='park'):
+                self.work_queue.park(item, error.retry_at, str(error))
+        except LeaseLostError:
+            self._count('leases_lost')
     
     def _show_summary(self, processed_jobs: List[Job]) -> None:
         """
@@ -133,6 +536,53 @@ class JobWorkflow:
         """
         print(f"\\n✓ Successfully processed {len(processed_jobs)} new jobs")
         
+        # Show work avoided by deduplication
+        duplicate_urls = self.job_parser.stats['duplicate_urls_skipped']
+        already_processed = self.run_stats['already_processed']
+        near_duplicates = self.run_stats['near_duplicates_reused']
+        structured = self.run_stats['structured_classifications']
+        print(f"Work avoided - URLs canonicalized: {self.job_parser.stats['urls_canonicalized']}, "
+              f"duplicate URLs in results: {duplicate_urls}, already processed: {already_processed}, "
+              f"near-duplicates reused: {near_duplicates}, classified from JobPosting data: {structured}")
+        print(f"  Saved ~{duplicate_urls + already_processed} fetches and "
+              f"~{2 * (duplicate_urls + already_processed) + 2 * near_duplicates + structured} LLM calls")
+        print(f"  Search results with JobPosting data: {self.job_parser.stats['structured_data']}")
+        if self.watermarks is not None:
+            print(f"  Results posted before the last search: {self.run_stats['older_than_watermark']}"
+                  f"{' (stopped paging)' if self.run_stats['stopped_at_watermark'] else ''}")
+        
+        # Show work carried over between runs
+        if self.work_queue is not None:
+            print(f"Work queue - resumed: {self.run_stats['resumed']}, "
+                  f"failed attempts: {self.run_stats['failed_attempts']}, "
+                  f"leases lost: {self.run_stats['leases_lost']}, "
+                  f"preempted: {self.run_stats['preempted']}, "
+                  f"parked: {self.run_stats['parked']}, "
+                  f"already queued: {self.run_stats['already_queued']}")
+        
+        # Show the live concurrency limits of external services
+        for service, metrics in limiter_metrics().items():
+            details = ', '.join(f"{name}: {value}" for name, value in sorted(metrics.items()))
+            print(f"Limiter {service} - {details}")
+        
+        # Show circuit breakers, with how fast calls to a dead service failed
+        for service, metrics in breaker_metrics().items():
+            details = ', '.join(f"{name}: {value}" for name, value in sorted(metrics.items()))
+            print(f"Circuit {service} - {details}")
+        
+        # Show where the run's time went, by stage (time in nested stages counts only there)
+        summary = self._recorder.summary()
+        for entry in summary['time_breakdown']:
+            stage = summary['stages'][entry['stage']]
+            print(f"Stage {entry['stage']} - count: {stage['count']}, errors: {stage['errors']}, "
+                  f"p50: {stage['p50_ms']} ms, p95: {stage['p95_ms']} ms, "
+                  f"time: {entry['self_s']} s ({entry['share']:.0%})")
+        
+        # Show cache and write buffer counters of the repository stack
+        for component, counters in self.repository.get_runtime_stats().items():
+            details = ', '.join(f"{name}: {value}" for name, value in sorted(counters.items()))
+            print(f"Repository {component} - {details}")
+        
         # Show database statistics
         try:
             stats = self.repository.get_processing_stats()
@@ -141,19 +591,50 @@ class JobWorkflow:
         except Exception as e:
             print(f"Could not retrieve database stats: {e}")
     
-    def reprocess_job(self, job_url: str) -> bool:
+    def _write_run_report(self) -> None:
+        """Write the run's stage timings with its counters, and its trace when enabled"""
+        try:
+            if self.report_path:
+                self._recorder.write_report(self.report_path, {
+                    'run': dict(self.run_stats),
+                    'parser': dict(self.job_parser.stats),
+                    'limiters': limiter_metrics(),
+                    'circuits': breaker_metrics(),
+                    'repository': self.repository.get_runtime_stats(),
+                })
+                print(f"Run report written to {self.report_path}")
+            if self.trace_path:
+                self._recorder.write_trace(self.trace_path)
+                print(f"Run trace written to {self.trace_path}")
+        except Exception as e:
+            print(f"Could not write run report: {e}")
+    
+    def reprocess_job(self, job_url: str, force: bool = False) -> bool:
         """
         Reprocess a single job by URL
         
+        The page is requested with the validators stored when the job was last
+        processed, so an unchanged page is neither downloaded nor analyzed again.
+        
         Args:
             job_url: URL of the job to reprocess
+            force: Fetch and analyze the page even if it is unchanged
             
         Returns:
             bool: True if reprocessing was successful
         """
         try:
+            job_url = self.job_parser.canonicalizer.canonicalize(job_url)
+            existing = None if force else self.repository.get_processed_job(job_url)
+            
             # Analyze content
-            content, posting_type = self.content_analyzer.analyze_job_posting(job_url)
+            try:
+                content, posting_type = self.content_analyzer.analyze_job_posting(
+                    job_url, (existing.etag, existing.last_modified) if existing else None
+                )
+            except ContentNotModifiedError:
+                print(f"✓ Unchanged since it was processed - {existing.recommendation} (fit: {existing.fit_score})")
+                return True
             
             if posting_type != JobPostingType.INDIVIDUAL:
                 print(f"❌ URL is not an individual job posting: {posting_type.value}")
@@ -174,11 +655,14 @@ class JobWorkflow:
                 print("❌ AI analysis failed")
                 return False
             
-            # Generate content hash
+            # Generate content hash and fingerprint
             content_hash = self.content_analyzer.generate_content_hash(content)
+            content_fingerprint = self.content_analyzer.generate_content_fingerprint(content)
             
             # Save to database
-            processed_job = ProcessedJob.from_job_and_analysis(job, analysis, content_hash)
+            processed_job = ProcessedJob.from_job_and_analysis(
+                job, analysis, content_hash, content_fingerprint, self.content_analyzer.validators(job_url)
+            )
             self.repository.save_processed_job(processed_job)
             
             print(f"✓ Reprocessed job - {analysis['recommendation']} (fit: {analysis['fit_score']})")
@@ -194,4 +678,14 @@ class JobWorkflow:
     
     def close(self) -> None:
         """Clean up resources"""
-        self.repository.close()
\ No newline at end of file
+        try:
+            if self.work_queue is not None:
+                try:
+                    if self._deferred_finish:
+                        # Write buffered saves while their items' leases are still held
+                        self.repository.flush()
+                finally:
+                    self.work_queue.close()
+        finally:
+            self.content_analyzer.content_service.close()
+            self.repository.close()
\ No newline at end of file
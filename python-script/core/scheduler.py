@@ -0,0 +1,115 @@
+"""
+Priority scheduling of discovered jobs by freshness and expected fit
+"""
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Iterable, NamedTuple
+
+from job_types import Job
+from repositories.models import utc_now, to_naive_utc
+from utils.text_extractors import TimeExtractor
+
+class Schedule(NamedTuple):
+    """Where a job goes in the work queue"""
+    priority: float  # 0 (least promising) to 1 (most promising)
+    posted_at: Optional[datetime]
+    deadline: datetime
+
+def _term_pattern(terms: Iterable[str]) -> Optional[re.Pattern]:
+    """One pattern matching any of the terms as whole words, case-insensitively"""
+    terms = [re.escape(term.lower()) for term in terms if term]
+    if not terms:
+        return None
+    # Explicit boundaries instead of \b, so terms like "c++" or ".net" still match
+    return re.compile(r'(?<![a-z0-9])(?:' + '|'.join(terms) + r')(?![a-z0-9])')
+
+class PriorityScheduler:
+    """
+    Ranks jobs from the search results alone, before any fetch or LLM call
+    
+    The priority blends freshness (halving every half_life_hours since the
+    posting time) with a cheap fit estimate from the title, snippet and location:
+    preferred terms and locations raise it, avoided title terms lower it.
+    
+    The queue is served earliest deadline first. A job's deadline is its
+    discovery time plus up to max_delay_hours, less for higher priorities, so
+    the best candidates go first while older low-priority jobs still get their
+    turn as newer ones keep arriving. Work items step aside between pipeline
+    stages when a waiting job has an earlier deadline, so the top candidates
+    reach the LLM first even when they are discovered mid-run.
+    """
+    
+    # Freshness assumed for results without a posted time
+    UNKNOWN_FRESHNESS = 0.25
+    
+    def __init__(self,
+                 half_life_hours: float = 48,
+                 max_delay_hours: float = 24,
+                 freshness_weight: float = 0.5,
+                 preferred_terms: Iterable[str] = (),
+                 avoided_terms: Iterable[str] = (),
+                 preferred_locations: Iterable[str] = ()):
+        """
+        Args:
+            half_life_hours: Posting age at which freshness drops to one half
+            max_delay_hours: Deadline offset of a priority-0 job
+            freshness_weight: Share of freshness in the priority; the rest is fit
+            preferred_terms: Title or snippet terms suggesting a good fit
+            avoided_terms: Title terms suggesting a poor fit
+            preferred_locations: Acceptable locations; 'remote' matches remote jobs
+        """
+        self.half_life = timedelta(hours=half_life_hours)
+        self.max_delay = timedelta(hours=max_delay_hours)
+        self.freshness_weight = freshness_weight
+        self.preferred_terms = [term.lower() for term in preferred_terms]
+        self._preferred = _term_pattern(self.preferred_terms)
+        self._avoided = _term_pattern(avoided_terms)
+        self._locations = _term_pattern(preferred_locations)
+    
+    def freshness(self, posted_at: Optional[datetime], now: datetime) -> float:
+        """1 for a job posted now, halving every half_life"""
+        if posted_at is None:
+            return self.UNKNOWN_FRESHNESS
+        age = max(now - posted_at, timedelta(0))
+        return 0.5 ** (age / self.half_life)
+    
+    def fit(self, job: Job) -> float:
+        """Expected fit between 0 and 1 from the search result fields"""
+        title = job.title.lower()
+        text = f"{title} {job.description.lower()}"
+        
+        # Up to three distinct preferred terms count
+        term_score = 0.5
+        if self._preferred:
+            matched = {match.group(0) for match in self._preferred.finditer(text)}
+            term_score = min(len(matched), 3) / min(len(self.preferred_terms), 3)
+        
+        location_score = 0.5
+        if self._locations:
+            location_text = f"{(job.location or '').lower()} {text}"
+            location_score = 1.0 if self._locations.search(location_text) else 0.0
+        
+        score = 0.6 * term_score + 0.4 * location_score
+        if self._avoided and self._avoided.search(title):
+            score *= 0.2
+        return score
+    
+    def schedule(self, job: Job, now: Optional[datetime] = None) -> Schedule:
+        """
+        Priority and deadline of a newly discovered job
+        
+        Args:
+            job: Job parsed from a search result
+            now: Discovery time in naive UTC (default: the current time)
+            
+        Returns:
+            Schedule: Priority, absolute posting time (if known) and deadline, in naive UTC
+        """
+        now = now or utc_now()
+        # Resolved against the search fetch time when parsed; the queue works in naive UTC
+        posted_at = job.posted_at() or TimeExtractor.posted_at_utc(job.postedTime, now.replace(tzinfo=timezone.utc))
+        if posted_at:
+            posted_at = to_naive_utc(posted_at)
+        priority = (self.freshness_weight * self.freshness(posted_at, now) +
+                    (1 - self.freshness_weight) * self.fit(job))
+        return Schedule(round(priority, 4), posted_at, now + self.max_delay * (1 - priority))
\ No newline at end of file
@@ -3,62 +3,335 @@
 Generate a static HTML report from job analysis results in the database.
 """
 
+import argparse
+import hashlib
 import webbrowser
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Iterator, TextIO, Tuple
 import json
 import os
 
 from repositories.factory import RepositoryFactory
-from repositories.base import ProcessedJob
+from repositories.base import ProcessedJob, JobRepository
 from config import Config
+from utils.lazy_json import LazyJSONEncoder
+from utils.report_index import index_entry, build_report_index
 
-def get_job_data() -> List[Dict[str, Any]]:
-    """Fetch all processed jobs from the database"""
+# Mark where the jobs array and its index go when the page is written in streaming mode
+JOBS_PLACEHOLDER = '__JOBS_DATA__'
+INDEX_PLACEHOLDER = '__JOBS_INDEX__'
+
+REPORT_FILE = 'job_results.html'
+SHARD_DIR = 'job_results_data'
+SHARD_SIZE = 500
+BUILD_STATE_FILE = 'build.json'
+# Shards are JS files calling this global, so the page can load them from file://
+SHARD_CALLBACK = '__loadJobShard'
+INDEX_GLOBAL = '__jobIndex'
+
+def create_repository() -> JobRepository:
+    """Create the repository from the current configuration"""
     config = Config()
     
     # Get database config from Config
     db_config = config.get_database_config()
-    repo = RepositoryFactory.create('peewee', database_config=db_config)
-    
-    jobs = repo.get_processed_jobs()
-    
-    # Convert to dictionaries for JSON serialization
-    job_data = []
-    for job in jobs:
-        job_dict = {
-            'id': getattr(job, 'id', None),
-            'title': job.job_title,
-            'company': job.company,
-            'location': job.location,
-            'url': job.job_url,
-            'date_posted': job.posted_time,
-            'salary_range': job.salary,
-            'content_hash': job.content_hash,
-            'recommendation': job.recommendation,
-            'confidence': job.confidence,
-            'fit_score': job.fit_score,
-            'analysis_summary': job.analysis_json,
-            'created_at': job.processed_at.isoformat() if job.processed_at else None,
-            'updated_at': None  # Not available in ProcessedJob model
-        }
-        job_data.append(job_dict)
-    
-    return job_data
+    return RepositoryFactory.create('peewee', database_config=db_config)
+    
+def job_to_dict(job: ProcessedJob) -> Dict[str, Any]:
+    """Convert a processed job to a dictionary for JSON serialization"""
+    return {
+        'id': job.id,
+        'title': job.job_title,
+        'company': job.company,
+        'location': job.location,
+        'url': job.job_url,
+        'date_posted': job.posted_time,
+        'salary_range': job.salary,
+        'content_hash': job.content_hash,
+        'recommendation': job.recommendation,
+        'confidence': job.confidence,
+        'fit_score': job.fit_score,
+        'analysis_summary': job.analysis_json,
+        'created_at': job.processed_at.isoformat() if job.processed_at else None,
+        'updated_at': None  # Not available in ProcessedJob model
+    }
+    
+def iter_job_data(repo: JobRepository) -> Iterator[Dict[str, Any]]:
+    """Stream processed jobs from the database as report dictionaries"""
+    for job in repo.iter_processed_jobs():
+        yield job_to_dict(job)
+    
+def get_job_data(repo: Optional[JobRepository] = None) -> List[Dict[str, Any]]:
+    """
+    Fetch all processed jobs from the database
+    
+    Analysis JSON is passed through as LazyJSONDict and only parsed when the report
+    is serialized, one job at a time.
+    """
+    if repo is None:
+        repo = create_repository()
+    
+    return list(iter_job_data(repo))
 
 def generate_html_template(jobs: List[Dict[str, Any]]) -> str:
     """Generate the complete HTML report"""
     
     # Calculate summary stats
     total_jobs = len(jobs)
-    apply_count = len([j for j in jobs if j['recommendation'] == 'apply'])
-    maybe_count = len([j for j in jobs if j['recommendation'] == 'maybe'])
-    skip_count = len([j for j in jobs if j['recommendation'] == 'skip'])
-    
-    avg_fit_score = sum(j['fit_score'] or 0 for j in jobs) / total_jobs if total_jobs > 0 else 0
+    stats = {
+        'total': total_jobs,
+        'apply_count': len([j for j in jobs if j['recommendation'] == 'apply']),
+        'maybe_count': len([j for j in jobs if j['recommendation'] == 'maybe']),
+        'skip_count': len([j for j in jobs if j['recommendation'] == 'skip']),
+        'avg_fit_score': sum(j['fit_score'] or 0 for j in jobs) / total_jobs if total_jobs > 0 else 0
+    }
     
     # Convert jobs to JSON for JavaScript
-    jobs_json = json.dumps(jobs, indent=2)
+    jobs_json = json.dumps(jobs, indent=2, cls=LazyJSONEncoder)
+    index_json = json.dumps(build_report_index(index_entry(job) for job in jobs), separators=(',', ':'))
+    
+    return render_html(stats, jobs_json, index_json=index_json)
+
+def write_html_report(f: TextIO, repo: JobRepository) -> int:
+    """
+    Stream the HTML report to a file in constant memory
+    
+    Summary stats come from a database aggregate and jobs are serialized into the
+    page one at a time as they are read. Only the compact index entries are kept
+    until the index is written after the jobs.
+    
+    Returns:
+        int: Number of jobs written
+    """
+    page = render_html(repo.get_processing_stats(), JOBS_PLACEHOLDER, index_json=INDEX_PLACEHOLDER)
+    head, tail = page.split(JOBS_PLACEHOLDER)
+    
+    f.write(head)
+    f.write('[')
+    entries = []
+    for job_dict in iter_job_data(repo):
+        if entries:
+            f.write(',')
+        f.write('\n')
+        f.write(json.dumps(job_dict, cls=LazyJSONEncoder))
+        entries.append(index_entry(job_dict))
+    f.write('\n]')
+    f.write(tail.replace(INDEX_PLACEHOLDER, json.dumps(build_report_index(entries), separators=(',', ':'))))
+    
+    return len(entries)
+
+def shard_id_range(shard_id: int, shard_size: int = SHARD_SIZE) -> Tuple[int, int]:
+    """Inclusive id range covered by a shard"""
+    return shard_id * shard_size, (shard_id + 1) * shard_size - 1
+
+def _write_file(path: str, text: str) -> None:
+    """Write a file atomically"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def _content_addressed_name(prefix: str, content: str) -> str:
+    """File name derived from the content, so unchanged files keep their name and cache entry"""
+    return f"{prefix}-{hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]}.js"
+
+def write_shard(data_dir: str, jobs: List[Dict[str, Any]]) -> str:
+    """
+    Write a content-addressed shard file
+    
+    An unchanged shard keeps its name and is not rewritten.
+    
+    Returns:
+        str: Shard file name relative to data_dir
+    """
+    content = json.dumps(jobs, separators=(',', ':'), cls=LazyJSONEncoder)
+    filename = _content_addressed_name('jobs', content)
+    
+    path = os.path.join(data_dir, filename)
+    if not os.path.exists(path):
+        _write_file(path, f"{SHARD_CALLBACK}({json.dumps(filename)},{content});\n")
+    
+    return filename
+
+def write_index(data_dir: str, index: Dict[str, Any]) -> str:
+    """
+    Write the report index as a content-addressed script setting a global
+    
+    Returns:
+        str: Index file name relative to data_dir
+    """
+    content = json.dumps(index, separators=(',', ':'))
+    filename = _content_addressed_name('index', content)
+    
+    path = os.path.join(data_dir, filename)
+    if not os.path.exists(path):
+        _write_file(path, f"window.{INDEX_GLOBAL}={content};\n")
+    
+    return filename
+
+def _entries_file(data_dir: str, shard_id: int) -> str:
+    """Path of the cached index entries for a shard"""
+    return os.path.join(data_dir, f"entries-{shard_id}.json")
+
+def load_build_state(data_dir: str, shard_size: int) -> Dict[str, Any]:
+    """Load the previous build state, or an empty one if it is missing or incompatible"""
+    empty = {'shard_size': shard_size, 'watermark': None, 'shards': {}, 'index': None}
+    try:
+        with open(os.path.join(data_dir, BUILD_STATE_FILE), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return empty
+    
+    if state.get('shard_size') != shard_size:
+        return empty
+    
+    # Every shard in the state has to still be on disk, with its index entries, to be reused
+    shards = {
+        int(shard_id): shard for shard_id, shard in state.get('shards', {}).items()
+        if os.path.exists(os.path.join(data_dir, shard['file']))
+        and os.path.exists(_entries_file(data_dir, int(shard_id)))
+    }
+    index_file = state.get('index')
+    if index_file and not os.path.exists(os.path.join(data_dir, index_file)):
+        index_file = None
+    return {'shard_size': shard_size, 'watermark': state.get('watermark'), 'shards': shards, 'index': index_file}
+
+def save_build_state(data_dir: str, state: Dict[str, Any]) -> None:
+    """Persist the build state atomically"""
+    _write_file(os.path.join(data_dir, BUILD_STATE_FILE), json.dumps(state, indent=2))
+
+def find_changed_shards(repo: JobRepository, state: Dict[str, Any],
+                        bucket_counts: Dict[int, int]) -> Tuple[set, Optional[str]]:
+    """
+    Work out which shards need rebuilding since the last build
+    
+    Rows processed after the previous watermark mark their shard as changed, and a
+    per-shard row count comparison catches inserts and deletes (e.g. rows merged by
+    URL canonicalization) that did not move the watermark. URLs rewritten in place
+    by merge_duplicate_urls get a new processed_at, so they move it.
+    
+    Returns:
+        Tuple[set, Optional[str]]: Changed shard ids and the new watermark
+    """
+    shard_size = state['shard_size']
+    watermark = state['watermark']
+    changed = set()
+    
+    if watermark:
+        # Newest first, so the first row carries the new watermark
+        for job in repo.iter_processed_jobs({'processed_after': datetime.fromisoformat(watermark)}):
+            if job.processed_at and job.processed_at.isoformat() > watermark:
+                watermark = job.processed_at.isoformat()
+            changed.add(job.id // shard_size)
+    else:
+        newest = next(repo.iter_processed_jobs(batch_size=1), None)
+        if newest and newest.processed_at:
+            watermark = newest.processed_at.isoformat()
+    
+    for shard_id, count in bucket_counts.items():
+        previous = state['shards'].get(shard_id)
+        if previous is None or previous['count'] != count:
+            changed.add(shard_id)
+    
+    return changed, watermark
+
+def build_sharded_report(repo: JobRepository,
+                         output_file: str = REPORT_FILE,
+                         data_dir: str = SHARD_DIR,
+                         shard_size: int = SHARD_SIZE,
+                         full: bool = False) -> Dict[str, int]:
+    """
+    Build the report as a small page plus lazily loaded job shards
+    
+    Jobs are grouped into shards of shard_size consecutive ids. Only shards whose
+    rows changed since the previous build are read from the database and rewritten,
+    so build time follows the number of new rows rather than the table size.
+    
+    Args:
+        repo: Repository to read jobs from
+        output_file: Path of the HTML page
+        data_dir: Directory for shard files and the build state
+        shard_size: Number of ids per shard
+        full: Ignore the previous build state and rebuild every shard
+        
+    Returns:
+        Dict[str, int]: 'jobs', 'shards' and 'rebuilt' counts
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    state = {'shard_size': shard_size, 'watermark': None, 'shards': {}, 'index': None} if full \
+        else load_build_state(data_dir, shard_size)
+    
+    bucket_counts = repo.get_id_bucket_counts(shard_size)
+    changed, watermark = find_changed_shards(repo, state, bucket_counts)
+    
+    shards = {shard_id: shard for shard_id, shard in state['shards'].items() if shard_id in bucket_counts}
+    for shard_id in sorted(changed & bucket_counts.keys()):
+        min_id, max_id = shard_id_range(shard_id, shard_size)
+        jobs = [job_to_dict(job) for job in repo.iter_processed_jobs({'min_id': min_id, 'max_id': max_id})]
+        jobs.sort(key=lambda job: job['id'], reverse=True)
+        shards[shard_id] = {'file': write_shard(data_dir, jobs), 'count': len(jobs)}
+        _write_file(_entries_file(data_dir, shard_id), json.dumps([index_entry(job) for job in jobs]))
+    
+    # The index is merged from the cached per-shard entries, without touching the database
+    index_file = state['index']
+    if index_file is None or changed or shards.keys() != state['shards'].keys():
+        entries = []
+        for shard_id in shards:
+            with open(_entries_file(data_dir, shard_id), 'r', encoding='utf-8') as f:
+                entries.extend(json.load(f))
+        index_file = write_index(data_dir, build_report_index(entries))
+    
+    # Drop files that no longer belong to the report
+    live_files = {shard['file'] for shard in shards.values()} | {index_file}
+    live_files.update(os.path.basename(_entries_file(data_dir, shard_id)) for shard_id in shards)
+    for filename in os.listdir(data_dir):
+        if filename.startswith(('jobs-', 'index-', 'entries-')) and filename not in live_files:
+            os.remove(os.path.join(data_dir, filename))
+    
+    manifest = [
+        {'shard': shard_id, 'file': shards[shard_id]['file'], 'count': shards[shard_id]['count']}
+        for shard_id in sorted(shards, reverse=True)
+    ]
+    shard_base = os.path.relpath(data_dir, os.path.dirname(os.path.abspath(output_file)) or '.')
+    html = render_html(repo.get_processing_stats(), '[]',
+                       shards_json=json.dumps(manifest),
+                       shard_base=shard_base.replace(os.sep, '/') + '/',
+                       shard_size=shard_size,
+                       index_file=index_file)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(html)
+    
+    save_build_state(data_dir, {
+        'shard_size': shard_size,
+        'watermark': watermark,
+        'shards': {str(shard_id): shard for shard_id, shard in shards.items()},
+        'index': index_file,
+    })
+    
+    return {
+        'jobs': sum(shard['count'] for shard in shards.values()),
+        'shards': len(shards),
+        'rebuilt': len(changed & bucket_counts.keys()),
+    }
+
+def render_html(stats: Dict[str, Any], jobs_json: str,
+                index_json: str = 'null',
+                shards_json: str = '[]', shard_base: str = '', shard_size: int = SHARD_SIZE,
+                index_file: Optional[str] = None) -> str:
+    """
+    Render the report page around serialized jobs JSON
+    
+    jobs_json is embedded in the page; shards_json is a manifest of shard files
+    (newest first) that the page loads from shard_base as they are needed. The
+    report index is either embedded as index_json or loaded from index_file.
+    """
+    total_jobs = stats['total']
+    apply_count = stats['apply_count']
+    maybe_count = stats['maybe_count']
+    skip_count = stats['skip_count']
+    avg_fit_score = stats['avg_fit_score']
+    shard_base_json = json.dumps(shard_base)
+    index_script = f'<script src="{shard_base}{index_file}"></script>' if index_file else ''
     
     html_template = f"""<!DOCTYPE html>
 <html lang="en">
@@ -141,8 +414,10 @@ def generate_html_template(jobs: List[Dict[str, Any]]) -> str:
                     </button>
                 </div>
                 <div class="flex items-center gap-4">
+                    <span id="result-count" class="text-sm text-gray-600"></span>
                     <label class="text-sm text-gray-600">Sort by:</label>
                     <select id="sort-select" class="px-3 py-2 border border-gray-300 rounded-lg">
+                        <option value="newest">Newest</option>
                         <option value="fit_score">Fit Score</option>
                         <option value="date_posted">Date Posted</option>
                         <option value="company">Company</option>
@@ -150,12 +425,28 @@ def generate_html_template(jobs: List[Dict[str, Any]]) -> str:
                     </select>
                 </div>
             </div>
+            <div class="flex flex-wrap gap-4 items-center mt-4">
+                <input id="search-input" type="search" placeholder="Search titles and summaries..."
+                       class="flex-1 min-w-[16rem] px-3 py-2 border border-gray-300 rounded-lg">
+                <select id="facet-company" data-facet="company" class="px-3 py-2 border border-gray-300 rounded-lg">
+                    <option value="">All companies</option>
+                </select>
+                <select id="facet-location" data-facet="location" class="px-3 py-2 border border-gray-300 rounded-lg">
+                    <option value="">All locations</option>
+                </select>
+                <select id="facet-technology" data-facet="technology" class="px-3 py-2 border border-gray-300 rounded-lg">
+                    <option value="">All technologies</option>
+                </select>
+            </div>
         </div>
 
         <!-- Jobs Grid -->
         <div id="jobs-container" class="grid grid-cols-1 lg:grid-cols-2 xl:grid-cols-3 gap-6">
             <!-- Jobs will be rendered here by JavaScript -->
         </div>
+        
+        <!-- Scroll sentinel: more jobs are rendered or loaded when it comes into view -->
+        <div id="load-more" class="text-center py-8 text-gray-500 hidden">Loading more jobs...</div>
 
         <!-- Empty State -->
         <div id="empty-state" class="text-center py-12 hidden">
@@ -165,13 +456,36 @@ def generate_html_template(jobs: List[Dict[str, Any]]) -> str:
         </div>
     </div>
 
+    {index_script}
     <script>
-        // Job data
+        // Job data: embedded jobs plus shard files loaded on demand, newest first
         const jobsData = {jobs_json};
+        const shardManifest = {shards_json};
+        const shardBase = {shard_base_json};
+        const shardSize = {shard_size};
+        const PAGE_SIZE = 24;
+        const FACET_OPTION_LIMIT = 200;
+        
+        // Precomputed facets, sort orders and search terms (see utils/report_index.py)
+        const jobIndex = {index_json} || window.{INDEX_GLOBAL};
+        
+        // Jobs by id, from the embedded data and from shards as they load
+        const jobsById = new Map(jobsData.map(job => [job.id, job]));
+        const shardFiles = new Map(shardManifest.map(shard => [shard.shard, shard.file]));
+        const shardLoads = new Map();
+        
+        // Shard files call this when they load
+        window.{SHARD_CALLBACK} = (file, jobs) => {{
+            for (const job of jobs) jobsById.set(job.id, job);
+        }};
         
         // State
         let currentFilter = 'all';
         let currentSort = 'fit_score';
+        let searchQuery = '';
+        const facetFilters = {{}};
+        let visibleCount = PAGE_SIZE;
+        let renderToken = 0;
         
         // Initialize Lucide icons
         lucide.createIcons();
@@ -180,6 +494,10 @@ def generate_html_template(jobs: List[Dict[str, Any]]) -> str:
         const jobsContainer = document.getElementById('jobs-container');
         const emptyState = document.getElementById('empty-state');
         const sortSelect = document.getElementById('sort-select');
+        const loadMore = document.getElementById('load-more');
+        const resultCount = document.getElementById('result-count');
+        const searchInput = document.getElementById('search-input');
+        const facetSelects = document.querySelectorAll('select[data-facet]');
         
         // Filter buttons
         const filterButtons = {{
@@ -313,39 +631,136 @@ def generate_html_template(jobs: List[Dict[str, Any]]) -> str:
             `;
         }}
         
-        function filterJobs() {{
-            let filtered = jobsData;
+        // Index helpers
+        function decodeIds(deltas) {{
+            const ids = new Array(deltas.length);
+            let id = 0;
+            for (let i = 0; i < deltas.length; i++) {{
+                id += deltas[i];
+                ids[i] = id;
+            }}
+            return ids;
+        }}
+            
+        const facetPostings = Object.fromEntries(
+            Object.entries(jobIndex.facets).map(([name, values]) => [name, new Map(values)])
+        );
+        const searchTerms = Object.keys(jobIndex.terms);
+        const setCache = new Map();
+        const sortCache = new Map();
+        
+        function facetIds(name, value) {{
+            const key = `${{name}}:${{value}}`;
+            if (!setCache.has(key)) {{
+                setCache.set(key, new Set(decodeIds(facetPostings[name].get(value) || [])));
+            }}
+            return setCache.get(key);
+        }}
+        
+        function searchIds(query) {{
+            const key = `search:${{query}}`;
+            if (setCache.has(key)) return setCache.get(key);
+            
+            // Every word has to match, as a prefix of an indexed term
+            const words = (query.toLowerCase().match(/[a-z0-9][a-z0-9+#.]*/g) || [])
+                .map(word => word.replace(/\\.+$/, ''))
+                .filter(word => word.length > 0);
+            let result = null;
+            for (const word of words) {{
+                const matches = new Set();
+                for (const term of searchTerms) {{
+                    if (term.startsWith(word)) {{
+                        for (const id of decodeIds(jobIndex.terms[term])) matches.add(id);
+                    }}
+                }}
+                result = result === null ? matches : new Set([...result].filter(id => matches.has(id)));
+                if (result.size === 0) break;
+            }}
             
-            // Apply recommendation filter
-            if (currentFilter !== 'all') {{
-                filtered = filtered.filter(job => job.recommendation === currentFilter);
+            setCache.set(key, result);
+            return result;
+        }}
+        
+        function sortOrder() {{
+            if (!sortCache.has(currentSort)) {{
+                sortCache.set(currentSort, currentSort === 'newest'
+                    ? decodeIds(jobIndex.ids).reverse()
+                    : jobIndex.sorts[currentSort]);
+            }}
+            return sortCache.get(currentSort);
+        }}
+        
+        function matchingIds() {{
+            const sets = [];
+            if (currentFilter !== 'all') sets.push(facetIds('recommendation', currentFilter));
+            for (const [name, value] of Object.entries(facetFilters)) {{
+                if (value) sets.push(facetIds(name, value));
             }}
+            if (searchQuery) {{
+                const ids = searchIds(searchQuery);
+                if (ids) sets.push(ids);
+            }}
+            
+            const order = sortOrder();
+            if (sets.length === 0) return order;
             
-            return filtered;
+            // Check the most selective set first
+            sets.sort((a, b) => a.size - b.size);
+            return order.filter(id => sets.every(set => set.has(id)));
         }}
         
-        function sortJobs(jobs) {{
-            return [...jobs].sort((a, b) => {{
-                switch(currentSort) {{
-                    case 'fit_score':
-                        return (b.fit_score || 0) - (a.fit_score || 0);
-                    case 'date_posted':
-                        return new Date(b.date_posted || 0) - new Date(a.date_posted || 0);
-                    case 'company':
-                        return (a.company || '').localeCompare(b.company || '');
-                    case 'title':
-                        return (a.title || '').localeCompare(b.title || '');
-                    default:
-                        return 0;
+        function populateFacetSelects() {{
+            facetSelects.forEach(select => {{
+                const values = jobIndex.facets[select.dataset.facet] || [];
+                for (const [value, ids] of values.slice(0, FACET_OPTION_LIMIT)) {{
+                    select.add(new Option(`${{value}} (${{ids.length}})`, value));
                 }}
             }});
         }}
         
-        function renderJobs() {{
-            const filtered = filterJobs();
-            const sorted = sortJobs(filtered);
+        // Shard loading
+        function loadShard(file) {{
+            if (!shardLoads.has(file)) {{
+                shardLoads.set(file, new Promise(resolve => {{
+                    const script = document.createElement('script');
+                    script.src = shardBase + file;
+                    script.onload = () => resolve();
+                    script.onerror = () => {{
+                        // Render what is available rather than stalling the page
+                        console.error(`Could not load ${{file}}`);
+                        resolve();
+                    }};
+                    document.head.appendChild(script);
+                }}));
+            }}
+            return shardLoads.get(file);
+        }}
+            
+        function loadJobs(ids) {{
+            const files = new Set();
+            for (const id of ids) {{
+                if (!jobsById.has(id) && shardFiles.has(Math.floor(id / shardSize))) {{
+                    files.add(shardFiles.get(Math.floor(id / shardSize)));
+                }}
+            }}
+            return Promise.all([...files].map(loadShard));
+        }}
+        
+        async function renderJobs() {{
+            const token = ++renderToken;
+            const ids = matchingIds();
+            const visibleIds = ids.slice(0, visibleCount);
+            resultCount.textContent = `${{ids.length}} job${{ids.length === 1 ? '' : 's'}}`;
+            
+            // Only the shards holding the jobs on screen are fetched
+            await loadJobs(visibleIds);
+            
+            // A newer filter or sort change started its own render
+            if (token !== renderToken) return;
+            
+            loadMore.classList.toggle('hidden', ids.length <= visibleCount);
             
-            if (sorted.length === 0) {{
+            if (ids.length === 0) {{
                 jobsContainer.classList.add('hidden');
                 emptyState.classList.remove('hidden');
                 return;
@@ -354,10 +769,18 @@ def generate_html_template(jobs: List[Dict[str, Any]]) -> str:
             jobsContainer.classList.remove('hidden');
             emptyState.classList.add('hidden');
             
-            jobsContainer.innerHTML = sorted.map(createJobCard).join('');
+            jobsContainer.innerHTML = visibleIds
+                .map(id => jobsById.get(id))
+                .filter(Boolean)
+                .map(createJobCard)
+                .join('');
             
             // Re-initialize Lucide icons for new content
             lucide.createIcons();
+            
+            // Re-observing fires again if the sentinel is still on screen
+            loadMoreObserver.unobserve(loadMore);
+            loadMoreObserver.observe(loadMore);
         }}
         
         function updateFilterButtons() {{
@@ -389,6 +812,7 @@ def generate_html_template(jobs: List[Dict[str, Any]]) -> str:
         Object.entries(filterButtons).forEach(([filter, button]) => {{
             button.addEventListener('click', () => {{
                 currentFilter = filter;
+                visibleCount = PAGE_SIZE;
                 updateFilterButtons();
                 renderJobs();
             }});
@@ -396,10 +820,38 @@ def generate_html_template(jobs: List[Dict[str, Any]]) -> str:
         
         sortSelect.addEventListener('change', (e) => {{
             currentSort = e.target.value;
+            visibleCount = PAGE_SIZE;
             renderJobs();
         }});
         
+        facetSelects.forEach(select => {{
+            select.addEventListener('change', () => {{
+                facetFilters[select.dataset.facet] = select.value;
+                visibleCount = PAGE_SIZE;
+                renderJobs();
+            }});
+        }});
+        
+        let searchTimer = null;
+        searchInput.addEventListener('input', () => {{
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => {{
+                searchQuery = searchInput.value.trim();
+                visibleCount = PAGE_SIZE;
+                renderJobs();
+            }}, 150);
+        }});
+        
+        // Render the next page (loading shards as needed) when the sentinel scrolls into view
+        const loadMoreObserver = new IntersectionObserver(entries => {{
+            if (!loadMore.classList.contains('hidden') && entries.some(entry => entry.isIntersecting)) {{
+                visibleCount += PAGE_SIZE;
+                renderJobs();
+            }}
+        }}, {{ rootMargin: '400px' }});
+        
         // Initial render
+        populateFacetSelects();
         updateFilterButtons();
         renderJobs();
     </script>
@@ -410,27 +862,39 @@ def generate_html_template(jobs: List[Dict[str, Any]]) -> str:
 
 def main():
     """Main function to generate and open the HTML report"""
+    parser = argparse.ArgumentParser(description="Generate the job search HTML report")
+    parser.add_argument('--full', action='store_true',
+                        help="rebuild every shard instead of only those that changed")
+    parser.add_argument('--single-file', action='store_true',
+                        help="embed all jobs in one self-contained HTML file")
+    parser.add_argument('--no-open', action='store_true', help="do not open the report in a browser")
+    args = parser.parse_args()
+    
     print("Generating job search report...")
     
     try:
-        # Fetch job data
-        jobs = get_job_data()
-        print(f"Found {len(jobs)} jobs in database")
+        repo = create_repository()
         
-        # Generate HTML
-        html_content = generate_html_template(jobs)
+        output_file = REPORT_FILE
+        if args.single_file:
+            # Stream jobs from the database straight into the HTML file
+            with open(output_file, 'w', encoding='utf-8') as f:
+                count = write_html_report(f, repo)
+            print(f"Found {count} jobs in database")
+        else:
+            result = build_sharded_report(repo, output_file, full=args.full)
+            print(f"Found {result['jobs']} jobs in database")
+            print(f"Rebuilt {result['rebuilt']} of {result['shards']} shards in {SHARD_DIR}/")
         
-        # Write to file
-        output_file = "job_results.html"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        repo.close()
         
         print(f"Report generated: {output_file}")
         
-        # Open in browser
-        file_path = os.path.abspath(output_file)
-        webbrowser.open(f"file://{file_path}")
-        print("Opening report in browser...")
+        if not args.no_open:
+            # Open in browser
+            file_path = os.path.abspath(output_file)
+            webbrowser.open(f"file://{file_path}")
+            print("Opening report in browser...")
         
     except Exception as e:
         print(f"Error generating report: {str(e)}")
@@ -45,9 +45,20 @@ def init_database():
         print("  - confidence (INTEGER: 1-5)")
         print("  - fit_score (INTEGER: 1-5)")
         print("  - analysis_json (TEXT)")
+        print("  - salary_min, salary_max (INTEGER, yearly)")
+        print("  - is_remote (BOOLEAN)")
         print("  - processed_at (TIMESTAMP)")
         print("  - content_hash (TEXT)")
         print("  - processing_version (TEXT)")
+        print("Table: job_fingerprints")
+        print("  - job_url (TEXT, UNIQUE)")
+        print("  - fingerprint (TEXT: 64-bit SimHash)")
+        print("  - band0..band3 (INTEGER, INDEXED)")
+        print("Table: job_technologies")
+        print("  - job_url (TEXT)")
+        print("  - technology (TEXT, lowercased)")
+        if repo.full_text_index is not None:
+            print("Full-text index: title, company, job/fit summary, key technologies")
         
         repo.close()
         
@@ -98,6 +109,7 @@ def show_database_info():
         print(f"Skip recommendations: {stats['skip_count']}")
         print(f"Average fit score: {stats['avg_fit_score']}")
         print(f"Average confidence: {stats['avg_confidence']}")
+        print(f"Schema version: {repo.get_schema_status()['version']}")
         
         if stats['total'] > 0:
             print(f"\n📝 Recent jobs:")
@@ -110,6 +122,192 @@ def show_database_info():
     except Exception as e:
         print(f"❌ Error accessing database: {e}")
 
+def canonicalize_urls():
+    """Rewrite stored job URLs to canonical form and merge duplicate rows"""
+    
+    from utils.url_utils import URLCanonicalizer
+    
+    print("🔗 Canonicalizing stored job URLs...")
+    
+    try:
+        repo = RepositoryFactory.create('peewee', database_config=config.get_database_config())
+        
+        counts = repo.merge_duplicate_urls(URLCanonicalizer().canonicalize)
+        
+        print(f"✅ Rewrote {counts['rewritten']} URLs, merged {counts['merged']} duplicate rows")
+        
+        repo.close()
+    
+    except Exception as e:
+        print(f"❌ Error canonicalizing URLs: {e}")
+        return False
+    
+    return True
+
+def rebuild_search_index():
+    """Rebuild the full-text search index from the processed jobs table"""
+    
+    print("🔎 Rebuilding full-text search index...")
+    
+    try:
+        repo = RepositoryFactory.create('peewee', database_config=config.get_database_config())
+        
+        count = repo.rebuild_search_index()
+        
+        print(f"✅ Indexed {count} jobs")
+        
+        repo.close()
+    
+    except Exception as e:
+        print(f"❌ Error rebuilding search index: {e}")
+        return False
+    
+    return True
+
+def migrate_database():
+    """Apply pending schema migrations, reporting backfill progress"""
+    
+    print("🧱 Migrating database schema...")
+    
+    def report(migration, last_id, max_id):
+        percent = 100 * last_id // max_id if max_id else 100
+        print(f"  {migration.version}: {migration.name} - {percent}% (id {last_id}/{max_id})", end='\r', flush=True)
+    
+    try:
+        # Skip the automatic migration so progress can be shown
+        db_config = {**config.get_database_config(), 'auto_migrate': False}
+        repo = RepositoryFactory.create('peewee', database_config=db_config)
+        
+        status = repo.get_schema_status()
+        print(f"Schema version: {status['version']} (latest {status['latest']})")
+        if status['backfill_position']:
+            print(f"Resuming backfill after id {status['backfill_position']}")
+        for name in status['pending']:
+            print(f"  pending {name}")
+        
+        applied = repo.migrate(progress=report)
+        
+        print(f"\n✅ Applied {applied} migrations")
+        
+        repo.close()
+    
+    except Exception as e:
+        print(f"\n❌ Error migrating database: {e}")
+        return False
+    
+    return True
+
+def rebuild_seen_filter():
+    """Rebuild the Bloom filter of processed job URLs from the database"""
+    
+    from repositories.bloom import BloomFilterJobRepository, default_filter_path
+    
+    print("🌸 Rebuilding seen-URL filter...")
+    
+    try:
+        db_config = config.get_database_config()
+        options = {'path': default_filter_path(db_config), **db_config.get('seen_filter', {})}
+        repo = BloomFilterJobRepository(
+            RepositoryFactory.create('peewee', database_config=db_config), **options
+        )
+        
+        count = repo.rebuild()
+        stats = repo.get_runtime_stats()['seen_filter']
+        
+        print(f"✅ Added {count} URLs to {options['path']} (capacity {stats['capacity']}, "
+              f"estimated false-positive rate {stats['estimated_error_rate']:.4%})")
+        
+        repo.close()
+    
+    except Exception as e:
+        print(f"❌ Error rebuilding seen-URL filter: {e}")
+        return False
+    
+    return True
+
+def show_work_queue():
+    """Show the number of queued jobs in each pipeline state"""
+    
+    from repositories.work_queue import WorkQueue
+    
+    try:
+        repo = RepositoryFactory.create('peewee', database_config=config.get_database_config())
+        counts = WorkQueue(repo.db, repo.db_type).counts()
+        
+        print("\n📬 Work queue:")
+        if not counts:
+            print("  (empty)")
+        for state, count in sorted(counts.items()):
+            print(f"  {state}: {count}")
+        
+        repo.close()
+    
+    except Exception as e:
+        print(f"❌ Error reading work queue: {e}")
+        return False
+    
+    return True
+
+def search_jobs(query: str):
+    """Search processed jobs by title, company and analysis text"""
+    
+    try:
+        repo = RepositoryFactory.create('peewee', database_config=config.get_database_config())
+        
+        jobs = repo.search_processed_jobs(query, limit=20)
+        
+        print(f"\n🔎 {len(jobs)} jobs matching '{query}':")
+        for job in jobs:
+            print(f"  • {job.job_title} at {job.company or 'Unknown'} - {job.recommendation} (fit {job.fit_score}/5)")
+            print(f"    {job.job_url}")
+        
+        repo.close()
+    
+    except Exception as e:
+        print(f"❌ Error searching jobs: {e}")
+        return False
+    
+    return True
+
+def export_jobs(output_path: str):
+    """Export all processed jobs as JSON Lines, streaming from the database"""
+    
+    import json
+    from utils.lazy_json import LazyJSONEncoder
+    
+    try:
+        repo = RepositoryFactory.create('peewee', database_config=config.get_database_config())
+        
+        count = 0
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for job in repo.iter_processed_jobs():
+                record = {
+                    'job_url': job.job_url,
+                    'job_title': job.job_title,
+                    'company': job.company,
+                    'location': job.location,
+                    'posted_time': job.posted_time,
+                    'salary': job.salary,
+                    'recommendation': job.recommendation,
+                    'confidence': job.confidence,
+                    'fit_score': job.fit_score,
+                    'analysis': job.analysis_json,
+                    'processed_at': job.processed_at.isoformat() if job.processed_at else None,
+                    'content_hash': job.content_hash
+                }
+                f.write(json.dumps(record, cls=LazyJSONEncoder) + '\n')
+                count += 1
+        
+        print(f"✅ Exported {count} jobs to {output_path}")
+        
+        repo.close()
+    
+    except Exception as e:
+        print(f"❌ Error exporting jobs: {e}")
+        return False
+    
+    return True
+
 if __name__ == '__main__':
     import sys
     
@@ -122,11 +320,32 @@ if __name__ == '__main__':
             show_database_info()
         elif command == 'init':
             init_database()
+        elif command == 'canonicalize':
+            canonicalize_urls()
+        elif command == 'export':
+            export_jobs(sys.argv[2] if len(sys.argv) > 2 else 'jobs_export.jsonl')
+        elif command == 'migrate':
+            migrate_database()
+        elif command == 'rebuild-seen':
+            rebuild_seen_filter()
+        elif command == 'queue':
+            show_work_queue()
+        elif command == 'reindex':
+            rebuild_search_index()
+        elif command == 'search' and len(sys.argv) > 2:
+            search_jobs(' '.join(sys.argv[2:]))
         else:
             print("Available commands:")
-            print("  init  - Initialize database and create tables")
-            print("  reset - Reset database (deletes all data)")
-            print("  info  - Show database statistics")
+            print("  init         - Initialize database and create tables")
+            print("  reset        - Reset database (deletes all data)")
+            print("  info         - Show database statistics")
+            print("  canonicalize - Canonicalize job URLs and merge duplicates")
+            print("  export [path] - Export processed jobs as JSON Lines")
+            print("  migrate      - Apply pending schema migrations and backfills")
+            print("  reindex      - Rebuild the full-text search index")
+            print("  rebuild-seen - Rebuild the Bloom filter of processed job URLs")
+            print("  queue        - Show work queue items by pipeline state")
+            print("  search <query> - Search processed jobs")
     else:
         # Default: initialize database
         init_database()
\ No newline at end of file
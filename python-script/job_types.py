@@ -1,9 +1,9 @@
 from dataclasses import dataclass, field, asdict
 from typing import Optional, Dict, Any, List
-from datetime import datetime
+from datetime import datetime, timezone
 import json
 
-@dataclass
+@dataclass(slots=True)
 class Job:
     """Represents a job listing from a search result."""
     id: str
@@ -16,11 +16,19 @@ class Job:
     employmentType: str = "Full-time"
     salary: Optional[str] = None
     logoUrl: Optional[str] = None
+    structuredData: bool = False  # Fields come from a schema.org JobPosting
+    postedAt: Optional[str] = None  # Absolute posting time, ISO 8601 UTC, resolved when parsed
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert the Job object to a dictionary."""
         return asdict(self)
     
+    def posted_at(self) -> Optional[datetime]:
+        """The absolute posting time as a timezone-aware UTC datetime, if known"""
+        if not self.postedAt:
+            return None
+        return datetime.fromisoformat(self.postedAt).astimezone(timezone.utc)
+    
     def is_remote(self) -> bool:
         """Check if this is a remote job based on title or location."""
         title_lower = self.title.lower()
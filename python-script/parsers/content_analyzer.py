@@ -5,9 +5,10 @@ from typing import Optional, Dict, Any
 from enum import Enum
 import json
 from services.ai_service import AIService, AnalysisType
-from services.content_service import ContentService
-from utils.error_handling import AIAnalysisError, ContentFetchError
-from utils.hash_utils import ContentHasher
+from services.content_service import BaseContentService, PageValidators
+from utils.error_handling import AIAnalysisError, ContentFetchError, ContentNotModifiedError, CircuitOpenError
+from utils.hash_utils import ContentHasher, SimHasher
+from parsers.structured_data import JobPostingData
 
 class JobPostingType(Enum):
     """Types of job posting content"""
@@ -18,48 +19,42 @@ class JobPostingType(Enum):
 class ContentAnalyzer:
     """Analyzer for job posting content using AI"""
     
-    def __init__(self, ai_service: AIService, content_service: ContentService):
+    def __init__(self, ai_service: AIService, content_service: BaseContentService):
         self.ai_service = ai_service
         self.content_service = content_service
         self.hasher = ContentHasher()
+        self.simhasher = SimHasher()
     
-    def analyze_job_posting(self, url: str) -> tuple[Optional[str], JobPostingType]:
+    def analyze_job_posting(self, url: str,
+                            validators: Optional[PageValidators] = None) -> tuple[Optional[str], JobPostingType]:
         """
         Analyze a URL to determine if it contains an individual job posting
         
         Args:
             url: URL to analyze
+            validators: Validators of an earlier fetch of the page, for a conditional request
             
         Returns:
             tuple: (content, posting_type) where content is the page content if it's
                    an individual job posting, None otherwise; posting_type indicates
                    the type of content found
+                   
+        Raises:
+            ContentNotModifiedError: If the page is unchanged since validators
         """
         try:
             # Fetch content
-            content = self.content_service.fetch_content(url)
+            content = self.content_service.fetch_content(url, validators)
             if not content:
                 return None, JobPostingType.NONE
             
-            # Analyze content with AI
-            analysis_result = self.ai_service.analyze_content(
-                content, 
-                AnalysisType.JOB_POSTING_CLASSIFICATION
-            )
-            
-            # Parse result
-            result_upper = analysis_result.strip().upper()
+            posting_type = self.classify_structured(content) or self.classify_content(content)
+            if posting_type == JobPostingType.INDIVIDUAL:
+                return content, posting_type
+            return None, posting_type
             
-            if "INDIVIDUAL" in result_upper:
-                return content, JobPostingType.INDIVIDUAL
-            elif "LISTING" in result_upper:
-                return None, JobPostingType.LISTING
-            elif "NONE" in result_upper:
-                return None, JobPostingType.NONE
-            else:
-                # Unclear response, treat as non-individual
-                return None, JobPostingType.NONE
-                
+        except ContentNotModifiedError:
+            raise
         except ContentFetchError as e:
             print(f"  ❌ Content fetch failed: {e}")
             return None, JobPostingType.NONE
@@ -70,6 +65,79 @@ class ContentAnalyzer:
             print(f"  ❌ Unexpected error: {e}")
             return None, JobPostingType.NONE
     
+    def fetch_content(self, url: str) -> Optional[str]:
+        """
+        Fetch page content without classifying it
+        
+        Args:
+            url: URL to fetch
+            
+        Returns:
+            str: The page content, or None if fetching failed
+            
+        Raises:
+            CircuitOpenError: If the content service is down
+        """
+        try:
+            return self.content_service.fetch_content(url)
+        except ContentFetchError as e:
+            print(f"  ❌ Content fetch failed: {e}")
+            return None
+    
+    def validators(self, url: str) -> Optional[PageValidators]:
+        """Validators of the page's last fetch, to store for conditional requests later"""
+        return self.content_service.validators(url)
+    
+    def find_job_posting(self, content: Optional[str]) -> Optional[JobPostingData]:
+        """JobPosting data carried by fetched content (see LocalContentService), if any"""
+        return JobPostingData.from_content(content)
+    
+    def classify_structured(self, content: Optional[str], structured: bool = False) -> Optional[JobPostingType]:
+        """
+        Classify without AI when the page is known to describe one job
+        
+        Args:
+            content: Fetched page content
+            structured: The search result already carried JobPosting data for this page
+            
+        Returns:
+            JobPostingType: INDIVIDUAL if the result or page has the data of exactly one
+                            JobPosting, otherwise None (left to the classifier)
+        """
+        if structured or self.find_job_posting(content):
+            return JobPostingType.INDIVIDUAL
+        return None
+    
+    def classify_content(self, content: str) -> JobPostingType:
+        """
+        Classify already fetched content with AI
+        
+        Args:
+            content: Page content to classify
+            
+        Returns:
+            JobPostingType: The type of content found
+            
+        Raises:
+            AIAnalysisError: If the AI call fails
+            CircuitOpenError: If the AI backend is down
+        """
+        analysis_result = self.ai_service.analyze_content(
+            content,
+            AnalysisType.JOB_POSTING_CLASSIFICATION
+        )
+        
+        # Parse result
+        result_upper = analysis_result.strip().upper()
+        
+        if "INDIVIDUAL" in result_upper:
+            return JobPostingType.INDIVIDUAL
+        elif "LISTING" in result_upper:
+            return JobPostingType.LISTING
+        else:
+            # "NONE" or an unclear response, treat as non-individual
+            return JobPostingType.NONE
+    
     def analyze_job_fit(self, content: str, resume: str, preferences: str) -> Optional[Dict[str, Any]]:
         """
         Analyze job fit using AI
@@ -81,6 +149,9 @@ class ContentAnalyzer:
             
         Returns:
             Dict containing the analysis results, or None if analysis fails
+            
+        Raises:
+            CircuitOpenError: If the AI backend is down
         """
         try:
             analysis_result = self.ai_service.analyze_content(
@@ -94,6 +165,9 @@ class ContentAnalyzer:
             cleaned_result = self._clean_json_response(analysis_result)
             return json.loads(cleaned_result)
             
+        except CircuitOpenError:
+            # Not this job's fault: let the caller park it until the backend is back
+            raise
         except json.JSONDecodeError as e:
             print(f"  ❌ Failed to parse AI response: {e}")
             return None
@@ -108,6 +182,10 @@ class ContentAnalyzer:
         """Generate hash for content change detection"""
         return self.hasher.sha256_hash(content)
     
+    def generate_content_fingerprint(self, content: str) -> str:
+        """Generate SimHash fingerprint for near-duplicate detection"""
+        return self.simhasher.fingerprint(content)
+    
     def _clean_json_response(self, response: str) -> str:
         """Clean JSON response by removing markdown formatting"""
         return response.replace("```json", "").replace("```", "").strip()
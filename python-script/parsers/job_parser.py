@@ -1,28 +1,32 @@
 """
 Job data parser for extracting structured job information from search results
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator
+from collections import Counter
+from datetime import datetime, timezone
 from job_types import Job
-from utils.text_extractors import CompanyExtractor, LocationExtractor, SalaryExtractor, TimeExtractor
+from utils.text_extractors import ExtractionEngine, TimeExtractor
 from utils.hash_utils import ContentHasher
+from utils.url_utils import URLCanonicalizer
 from utils.error_handling import JobParsingError
+from parsers.structured_data import JobPostingData
 
 class JobParser:
     """Parser for converting search results into Job objects"""
     
     def __init__(self):
-        self.company_extractor = CompanyExtractor()
-        self.location_extractor = LocationExtractor()
-        self.salary_extractor = SalaryExtractor()
-        self.time_extractor = TimeExtractor()
+        self.extraction_engine = ExtractionEngine()
         self.hasher = ContentHasher()
+        self.canonicalizer = URLCanonicalizer()
+        self.stats = Counter()
     
-    def parse_search_results(self, search_data: Dict[str, Any]) -> List[Job]:
+    def parse_search_results(self, search_data: Dict[str, Any], fetched_at: Optional[datetime] = None) -> List[Job]:
         """
         Parse Google Custom Search results into Job objects
         
         Args:
             search_data: Raw search results from Google Custom Search API
+            fetched_at: When the results were fetched (default: now)
             
         Returns:
             List[Job]: List of parsed Job objects
@@ -31,25 +35,51 @@ class JobParser:
             JobParsingError: If parsing fails
         """
         try:
-            jobs = []
-            items = search_data.get('items', [])
-            
-            for item in items:
-                job = self._parse_single_job(item)
-                if job:
-                    jobs.append(job)
-            
-            return jobs
+            return list(self.iter_jobs(search_data.get('items', []), fetched_at))
             
         except Exception as e:
             raise JobParsingError(f"Failed to parse search results: {str(e)}")
     
-    def _parse_single_job(self, item: Dict[str, Any]) -> Optional[Job]:
+    def iter_jobs(self, items: Iterable[Dict[str, Any]], fetched_at: Optional[datetime] = None) -> Iterator[Job]:
+        """
+        Lazily parse search result items into Job objects
+        
+        Items are pulled from the iterable one at a time, so it can be a generator
+        over a streamed response or saved file (see utils.json_stream.iter_json_items)
+        and only the current item and job are held in memory.
+        
+        Args:
+            items: Iterable of raw search result items
+            fetched_at: When the results were fetched, which relative posted times
+                        such as "2 days ago" count back from (default: now)
+                        
+        Yields:
+            Job: Parsed job objects, skipping unparseable items and repeated URLs
+        """
+        seen_urls = set()
+        fetched_at = fetched_at or datetime.now(timezone.utc)
+        
+        for item in items:
+            job = self._parse_single_job(item, fetched_at)
+            if not job:
+                continue
+            
+            # Different raw links can canonicalize to the same job
+            if job.url in seen_urls:
+                self.stats['duplicate_urls_skipped'] += 1
+                continue
+            
+            seen_urls.add(job.url)
+            self.stats['jobs_parsed'] += 1
+            yield job
+    
+    def _parse_single_job(self, item: Dict[str, Any], fetched_at: Optional[datetime] = None) -> Optional[Job]:
         """
         Parse a single search result item into a Job object
         
         Args:
             item: Single item from search results
+            fetched_at: When the item was fetched (default: now)
             
         Returns:
             Job: Parsed job object, or None if parsing fails
@@ -58,23 +88,20 @@ class JobParser:
             # Extract basic information
             title = item.get('title', '')
             snippet = item.get('snippet', '')
-            link = item.get('link', '')
-            display_link = item.get('displayLink', '')
+            raw_link = item.get('link', '')
             
-            if not title or not link:
+            if not title or not raw_link:
                 return None
             
-            # Extract company name
-            company = self._extract_company(item, title, link, display_link)
-            
-            # Extract location
-            location = self._extract_location(title, snippet)
+            # Canonicalize so tracking/mirror variants share one job ID and DB key
+            link = self.canonicalizer.canonicalize(raw_link)
+            if link != raw_link:
+                self.stats['urls_canonicalized'] += 1
             
-            # Extract salary
-            salary = self.salary_extractor.extract_from_snippet(snippet)
-            
-            # Extract posted time
-            posted_time = self.time_extractor.extract_posted_time(snippet)
+            # Extract company, location, salary and posted time in one pass
+            metatags = item.get('pagemap', {}).get('metatags', [{}])
+            og_title = metatags[0].get('og:title', '') if metatags else ''
+            fields = self.extraction_engine.extract(title, snippet, link, og_title)
             
             # Extract logo URL
             logo_url = self._extract_logo_url(item)
@@ -86,16 +113,27 @@ class JobParser:
             job = Job(
                 id=job_id,
                 title=title,
-                company=company,
-                location=location,
+                company=fields.company,
+                location=fields.location,
                 url=link,
-                postedTime=posted_time,
+                postedTime=fields.posted_time,
                 description=snippet,
                 employmentType='Full-time',  # Default assumption
-                salary=salary,
+                salary=fields.salary,
                 logoUrl=logo_url
             )
             
+            # Exact values from the result's JobPosting data beat the regex guesses
+            posting = JobPostingData.from_pagemap(item.get('pagemap', {}))
+            if posting:
+                job = posting.apply_to(job)
+                self.stats['structured_data'] += 1
+            
+            # Relative times like "2 days ago" only mean something next to the fetch time
+            posted_at = TimeExtractor.posted_at_utc(job.postedTime, fetched_at or datetime.now(timezone.utc))
+            if posted_at:
+                job.postedAt = posted_at.isoformat(timespec='seconds')
+            
             return job
             
         except Exception as e:
@@ -103,49 +141,6 @@ class JobParser:
             print(f"Warning: Failed to parse job item: {str(e)}")
             return None
     
-    def _extract_company(self, item: Dict[str, Any], title: str, link: str, display_link: str) -> Optional[str]:
-        """Extract company name using multiple strategies"""
-        
-        # Strategy 1: Extract from title (@ pattern)
-        company = self.company_extractor.extract_from_title(title)
-        if company:
-            return company
-        
-        # Strategy 2: Extract from greenhouse URL
-        company = self.company_extractor.extract_from_greenhouse_url(link)
-        if company:
-            return company
-        
-        # Strategy 3: Extract from metadata
-        pagemap = item.get('pagemap', {})
-        metatags = pagemap.get('metatags', [{}])
-        if metatags:
-            og_title = metatags[0].get('og:title', '')
-            company = self.company_extractor.extract_from_metadata(og_title)
-            if company:
-                return company
-        
-        return None
-    
-    def _extract_location(self, title: str, snippet: str) -> Optional[str]:
-        """Extract location using multiple strategies"""
-        
-        # Strategy 1: Extract from title patterns
-        location = self.location_extractor.extract_from_title(title)
-        if location:
-            return location
-        
-        # Strategy 2: Extract from snippet
-        location = self.location_extractor.extract_from_snippet(snippet)
-        if location:
-            return location
-        
-        # Strategy 3: Check for remote keyword
-        if self.location_extractor.detect_remote(title):
-            return 'Remote'
-        
-        return None
-    
     def _extract_logo_url(self, item: Dict[str, Any]) -> Optional[str]:
         """Extract logo URL from pagemap"""
         pagemap = item.get('pagemap', {})
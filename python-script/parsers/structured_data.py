@@ -0,0 +1,276 @@
+"""
+schema.org JobPosting structured data from JSON-LD, Google pagemaps and fetched pages
+"""
+import dataclasses
+import json
+import re
+from html import unescape
+from dataclasses import dataclass, asdict, field
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Iterator
+from job_types import Job
+from utils.text_extractors import TimeExtractor
+
+JSON_LD_PATTERN = re.compile(
+    r'<script[^>]*type\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script>', re.I | re.S
+)
+# Header line carrying the posting in reader-style page content (see LocalContentService)
+READER_FIELD = 'JobPosting'
+READER_LINE_PATTERN = re.compile(rf'^{READER_FIELD}: (\{{.*\}})$', re.M)
+
+EMPLOYMENT_TYPES = {
+    'FULL_TIME': 'Full-time',
+    'PART_TIME': 'Part-time',
+    'CONTRACTOR': 'Contract',
+    'TEMPORARY': 'Temporary',
+    'INTERN': 'Internship',
+    'PER_DIEM': 'Per diem',
+    'VOLUNTEER': 'Volunteer',
+}
+# Salary units converted to yearly amounts; hourly rates are kept as such
+YEARLY_FACTORS = {'YEAR': 1, 'MONTH': 12, 'WEEK': 52, 'DAY': 260}
+CURRENCY_SYMBOLS = {'USD': '$', 'CAD': 'CA$', 'AUD': 'A$', 'EUR': '€', 'GBP': '£'}
+
+def _get(obj: Any, key: str) -> Any:
+    """Case-insensitive property lookup (pagemaps lowercase schema.org names)"""
+    if not isinstance(obj, dict):
+        return None
+    if key in obj:
+        return obj[key]
+    key = key.lower()
+    return next((value for name, value in obj.items() if name.lower() == key), None)
+
+def _first(value: Any) -> Any:
+    return value[0] if isinstance(value, list) and value else value
+
+def _text(value: Any) -> Optional[str]:
+    """A plain string property, or the name of a nested thing"""
+    value = _first(value)
+    if isinstance(value, dict):
+        value = _get(value, 'name')
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    text = str(value).strip()
+    return text or None
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(str(value).replace(',', ''))
+    except (TypeError, ValueError):
+        return None
+
+def _types(obj: Dict[str, Any]) -> List[str]:
+    types = _get(obj, '@type') or []
+    return [types] if isinstance(types, str) else types
+
+def find_job_postings(data: Any) -> Iterator[Dict[str, Any]]:
+    """JobPosting objects in parsed JSON-LD: a single object, a list, or an @graph"""
+    if isinstance(data, list):
+        for entry in data:
+            yield from find_job_postings(entry)
+    elif isinstance(data, dict):
+        if 'JobPosting' in _types(data):
+            yield data
+        elif '@graph' in data:
+            yield from find_job_postings(data['@graph'])
+
+def _format_location(posting: Dict[str, Any]) -> Optional[str]:
+    parts = []
+    if 'TELECOMMUTE' in str(_get(posting, 'jobLocationType') or '').upper():
+        requirement = _text(_get(posting, 'applicantLocationRequirements'))
+        parts.append(f"Remote ({requirement})" if requirement else 'Remote')
+    
+    places = _get(posting, 'jobLocation') or []
+    for place in places if isinstance(places, list) else [places]:
+        address = _get(place, 'address') if isinstance(place, dict) else place
+        if isinstance(address, dict):
+            names = [_text(_get(address, name)) for name in ('addressLocality', 'addressRegion')]
+            names = [name for name in names if name]
+            country = _text(_get(address, 'addressCountry'))
+            if country and len(names) < 2:
+                names.append(country)
+            text = ', '.join(names)
+        else:
+            text = _text(address)
+        if text and text not in parts:
+            parts.append(text)
+    return '; '.join(parts[:3]) or None
+
+def _format_salary(posting: Dict[str, Any]) -> Optional[str]:
+    salary = _first(_get(posting, 'baseSalary') or _get(posting, 'estimatedSalary'))
+    if not isinstance(salary, dict):
+        return None
+    currency = (_text(_get(salary, 'currency')) or 'USD').upper()
+    value = _get(salary, 'value')
+    unit = None
+    if isinstance(value, dict):
+        unit = _text(_get(value, 'unitText'))
+        low = _number(_get(value, 'minValue'))
+        high = _number(_get(value, 'maxValue'))
+        if low is None and high is None:
+            low = high = _number(_get(value, 'value'))
+    else:
+        low = high = _number(value)
+    if low is None and high is None:
+        return None
+    low, high = low if low is not None else high, high if high is not None else low
+    
+    unit = (unit or _text(_get(salary, 'unitText')) or 'YEAR').upper()
+    suffix = ''
+    if unit == 'HOUR':
+        suffix = ' per hour'
+    else:
+        factor = YEARLY_FACTORS.get(unit, 1)
+        low, high = low * factor, high * factor
+    
+    def amount(number: float) -> str:
+        symbol = CURRENCY_SYMBOLS.get(currency)
+        text = f"{number:,.2f}" if number != int(number) else f"{int(number):,}"
+        return f"{symbol}{text}" if symbol else f"{text} {currency}"
+    
+    text = amount(low) if low == high else f"{amount(low)} - {amount(high)}"
+    return text + suffix
+
+def _format_employment_type(posting: Dict[str, Any]) -> Optional[str]:
+    value = _get(posting, 'employmentType')
+    values = value if isinstance(value, list) else [value] if value else []
+    names = [EMPLOYMENT_TYPES.get(str(entry).strip().upper().replace('-', '_'), str(entry).strip().title())
+             for entry in values if str(entry).strip()]
+    return ', '.join(names) or None
+
+@dataclass
+class JobPostingData:
+    """Job fields read from a schema.org JobPosting, as exact values"""
+    title: str
+    company: Optional[str] = None
+    location: Optional[str] = None
+    salary: Optional[str] = None
+    date_posted: Optional[str] = None  # ISO 8601 date or date-time, as published
+    employment_type: Optional[str] = None
+    logo_url: Optional[str] = None
+    # HTML of the full description; not carried in reader text, which holds it as markdown
+    description: Optional[str] = field(default=None, repr=False)
+    
+    @classmethod
+    def from_json_ld(cls, posting: Dict[str, Any]) -> Optional['JobPostingData']:
+        """
+        Normalize one JobPosting object
+        
+        Returns:
+            JobPostingData: The posting's fields, or None if it has no title
+        """
+        title = _text(_get(posting, 'title'))
+        if not title:
+            return None
+        organization = _first(_get(posting, 'hiringOrganization'))
+        logo = _first(_get(organization, 'logo'))
+        description = _text(_get(posting, 'description'))
+        if description and '<' not in description and '&lt;' in description:
+            # Some sites escape the description's HTML twice
+            description = unescape(description)
+        return cls(
+            title=title,
+            company=_text(organization),
+            location=_format_location(posting),
+            salary=_format_salary(posting),
+            date_posted=_text(_get(posting, 'datePosted')),
+            employment_type=_format_employment_type(posting),
+            logo_url=_text(_get(logo, 'url') if isinstance(logo, dict) else logo),
+            description=description,
+        )
+    
+    @classmethod
+    def from_html(cls, html: str) -> Optional['JobPostingData']:
+        """
+        The JobPosting in the page's application/ld+json scripts
+        
+        Returns:
+            JobPostingData: The posting, or None if the page has none or several
+            different ones (a careers or listing page, which no one posting describes)
+        """
+        postings: List['JobPostingData'] = []
+        for block in JSON_LD_PATTERN.findall(html):
+            try:
+                data = json.loads(block.strip())
+            except ValueError:
+                continue
+            for posting in find_job_postings(data):
+                parsed = cls.from_json_ld(posting)
+                if parsed and parsed not in postings:
+                    postings.append(parsed)
+        return postings[0] if len(postings) == 1 else None
+    
+    @classmethod
+    def from_pagemap(cls, pagemap: Dict[str, Any]) -> Optional['JobPostingData']:
+        """
+        The JobPosting of a Google Custom Search result's pagemap
+        
+        The pagemap flattens nested schema.org things into their own lowercase
+        keys (hiringorganization, postaladdress, monetaryamount, ...), so they are
+        put back under the posting before it is normalized. Pagemaps with
+        several postings (listing pages) give None.
+        """
+        postings = _get(pagemap, 'jobposting')
+        if isinstance(postings, list) and len(postings) > 1:
+            return None
+        posting = _first(postings)
+        if not isinstance(posting, dict):
+            return None
+        posting = dict(posting)
+        
+        organization = _first(_get(pagemap, 'hiringorganization') or _get(pagemap, 'organization'))
+        if organization and not _get(posting, 'hiringOrganization'):
+            posting['hiringOrganization'] = organization
+        address = _first(_get(pagemap, 'postaladdress'))
+        if address and not _get(posting, 'jobLocation'):
+            posting['jobLocation'] = {'address': address}
+        amount = _first(_get(pagemap, 'monetaryamount'))
+        if amount and not _get(posting, 'baseSalary'):
+            value = _first(_get(pagemap, 'quantitativevalue')) or _get(amount, 'value')
+            posting['baseSalary'] = {**amount, 'value': value}
+        return cls.from_json_ld(posting)
+    
+    @classmethod
+    def from_content(cls, content: Optional[str]) -> Optional['JobPostingData']:
+        """The posting recorded in the header of reader-style page content, if any"""
+        if not content or READER_FIELD not in content:
+            return None
+        header = content.split('Markdown Content:', 1)[0]
+        match = READER_LINE_PATTERN.search(header)
+        if not match:
+            return None
+        try:
+            fields = json.loads(match.group(1))
+            return cls(**{name.name: fields.get(name.name) for name in dataclasses.fields(cls)})
+        except (ValueError, TypeError):
+            return None
+    
+    def to_reader_line(self) -> str:
+        """Header line for reader-style page content"""
+        fields = asdict(self)
+        del fields['description']
+        return f"{READER_FIELD}: {json.dumps(fields, ensure_ascii=False)}"
+    
+    def apply_to(self, job: Job) -> Job:
+        """
+        The job with the posting's exact values in place of ones guessed from text
+        
+        Args:
+            job: Job parsed from a search result
+            
+        Returns:
+            Job: A copy marked as backed by structured data
+        """
+        posted_at = TimeExtractor.posted_at_utc(self.date_posted, datetime.now(timezone.utc))
+        return dataclasses.replace(
+            job,
+            title=self.title,
+            company=self.company or job.company,
+            location=self.location or job.location,
+            salary=self.salary or job.salary,
+            postedTime=self.date_posted or job.postedTime,
+            employmentType=self.employment_type or job.employmentType,
+            logoUrl=self.logo_url or job.logoUrl,
+            structuredData=True,
+            postedAt=posted_at.isoformat(timespec='seconds') if posted_at else job.postedAt,
+        )
\ No newline at end of file
@@ -2,12 +2,12 @@
 Abstract repository interface for job processing
 """
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Mapping, Iterator, Iterable, Tuple
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 from job_types import Job
 
-@dataclass
+@dataclass(slots=True)
 class ProcessedJob:
     """Domain model for processed job data"""
     job_url: str
@@ -23,16 +23,32 @@ class ProcessedJob:
     recommendation: str  # 'apply', 'maybe', 'skip'
     confidence: int      # 1-5
     fit_score: int       # 1-5
-    analysis_json: Dict[str, Any]
+    analysis_json: Mapping[str, Any]  # LazyJSONDict when loaded from a repository
     
     # Metadata
     processed_at: datetime
     content_hash: str
     processing_version: str = "1.0"
+    content_fingerprint: Optional[str] = None  # SimHash for near-duplicate detection
+    
+    # Normalized fields, materialized by the repository on save
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    is_remote: Optional[bool] = None
+    posted_at: Optional[datetime] = None  # Absolute posting time, naive UTC
+    
+    # HTTP validators of the fetched page, for conditional re-fetches
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    
+    id: Optional[int] = None  # Storage ID, set when loaded from a repository
     
     @classmethod
-    def from_job_and_analysis(cls, job: Job, analysis: Dict[str, Any], content_hash: str) -> 'ProcessedJob':
+    def from_job_and_analysis(cls, job: Job, analysis: Mapping[str, Any], content_hash: str,
+                              content_fingerprint: Optional[str] = None,
+                              validators: Optional[Tuple[Optional[str], Optional[str]]] = None) -> 'ProcessedJob':
         """Factory method to create ProcessedJob from Job and AI analysis"""
+        posted_at = job.posted_at()
         return cls(
             job_url=job.url,
             job_title=job.title,
@@ -47,7 +63,11 @@ class ProcessedJob:
             fit_score=analysis.get('fit_score'),
             analysis_json=analysis,
             processed_at=datetime.now(),
-            content_hash=content_hash
+            content_hash=content_hash,
+            content_fingerprint=content_fingerprint,
+            posted_at=posted_at.astimezone(timezone.utc).replace(tzinfo=None) if posted_at else None,
+            etag=validators[0] if validators else None,
+            last_modified=validators[1] if validators else None
         )
 
 class JobRepository(ABC):
@@ -63,11 +83,25 @@ class JobRepository(ABC):
         """Save a processed job"""
         pass
     
+    def save_processed_jobs(self, processed_jobs: Iterable[ProcessedJob]) -> None:
+        """Save several processed jobs; implementations may write them in one transaction"""
+        for processed_job in processed_jobs:
+            self.save_processed_job(processed_job)
+    
     @abstractmethod
     def get_processed_job(self, job_url: str) -> Optional[ProcessedJob]:
         """Retrieve a specific processed job"""
         pass
     
+    def get_job_state(self, job_url: str) -> Optional[Tuple[str, str]]:
+        """
+        (content_hash, recommendation) of a processed job, or None if it is not processed
+        
+        A narrow get_processed_job for caches; implementations should read only these columns.
+        """
+        job = self.get_processed_job(job_url)
+        return (job.content_hash, job.recommendation) if job else None
+    
     @abstractmethod
     def get_processed_jobs(self, 
                           recommendation: Optional[str] = None,
@@ -76,6 +110,60 @@ class JobRepository(ABC):
         """Retrieve processed jobs with optional filtering"""
         pass
     
+    @abstractmethod
+    def iter_processed_jobs(self,
+                            filters: Optional[Dict[str, Any]] = None,
+                            batch_size: int = 1000) -> Iterator[ProcessedJob]:
+        """
+        Stream processed jobs, newest first, without materializing them all
+        
+        Supported filters: 'recommendation', 'processed_after', 'processed_before',
+        'min_id', 'max_id', 'remote', 'min_salary', 'technology', 'posted_after'
+        """
+        pass
+    
+    def iter_job_states(self,
+                        processed_after: Optional[datetime] = None,
+                        limit: Optional[int] = None,
+                        after_id: Optional[int] = None) -> Iterator[Tuple[int, str, str, str]]:
+        """
+        Stream (id, job_url, content_hash, recommendation) of processed jobs, newest first
+        
+        A narrow iter_processed_jobs for warming caches and filters; implementations
+        should read only these columns.
+        """
+        filters = {}
+        if processed_after:
+            filters['processed_after'] = processed_after
+        if after_id is not None:
+            filters['min_id'] = after_id + 1
+        for count, job in enumerate(self.iter_processed_jobs(filters)):
+            if limit is not None and count >= limit:
+                break
+            yield job.id, job.job_url, job.content_hash, job.recommendation
+    
+    @abstractmethod
+    def search_processed_jobs(self,
+                              query: str,
+                              filters: Optional[Dict[str, Any]] = None,
+                              limit: int = 50) -> List[ProcessedJob]:
+        """
+        Full-text search over job titles, companies and analysis summaries, best match first
+        
+        Accepts the same filters as iter_processed_jobs.
+        """
+        pass
+    
+    @abstractmethod
+    def rebuild_search_index(self) -> int:
+        """Rebuild the full-text search index and return the number of rows indexed"""
+        pass
+    
+    @abstractmethod
+    def get_id_bucket_counts(self, bucket_size: int) -> Dict[int, int]:
+        """Count processed jobs per id range of bucket_size ids, keyed by id // bucket_size"""
+        pass
+    
     @abstractmethod
     def get_processing_stats(self) -> Dict[str, Any]:
         """Get statistics about processed jobs"""
@@ -86,6 +174,15 @@ class JobRepository(ABC):
         """Check if job content has changed since last processing"""
         pass
     
+    @abstractmethod
+    def find_near_duplicate(self, content_fingerprint: str, max_distance: int = 3) -> Optional[ProcessedJob]:
+        """Find a processed job whose content fingerprint is within max_distance bits"""
+        pass
+    
+    def get_runtime_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Counters of caches and buffers in front of the database, keyed by component"""
+        return {}
+    
     @abstractmethod
     def close(self) -> None:
         """Clean up resources"""
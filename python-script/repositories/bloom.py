@@ -0,0 +1,173 @@
+"""
+Bloom filter of processed job URLs in front of a JobRepository
+"""
+import threading
+import time
+from collections import Counter
+from typing import Dict, Any, Iterable
+
+from .base import JobRepository, ProcessedJob
+from .decorators import RepositoryDecorator
+from utils.bloom_filter import BloomFilter
+from utils.instrumentation import tag
+
+def default_filter_path(database_config: Dict[str, Any]) -> str:
+    """Filter file next to the SQLite database, or named after the server database"""
+    if database_config.get('type', 'sqlite') == 'sqlite':
+        return f"{database_config.get('path', 'jobs.db')}.seen"
+    return f"{database_config.get('database', 'jobs')}.seen"
+
+class BloomFilterJobRepository(RepositoryDecorator):
+    """
+    Answers is_job_processed for unseen URLs without touching the database
+    
+    A URL missing from the filter has definitely not been processed; only URLs
+    that may be in it (processed, or a false positive) are checked against the
+    wrapped repository. The filter file persists between runs. On open, and
+    every sync_interval seconds after, it catches up with rows added since its
+    watermark (the highest job id it has seen; saving a new URL always creates a
+    row with a new id), so rows written by other workers, machines or maintenance
+    commands are picked up. A filter file rebuilt by another process is reopened.
+    
+    URLs removed from the database stay in the filter, which only adds false
+    positives; rebuild() drops them.
+    """
+    
+    def __init__(self,
+                 repository: JobRepository,
+                 path: str,
+                 capacity: int = 1_000_000,
+                 error_rate: float = 0.001,
+                 sync_interval: float = 30.0):
+        """
+        Args:
+            repository: Repository to check possible hits against
+            path: Filter file, usually next to the database
+            capacity: Number of URLs the filter is sized for
+            error_rate: Target false-positive rate at capacity
+            sync_interval: Seconds between catch-ups with rows saved by other processes
+        """
+        super().__init__(repository)
+        self.path = path
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._synced_at = time.monotonic()
+        
+        self.filter = BloomFilter.open(path)
+        if self.filter is None or self.filter.count > self.filter.capacity:
+            self.rebuild()
+        else:
+            self._catch_up()
+    
+    def _catch_up(self) -> int:
+        """Add jobs stored since the filter's watermark"""
+        states = [(job_id, job_url) for job_id, job_url, _, _
+                  in self.repository.iter_job_states(after_id=self.filter.watermark)]
+        added = 0
+        with self._lock, self.filter.locked():
+            for _, job_url in states:
+                added += self.filter.add(job_url)
+            # Another process may have moved the watermark further meanwhile
+            self.filter.watermark = max([self.filter.watermark] + [job_id for job_id, _ in states])
+            self.filter.flush()
+        self.stats['caught_up'] += added
+        return added
+    
+    def _sync_if_due(self) -> None:
+        """Catch up with other processes' saves, at most once per sync_interval"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._synced_at < self.sync_interval:
+                return
+            self._synced_at = now
+        
+        if self.filter.replaced():
+            reopened = BloomFilter.open(self.path)
+            if reopened is None:
+                self.rebuild()
+                return
+            with self._lock:
+                old_filter, self.filter = self.filter, reopened
+            old_filter.close()
+            self.stats['reopens'] += 1
+        self._catch_up()
+    
+    def _add_urls(self, job_urls: Iterable[str]) -> None:
+        with self._lock:
+            for job_url in job_urls:
+                self.filter.add(job_url)
+    
+    def rebuild(self) -> int:
+        """
+        Rebuild the filter from all processed job URLs
+        
+        The filter is sized for at least twice the current number of jobs, so it
+        stays within its error rate as the table grows.
+        
+        Returns:
+            int: Number of URLs in the new filter
+        """
+        states = [(job_id, job_url) for job_id, job_url, _, _ in self.repository.iter_job_states()]
+        new_filter = BloomFilter.create(self.path, max(self.capacity, 2 * len(states)), self.error_rate)
+        for _, job_url in states:
+            new_filter.add(job_url)
+        new_filter.watermark = max((job_id for job_id, _ in states), default=0)
+        new_filter.flush()
+        
+        with self._lock:
+            old_filter, self.filter = self.filter, new_filter
+        if old_filter is not None:
+            old_filter.close()
+        self.stats['rebuilds'] += 1
+        return len(states)
+    
+    def is_job_processed(self, job_url: str) -> bool:
+        self._sync_if_due()
+        if job_url not in self.filter:
+            self.stats['definite_misses'] += 1
+            tag(cache_hit=True)
+            return False
+        processed = self.repository.is_job_processed(job_url)
+        self.stats['possible_hits'] += 1
+        if not processed:
+            self.stats['false_positives'] += 1
+        return processed
+    
+    def save_processed_job(self, processed_job: ProcessedJob) -> None:
+        self.repository.save_processed_job(processed_job)
+        self._add_urls([processed_job.job_url])
+    
+    def save_processed_jobs(self, processed_jobs: Iterable[ProcessedJob]) -> None:
+        processed_jobs = list(processed_jobs)
+        self.repository.save_processed_jobs(processed_jobs)
+        self._add_urls(job.job_url for job in processed_jobs)
+    
+    def merge_duplicate_urls(self, *args, **kwargs) -> Dict[str, int]:
+        """Canonical URLs are new keys; the filter is rebuilt so merged URLs drop out"""
+        counts = self.repository.merge_duplicate_urls(*args, **kwargs)
+        self.rebuild()
+        return counts
+    
+    def get_runtime_stats(self) -> Dict[str, Dict[str, Any]]:
+        checked = self.stats['possible_hits'] + self.stats['definite_misses']
+        negatives = self.stats['false_positives'] + self.stats['definite_misses']
+        return {**self.repository.get_runtime_stats(),
+                'seen_filter': {
+                    **self.stats,
+                    'urls': self.filter.count,
+                    'capacity': self.filter.capacity,
+                    'target_error_rate': self.error_rate,
+                    'estimated_error_rate': round(self.filter.estimated_error_rate(), 6),
+                    # Share of unprocessed URLs that still needed a database lookup
+                    'observed_error_rate': round(self.stats['false_positives'] / negatives, 6) if negatives else 0.0,
+                    'db_lookups_skipped': round(self.stats['definite_misses'] / checked, 3) if checked else 0.0,
+                }}
+    
+    def close(self) -> None:
+        try:
+            self.repository.close()
+        finally:
+            self.filter.close()
\ No newline at end of file
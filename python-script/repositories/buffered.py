@@ -0,0 +1,299 @@
+"""
+Write-behind buffering for any JobRepository
+"""
+import atexit
+import signal
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterator, Iterable, Tuple, Callable
+
+from .base import JobRepository, ProcessedJob
+from .decorators import RepositoryDecorator
+from utils.hash_utils import SimHasher
+
+class BufferedJobRepository(RepositoryDecorator):
+    """
+    Queues saves in memory and writes them in bulk from a background thread
+    
+    A batch is flushed when max_batch jobs are waiting or the oldest has waited
+    max_delay seconds, in one save_processed_jobs call (one transaction on the
+    Peewee repository). Lookups by URL and near-duplicate checks see buffered
+    jobs immediately; queries over many jobs flush the buffer first.
+    
+    Buffered jobs are flushed on close(), at interpreter exit and on SIGTERM.
+    A failed flush keeps its jobs buffered and is retried on the next flush.
+    Callers that must not consider a job stored before it is on disk (e.g. the
+    work queue) register a flush listener, called with each written batch.
+    """
+    
+    def __init__(self,
+                 repository: JobRepository,
+                 max_batch: int = 50,
+                 max_delay: float = 2.0,
+                 max_pending: Optional[int] = None,
+                 handle_sigterm: bool = True):
+        """
+        Args:
+            repository: Repository to write through to
+            max_batch: Number of buffered jobs that triggers a flush
+            max_delay: Seconds a job may stay buffered before a flush
+            max_pending: Saves block while this many jobs are buffered (default 10 * max_batch)
+            handle_sigterm: Flush on SIGTERM (only possible from the main thread)
+        """
+        super().__init__(repository)
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending or 10 * max_batch
+        self.stats = Counter()
+        self.last_error: Optional[Exception] = None
+        self._listeners: List[Callable[[List[ProcessedJob]], None]] = []
+        
+        # Latest buffered version of each job, in save order
+        self._pending: Dict[str, ProcessedJob] = {}
+        # The batch currently being written, still visible to reads
+        self._in_flight: Dict[str, ProcessedJob] = {}
+        self._oldest: Optional[float] = None
+        self._closed = False
+        # Reentrant, so a SIGTERM arriving during a flush on the main thread can flush too
+        self._condition = threading.Condition(threading.RLock())
+        self._flush_lock = threading.RLock()
+        
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+        atexit.register(self._flush_at_exit)
+        self._previous_sigterm = None
+        if handle_sigterm and threading.current_thread() is threading.main_thread():
+            self._previous_sigterm = signal.signal(signal.SIGTERM, self._on_sigterm)
+    
+    def _buffered(self, job_url: str) -> Optional[ProcessedJob]:
+        """The buffered version of a job, if it has not been written yet"""
+        with self._condition:
+            return self._pending.get(job_url) or self._in_flight.get(job_url)
+    
+    def _due(self) -> bool:
+        if not self._pending:
+            return False
+        return (len(self._pending) >= self.max_batch or
+                time.monotonic() - self._oldest >= self.max_delay)
+    
+    def _run(self) -> None:
+        """Background loop flushing full or expired batches"""
+        while True:
+            with self._condition:
+                while not self._closed and not self._due():
+                    timeout = self.max_delay
+                    if self._oldest is not None:
+                        timeout = max(0.0, self._oldest + self.max_delay - time.monotonic())
+                    self._condition.wait(timeout)
+                if self._closed:
+                    return
+            try:
+                self._flush_batch()
+            except Exception as e:
+                # Jobs stay buffered; back off before retrying
+                print(f"⚠️  Write-behind flush failed, will retry: {e}")
+                with self._condition:
+                    self._condition.wait(self.max_delay)
+    
+    def _flush_batch(self) -> int:
+        """Write everything buffered so far; on failure the jobs are put back"""
+        with self._flush_lock:
+            with self._condition:
+                if not self._pending:
+                    return 0
+                batch, self._pending, self._oldest = self._pending, {}, None
+                self._in_flight = batch
+            
+            try:
+                self.repository.save_processed_jobs(list(batch.values()))
+            except BaseException as e:
+                with self._condition:
+                    # Saves made during the failed write are newer and win
+                    self._pending = {**batch, **self._pending}
+                    self._oldest = time.monotonic()
+                    self._in_flight = {}
+                self.stats['flush_errors'] += 1
+                if isinstance(e, Exception):
+                    self.last_error = e
+                raise
+            
+            with self._condition:
+                self._in_flight = {}
+                # Wake saves waiting for buffer space
+                self._condition.notify_all()
+            self.stats['flushes'] += 1
+            self.stats['jobs_flushed'] += len(batch)
+            
+            written = list(batch.values())
+            for listener in self._listeners:
+                try:
+                    listener(written)
+                except Exception as e:
+                    # The jobs are written; a listener's failure must not put them back
+                    self.stats['listener_errors'] += 1
+                    print(f"⚠️  Write-behind flush listener failed: {e}")
+            return len(batch)
+    
+    def add_flush_listener(self, listener: Callable[[List[ProcessedJob]], None]) -> None:
+        """Call listener with every batch of jobs once it has been written, from the flushing thread"""
+        self._listeners.append(listener)
+    
+    def flush(self) -> int:
+        """
+        Write all buffered jobs now
+        
+        Returns:
+            int: Number of jobs written
+            
+        Raises:
+            Exception: Whatever the wrapped repository raised; the jobs stay buffered
+        """
+        written = 0
+        while True:
+            count = self._flush_batch()
+            if not count:
+                return written
+            written += count
+    
+    def _flush_at_exit(self) -> None:
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"❌ Could not flush buffered jobs at exit: {e}")
+    
+    def _on_sigterm(self, signum, frame) -> None:
+        self._flush_at_exit()
+        previous = self._previous_sigterm
+        if callable(previous):
+            previous(signum, frame)
+        elif previous != signal.SIG_IGN:
+            # Default action: exit, running finally blocks and atexit handlers
+            raise SystemExit(128 + signum)
+    
+    def save_processed_job(self, processed_job: ProcessedJob) -> None:
+        """Buffer a job for the next flush"""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Repository is closed")
+            while len(self._pending) >= self.max_pending and not self._closed:
+                self._condition.notify_all()
+                self._condition.wait(self.max_delay)
+            # Re-inserting moves a re-saved job behind older ones
+            self._pending.pop(processed_job.job_url, None)
+            self._pending[processed_job.job_url] = processed_job
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self.stats['saves'] += 1
+            if len(self._pending) >= self.max_batch:
+                self._condition.notify_all()
+    
+    def save_processed_jobs(self, processed_jobs: Iterable[ProcessedJob]) -> None:
+        for processed_job in processed_jobs:
+            self.save_processed_job(processed_job)
+    
+    def is_job_processed(self, job_url: str) -> bool:
+        return self._buffered(job_url) is not None or self.repository.is_job_processed(job_url)
+    
+    def get_processed_job(self, job_url: str) -> Optional[ProcessedJob]:
+        buffered = self._buffered(job_url)
+        return buffered if buffered is not None else self.repository.get_processed_job(job_url)
+    
+    def get_job_state(self, job_url: str) -> Optional[Tuple[str, str]]:
+        buffered = self._buffered(job_url)
+        if buffered is not None:
+            return buffered.content_hash, buffered.recommendation
+        return self.repository.get_job_state(job_url)
+    
+    def has_content_changed(self, job_url: str, current_content_hash: str) -> bool:
+        buffered = self._buffered(job_url)
+        if buffered is not None:
+            return buffered.content_hash != current_content_hash
+        return self.repository.has_content_changed(job_url, current_content_hash)
+    
+    def find_near_duplicate(self, content_fingerprint: str, max_distance: int = 3) -> Optional[ProcessedJob]:
+        """Closest match among buffered jobs and the wrapped repository"""
+        with self._condition:
+            buffered = [*self._in_flight.values(), *self._pending.values()]
+        
+        best_match, best_distance = None, max_distance + 1
+        for job in buffered:
+            if job.content_fingerprint:
+                distance = SimHasher.hamming_distance(content_fingerprint, job.content_fingerprint)
+                if distance < best_distance:
+                    best_match, best_distance = job, distance
+        if best_distance == 0:
+            return best_match
+        
+        stored = self.repository.find_near_duplicate(content_fingerprint, max_distance)
+        if stored is not None and stored.content_fingerprint and (
+                SimHasher.hamming_distance(content_fingerprint, stored.content_fingerprint) < best_distance):
+            return stored
+        return best_match if best_match is not None else stored
+    
+    # Queries over many jobs see all saves made so far
+    
+    def get_processed_jobs(self,
+                           recommendation: Optional[str] = None,
+                           limit: Optional[int] = None,
+                           offset: int = 0) -> List[ProcessedJob]:
+        self.flush()
+        return self.repository.get_processed_jobs(recommendation, limit, offset)
+    
+    def iter_processed_jobs(self,
+                            filters: Optional[Dict[str, Any]] = None,
+                            batch_size: int = 1000) -> Iterator[ProcessedJob]:
+        self.flush()
+        return self.repository.iter_processed_jobs(filters, batch_size)
+    
+    def iter_job_states(self,
+                        processed_after: Optional[datetime] = None,
+                        limit: Optional[int] = None,
+                        after_id: Optional[int] = None) -> Iterator[Tuple[int, str, str, str]]:
+        self.flush()
+        return self.repository.iter_job_states(processed_after, limit, after_id)
+    
+    def search_processed_jobs(self,
+                              query: str,
+                              filters: Optional[Dict[str, Any]] = None,
+                              limit: int = 50) -> List[ProcessedJob]:
+        self.flush()
+        return self.repository.search_processed_jobs(query, filters, limit)
+    
+    def rebuild_search_index(self) -> int:
+        self.flush()
+        return self.repository.rebuild_search_index()
+    
+    def get_id_bucket_counts(self, bucket_size: int) -> Dict[int, int]:
+        self.flush()
+        return self.repository.get_id_bucket_counts(bucket_size)
+    
+    def get_processing_stats(self) -> Dict[str, Any]:
+        self.flush()
+        return self.repository.get_processing_stats()
+    
+    def get_runtime_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._condition:
+            buffered = len(self._pending) + len(self._in_flight)
+        return {**self.repository.get_runtime_stats(),
+                'write_buffer': {**self.stats, 'buffered': buffered}}
+    
+    def close(self) -> None:
+        """Flush buffered jobs, stop the flush thread and close the wrapped repository"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        
+        try:
+            self.flush()
+        finally:
+            atexit.unregister(self._flush_at_exit)
+            if (self._previous_sigterm is not None and
+                    signal.getsignal(signal.SIGTERM) == self._on_sigterm and
+                    threading.current_thread() is threading.main_thread()):
+                signal.signal(signal.SIGTERM, self._previous_sigterm)
+            self.repository.close()
\ No newline at end of file
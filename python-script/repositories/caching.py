@@ -0,0 +1,186 @@
+"""
+Read-through cache for per-URL JobRepository lookups
+"""
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Iterable, NamedTuple, Tuple, Union
+
+from .base import JobRepository, ProcessedJob
+from .decorators import RepositoryDecorator
+from utils.instrumentation import tag
+
+class JobState(NamedTuple):
+    """What the pipeline needs to know about a processed job URL"""
+    content_hash: str
+    recommendation: str
+
+class _NotProcessed(NamedTuple):
+    """Cached marker for a URL known not to be processed, trusted until expires_at (monotonic)"""
+    expires_at: float
+
+# State of a URL that is not processed
+_NOT_PROCESSED = None
+
+class CachingJobRepository(RepositoryDecorator):
+    """
+    Bounded LRU of job URL -> JobState in front of a repository
+    
+    Answers is_job_processed and has_content_changed from memory, and
+    get_processed_job for URLs known not to be processed. Unprocessed URLs are
+    cached too, so repeated checks of new search results stay off the database,
+    but only for negative_ttl seconds: other workers may process them meanwhile.
+    The cache is warmed with one query for the jobs processed in the last
+    warm_days days, and saves through this repository update their entries.
+    """
+    
+    def __init__(self,
+                 repository: JobRepository,
+                 max_entries: int = 10000,
+                 warm_days: Optional[int] = 7,
+                 negative_ttl: float = 30.0):
+        """
+        Args:
+            repository: Repository to read through to
+            max_entries: Maximum number of cached URLs
+            warm_days: Preload jobs processed in the last warm_days days (None to skip)
+            negative_ttl: Seconds a URL found unprocessed is trusted to stay so (0 to not cache them)
+        """
+        super().__init__(repository)
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self.stats = Counter()
+        self._entries: "OrderedDict[str, Union[JobState, _NotProcessed]]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        if warm_days is not None:
+            self.warm(datetime.now() - timedelta(days=warm_days))
+    
+    def warm(self, processed_after: datetime) -> int:
+        """
+        Load the states of recently processed jobs in one query
+        
+        Returns:
+            int: Number of entries loaded
+        """
+        states = self.repository.iter_job_states(processed_after, limit=self.max_entries)
+        count = 0
+        with self._lock:
+            # Newest first: insert oldest first so the newest are least likely to be evicted
+            for _, job_url, content_hash, recommendation in reversed(list(states)):
+                self._entries[job_url] = JobState(content_hash, recommendation)
+                count += 1
+            self._evict()
+        self.stats['warmed'] += count
+        return count
+    
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def _put(self, job_url: str, state: Optional[JobState]) -> None:
+        with self._lock:
+            if state is _NOT_PROCESSED:
+                if self.negative_ttl <= 0:
+                    self._entries.pop(job_url, None)
+                    return
+                state = _NotProcessed(time.monotonic() + self.negative_ttl)
+            self._entries[job_url] = state
+            self._entries.move_to_end(job_url)
+            self._evict()
+    
+    def _cached(self, job_url: str) -> Tuple[bool, Optional[JobState]]:
+        """(found, state) of a URL in the cache; the caller holds the lock"""
+        entry = self._entries.get(job_url)
+        if entry is None:
+            return False, None
+        if isinstance(entry, _NotProcessed):
+            if entry.expires_at <= time.monotonic():
+                del self._entries[job_url]
+                self.stats['negative_expired'] += 1
+                return False, None
+            return True, _NOT_PROCESSED
+        return True, entry
+    
+    def _state(self, job_url: str, method: str) -> Optional[JobState]:
+        """Cached state of a URL, loading it from the repository on a miss"""
+        with self._lock:
+            found, state = self._cached(job_url)
+            if found:
+                self._entries.move_to_end(job_url)
+                self.stats[f'{method}_hits'] += 1
+                tag(cache_hit=True)
+                return state
+        self.stats[f'{method}_misses'] += 1
+        
+        state = self.repository.get_job_state(job_url)
+        state = JobState(*state) if state else _NOT_PROCESSED
+        self._put(job_url, state)
+        return state
+    
+    def invalidate(self, job_url: Optional[str] = None) -> None:
+        """Drop one URL, or everything when no URL is given"""
+        with self._lock:
+            if job_url is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(job_url, None)
+    
+    def is_job_processed(self, job_url: str) -> bool:
+        return self._state(job_url, 'is_job_processed') is not _NOT_PROCESSED
+    
+    def has_content_changed(self, job_url: str, current_content_hash: str) -> bool:
+        state = self._state(job_url, 'has_content_changed')
+        return state is _NOT_PROCESSED or state.content_hash != current_content_hash
+    
+    def get_processed_job(self, job_url: str) -> Optional[ProcessedJob]:
+        with self._lock:
+            found, state = self._cached(job_url)
+            if found and state is _NOT_PROCESSED:
+                self.stats['get_processed_job_hits'] += 1
+                tag(cache_hit=True)
+                return None
+        # Full jobs are not cached; the lookup refreshes the URL's state
+        self.stats['get_processed_job_misses'] += 1
+        job = self.repository.get_processed_job(job_url)
+        self._put(job_url, JobState(job.content_hash, job.recommendation) if job else _NOT_PROCESSED)
+        return job
+    
+    def save_processed_job(self, processed_job: ProcessedJob) -> None:
+        try:
+            self.repository.save_processed_job(processed_job)
+        except Exception:
+            self.invalidate(processed_job.job_url)
+            raise
+        self._put(processed_job.job_url, JobState(processed_job.content_hash, processed_job.recommendation))
+    
+    def save_processed_jobs(self, processed_jobs: Iterable[ProcessedJob]) -> None:
+        processed_jobs = list(processed_jobs)
+        try:
+            self.repository.save_processed_jobs(processed_jobs)
+        except Exception:
+            for processed_job in processed_jobs:
+                self.invalidate(processed_job.job_url)
+            raise
+        for processed_job in processed_jobs:
+            self._put(processed_job.job_url, JobState(processed_job.content_hash, processed_job.recommendation))
+    
+    def merge_duplicate_urls(self, *args, **kwargs) -> Dict[str, int]:
+        """Rewrites URLs behind the cache's back, so the whole cache is dropped"""
+        try:
+            return self.repository.merge_duplicate_urls(*args, **kwargs)
+        finally:
+            self.invalidate()
+    
+    def hit_rate(self) -> float:
+        """Fraction of cached lookups answered from memory"""
+        hits = sum(count for key, count in self.stats.items() if key.endswith('_hits'))
+        misses = sum(count for key, count in self.stats.items() if key.endswith('_misses'))
+        return hits / (hits + misses) if hits + misses else 0.0
+    
+    def get_runtime_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            entries = len(self._entries)
+        return {**self.repository.get_runtime_stats(),
+                'read_cache': {**self.stats, 'entries': entries, 'hit_rate': round(self.hit_rate(), 3)}}
\ No newline at end of file
@@ -0,0 +1,84 @@
+"""
+Base class for repositories that wrap another JobRepository
+"""
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterator, Iterable, Tuple
+
+from .base import JobRepository, ProcessedJob
+
+class RepositoryDecorator(JobRepository):
+    """
+    Forwards every JobRepository call to a wrapped repository
+    
+    Subclasses override only the methods they change. Attributes that are not
+    part of the interface (e.g. migrate() or full_text_index on the Peewee
+    repository) are looked up on the wrapped repository.
+    """
+    
+    def __init__(self, repository: JobRepository):
+        self.repository = repository
+    
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes missing here; guard against recursion before __init__
+        if name == 'repository':
+            raise AttributeError(name)
+        return getattr(self.repository, name)
+    
+    def is_job_processed(self, job_url: str) -> bool:
+        return self.repository.is_job_processed(job_url)
+    
+    def save_processed_job(self, processed_job: ProcessedJob) -> None:
+        self.repository.save_processed_job(processed_job)
+    
+    def save_processed_jobs(self, processed_jobs: Iterable[ProcessedJob]) -> None:
+        self.repository.save_processed_jobs(processed_jobs)
+    
+    def get_processed_job(self, job_url: str) -> Optional[ProcessedJob]:
+        return self.repository.get_processed_job(job_url)
+    
+    def get_job_state(self, job_url: str) -> Optional[Tuple[str, str]]:
+        return self.repository.get_job_state(job_url)
+    
+    def get_processed_jobs(self,
+                           recommendation: Optional[str] = None,
+                           limit: Optional[int] = None,
+                           offset: int = 0) -> List[ProcessedJob]:
+        return self.repository.get_processed_jobs(recommendation, limit, offset)
+    
+    def iter_processed_jobs(self,
+                            filters: Optional[Dict[str, Any]] = None,
+                            batch_size: int = 1000) -> Iterator[ProcessedJob]:
+        return self.repository.iter_processed_jobs(filters, batch_size)
+    
+    def iter_job_states(self,
+                        processed_after: Optional[datetime] = None,
+                        limit: Optional[int] = None,
+                        after_id: Optional[int] = None) -> Iterator[Tuple[int, str, str, str]]:
+        return self.repository.iter_job_states(processed_after, limit, after_id)
+    
+    def search_processed_jobs(self,
+                              query: str,
+                              filters: Optional[Dict[str, Any]] = None,
+                              limit: int = 50) -> List[ProcessedJob]:
+        return self.repository.search_processed_jobs(query, filters, limit)
+    
+    def rebuild_search_index(self) -> int:
+        return self.repository.rebuild_search_index()
+    
+    def get_id_bucket_counts(self, bucket_size: int) -> Dict[int, int]:
+        return self.repository.get_id_bucket_counts(bucket_size)
+    
+    def get_processing_stats(self) -> Dict[str, Any]:
+        return self.repository.get_processing_stats()
+    
+    def has_content_changed(self, job_url: str, current_content_hash: str) -> bool:
+        return self.repository.has_content_changed(job_url, current_content_hash)
+    
+    def find_near_duplicate(self, content_fingerprint: str, max_distance: int = 3) -> Optional[ProcessedJob]:
+        return self.repository.find_near_duplicate(content_fingerprint, max_distance)
+    
+    def get_runtime_stats(self) -> Dict[str, Dict[str, Any]]:
+        return self.repository.get_runtime_stats()
+    
+    def close(self) -> None:
+        self.repository.close()
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""
+Timing spans around JobRepository calls
+"""
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+
+from .base import ProcessedJob
+from .decorators import RepositoryDecorator
+from utils.instrumentation import span
+
+class InstrumentedJobRepository(RepositoryDecorator):
+    """
+    Records a 'db' span, tagged with the method as op, for every per-job call
+    
+    Wrap it outermost, so spans cover the caches and buffers below it; they tag
+    the span with cache_hit when they answer from memory.
+    """
+    
+    def is_job_processed(self, job_url: str) -> bool:
+        with span('db', op='is_job_processed'):
+            return self.repository.is_job_processed(job_url)
+    
+    def has_content_changed(self, job_url: str, current_content_hash: str) -> bool:
+        with span('db', op='has_content_changed'):
+            return self.repository.has_content_changed(job_url, current_content_hash)
+    
+    def get_processed_job(self, job_url: str) -> Optional[ProcessedJob]:
+        with span('db', op='get_processed_job'):
+            return self.repository.get_processed_job(job_url)
+    
+    def get_job_state(self, job_url: str) -> Optional[Tuple[str, str]]:
+        with span('db', op='get_job_state'):
+            return self.repository.get_job_state(job_url)
+    
+    def save_processed_job(self, processed_job: ProcessedJob) -> None:
+        with span('db', op='save_processed_job'):
+            self.repository.save_processed_job(processed_job)
+    
+    def save_processed_jobs(self, processed_jobs: Iterable[ProcessedJob]) -> None:
+        processed_jobs = list(processed_jobs)
+        with span('db', op='save_processed_jobs', rows=len(processed_jobs)):
+            self.repository.save_processed_jobs(processed_jobs)
+    
+    def find_near_duplicate(self, content_fingerprint: str, max_distance: int = 3) -> Optional[ProcessedJob]:
+        with span('db', op='find_near_duplicate') as timing:
+            job = self.repository.find_near_duplicate(content_fingerprint, max_distance)
+            timing.tag(found=job is not None)
+            return job
+    
+    def search_processed_jobs(self,
+                              query: str,
+                              filters: Optional[Dict[str, Any]] = None,
+                              limit: int = 50) -> List[ProcessedJob]:
+        with span('db', op='search_processed_jobs'):
+            return self.repository.search_processed_jobs(query, filters, limit)
\ No newline at end of file
@@ -0,0 +1,347 @@
+"""
+Versioned schema migrations for job databases
+
+The applied schema version and the progress of running backfills are kept in the
+schema_meta table. Each migration has a schema step, which must be idempotent so
+that databases created before versioning (or a migration interrupted half way)
+can run it again, and an optional data backfill that runs in id-ordered batches
+of one transaction each and records its position after every batch, so a long
+backfill never holds the write lock for long and resumes where it stopped.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from peewee import (
+    Database, Field, IntegerField, BooleanField, CharField, TextField, FloatField, DateTimeField,
+    OperationalError
+)
+from playhouse.migrate import SchemaMigrator, migrate
+
+from .models import (
+    BaseModel, ProcessedJobModel, JobFingerprintModel, JobTechnologyModel, WorkItemModel, SearchWatermarkModel,
+    normalized_fields, normalized_technologies, to_naive_utc
+)
+from .search_index import full_text_index_for
+from utils.text_extractors import TimeExtractor
+
+class SchemaMetaModel(BaseModel):
+    """Key/value store for the schema version and backfill positions"""
+    
+    key = CharField(primary_key=True, max_length=100)
+    value = TextField()
+    
+    class Meta:
+        table_name = 'schema_meta'
+
+# Columns added to processed_jobs after its first release
+NORMALIZED_COLUMNS = {
+    'salary_min': IntegerField(null=True),
+    'salary_max': IntegerField(null=True),
+    'is_remote': BooleanField(null=True),
+}
+
+# Columns added to work_queue for priority scheduling
+SCHEDULING_COLUMNS = {
+    'priority': FloatField(null=True),
+    'posted_at': DateTimeField(null=True),
+    'deadline': DateTimeField(null=True),
+    'retry_at': DateTimeField(null=True),
+}
+
+@dataclass
+class Migration:
+    """A schema change and an optional batched data backfill"""
+    version: int
+    name: str
+    apply: Callable[[Database, str], None]  # (db, db_type), idempotent
+    # (db, db_type, after_id, batch_size) -> last id processed, or None when done
+    backfill: Optional[Callable[[Database, str, int, int], Optional[int]]] = None
+
+def _create_tables(db: Database, db_type: str) -> None:
+    """Base tables, without secondary indexes (those are built by a later migration)"""
+    with db.atomic():
+        for model in (ProcessedJobModel, JobFingerprintModel):
+            model._schema.create_table(safe=True)
+
+def _add_normalized_columns(db: Database, db_type: str) -> None:
+    """Normalized salary/remote columns and the technologies table"""
+    table = ProcessedJobModel._meta.table_name
+    existing = {column.name for column in db.get_columns(table)}
+    missing = [(name, field) for name, field in NORMALIZED_COLUMNS.items() if name not in existing]
+    
+    migrator = SchemaMigrator.from_database(db)
+    with db.atomic():
+        # Nullable columns without defaults only touch the catalog, not the rows
+        if missing:
+            migrate(*[migrator.add_column(table, name, field) for name, field in missing])
+        JobTechnologyModel._schema.create_table(safe=True)
+
+def _backfill_normalized_fields(db: Database, db_type: str, after_id: int, batch_size: int) -> Optional[int]:
+    """Fill normalized columns and technologies for one batch of rows"""
+    rows = list(ProcessedJobModel
+                .select(ProcessedJobModel.id, ProcessedJobModel.job_url, ProcessedJobModel.salary,
+                        ProcessedJobModel.location, ProcessedJobModel.analysis_json)
+                .where(ProcessedJobModel.id > after_id)
+                .order_by(ProcessedJobModel.id)
+                .limit(batch_size))
+    if not rows:
+        return None
+    
+    with db.atomic():
+        for row in rows:
+            analysis = row.get_analysis_lazy()
+            ProcessedJobModel.update(
+                **normalized_fields(row.salary, row.location, analysis)
+            ).where(ProcessedJobModel.id == row.id).execute()
+            JobTechnologyModel.replace_for_job(row.job_url, normalized_technologies(analysis))
+    
+    return rows[-1].id
+
+def _create_model_indexes(db: Database, db_type: str, models) -> None:
+    """
+    Secondary indexes of models
+    
+    PostgreSQL builds them CONCURRENTLY, outside a transaction, so writers are not
+    blocked while a large table is indexed. SQLite has no concurrent index builds.
+    Indexes on columns a later migration adds are left to that migration (SQLite
+    would otherwise index the missing column's name as a string literal).
+    """
+    for model in models:
+        columns = {column.name for column in db.get_columns(model._meta.table_name)}
+        for index in model._meta.fields_to_index():
+            if any(isinstance(expression, Field) and expression.column_name not in columns
+                   for expression in index._expressions):
+                continue
+            sql, params = db.get_sql_context().sql(index.safe(True)).query()
+            if db_type == 'postgresql':
+                sql = sql.replace('CREATE UNIQUE INDEX', 'CREATE UNIQUE INDEX CONCURRENTLY', 1) \
+                         .replace('CREATE INDEX', 'CREATE INDEX CONCURRENTLY', 1)
+            db.execute_sql(sql, params)
+
+def _create_indexes(db: Database, db_type: str) -> None:
+    """Secondary indexes of the job tables"""
+    _create_model_indexes(db, db_type, (ProcessedJobModel, JobFingerprintModel, JobTechnologyModel))
+
+def _create_work_queue(db: Database, db_type: str) -> None:
+    """Work queue table for resumable pipeline runs"""
+    with db.atomic():
+        WorkItemModel._schema.create_table(safe=True)
+    _create_model_indexes(db, db_type, (WorkItemModel,))
+
+def _add_scheduling_columns(db: Database, db_type: str) -> None:
+    """Priority, deadline and retry columns of the work queue"""
+    table = WorkItemModel._meta.table_name
+    existing = {column.name for column in db.get_columns(table)}
+    missing = [(name, field) for name, field in SCHEDULING_COLUMNS.items() if name not in existing]
+    
+    migrator = SchemaMigrator.from_database(db)
+    with db.atomic():
+        if missing:
+            migrate(*[migrator.add_column(table, name, field) for name, field in missing])
+        # Items queued before scheduling keep their first-in, first-out order
+        WorkItemModel.update(deadline=WorkItemModel.created_at).where(WorkItemModel.deadline.is_null()).execute()
+    _create_model_indexes(db, db_type, (WorkItemModel,))
+
+def _create_full_text_index(db: Database, db_type: str) -> None:
+    """Full-text index structures and triggers, where the database supports them"""
+    index = full_text_index_for(db, db_type)
+    if index is None:
+        return
+    try:
+        index.create()
+    except OperationalError:
+        # SQLite compiled without FTS5 or JSON1: search falls back to a substring scan
+        pass
+
+def _backfill_full_text_index(db: Database, db_type: str, after_id: int, batch_size: int) -> Optional[int]:
+    """Index one batch of existing rows"""
+    index = full_text_index_for(db, db_type)
+    if index is None or not index.exists():
+        return None
+    last_id = index.index_batch(after_id, batch_size)
+    if last_id is None:
+        index.optimize()
+    return last_id
+
+def _add_posted_at_column(db: Database, db_type: str) -> None:
+    """Indexed absolute posting time of processed jobs"""
+    table = ProcessedJobModel._meta.table_name
+    if 'posted_at' not in {column.name for column in db.get_columns(table)}:
+        migrator = SchemaMigrator.from_database(db)
+        with db.atomic():
+            migrate(migrator.add_column(table, 'posted_at', DateTimeField(null=True)))
+    _create_model_indexes(db, db_type, (ProcessedJobModel,))
+
+def _backfill_posted_at(db: Database, db_type: str, after_id: int, batch_size: int) -> Optional[int]:
+    """Resolve stored posted times of one batch of rows, counting relative ones from processed_at"""
+    rows = list(ProcessedJobModel
+                .select(ProcessedJobModel.id, ProcessedJobModel.posted_time, ProcessedJobModel.processed_at)
+                .where(ProcessedJobModel.id > after_id)
+                .order_by(ProcessedJobModel.id)
+                .limit(batch_size))
+    if not rows:
+        return None
+    
+    with db.atomic():
+        for row in rows:
+            # processed_at is a naive local time
+            posted_at = TimeExtractor.posted_at_utc(row.posted_time, (row.processed_at or datetime.now()).astimezone())
+            if posted_at:
+                ProcessedJobModel.update(
+                    posted_at=posted_at.replace(tzinfo=None)
+                ).where(ProcessedJobModel.id == row.id).execute()
+    
+    return rows[-1].id
+
+def _prune_full_text_index(db: Database, db_type: str) -> None:
+    """Drop full-text entries orphaned by saves that replaced their row"""
+    index = full_text_index_for(db, db_type)
+    if index is not None and index.exists():
+        with db.atomic():
+            index.prune()
+
+def _noop(db: Database, db_type: str) -> None:
+    """Schema step of a data-only migration"""
+
+def _create_search_watermarks(db: Database, db_type: str) -> None:
+    """Per-query search coverage for incremental date windows"""
+    with db.atomic():
+        SearchWatermarkModel._schema.create_table(safe=True)
+
+# HTTP validators of fetched pages, kept on processed jobs and work items
+VALIDATOR_COLUMNS = {
+    'etag': CharField(max_length=255, null=True),
+    'last_modified': CharField(max_length=64, null=True),
+}
+
+def _add_validator_columns(db: Database, db_type: str) -> None:
+    """Page validators of processed jobs and work items, for conditional re-fetches"""
+    migrator = SchemaMigrator.from_database(db)
+    with db.atomic():
+        for model in (ProcessedJobModel, WorkItemModel):
+            table = model._meta.table_name
+            existing = {column.name for column in db.get_columns(table)}
+            missing = [(name, field) for name, field in VALIDATOR_COLUMNS.items() if name not in existing]
+            if missing:
+                migrate(*[migrator.add_column(table, name, field) for name, field in missing])
+
+# Work queue columns holding times, naive local time before migration 9 and naive UTC since
+WORK_QUEUE_TIME_COLUMNS = ('posted_at', 'deadline', 'retry_at', 'lease_expires_at', 'created_at', 'updated_at')
+
+def _work_queue_times_to_utc(db: Database, db_type: str) -> None:
+    """Convert queued items' times to UTC, once (a marker row makes a rerun a no-op)"""
+    marker = 'work_queue_times_utc'
+    columns = [getattr(WorkItemModel, name) for name in WORK_QUEUE_TIME_COLUMNS]
+    with db.atomic():
+        if SchemaMetaModel.get_or_none(SchemaMetaModel.key == marker):
+            return
+        for row in WorkItemModel.select(WorkItemModel.id, *columns):
+            values = {name: to_naive_utc(getattr(row, name)) for name in WORK_QUEUE_TIME_COLUMNS
+                      if getattr(row, name)}
+            if values:
+                WorkItemModel.update(**values).where(WorkItemModel.id == row.id).execute()
+        SchemaMetaModel.replace(key=marker, value='done').execute()
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, 'create base tables', _create_tables),
+    Migration(2, 'normalized salary, remote and technology fields', _add_normalized_columns,
+              _backfill_normalized_fields),
+    Migration(3, 'secondary indexes', _create_indexes),
+    Migration(4, 'full-text search index', _create_full_text_index, _backfill_full_text_index),
+    Migration(5, 'work queue', _create_work_queue),
+    Migration(6, 'work queue scheduling', _add_scheduling_columns),
+    Migration(7, 'absolute posting times', _add_posted_at_column, _backfill_posted_at),
+    Migration(8, 'search watermarks', _create_search_watermarks),
+    Migration(9, 'work queue times in UTC', _work_queue_times_to_utc),
+    # Databases indexed before the update trigger was limited to indexed columns still had the old one
+    Migration(10, 'full-text update trigger on indexed columns', _create_full_text_index),
+    Migration(11, 'salaries re-parsed without retirement plans', _noop, _backfill_normalized_fields),
+    Migration(12, 'page validators', _add_validator_columns),
+    Migration(13, 'orphaned full-text entries', _prune_full_text_index),
+]
+
+class MigrationRunner:
+    """Applies pending migrations in version order"""
+    
+    VERSION_KEY = 'schema_version'
+    
+    def __init__(self, db: Database, db_type: str, migrations: Optional[List[Migration]] = None):
+        self.db = db
+        self.db_type = db_type
+        self.migrations = sorted(migrations or MIGRATIONS, key=lambda m: m.version)
+        SchemaMetaModel.create_table(safe=True)
+    
+    def _get(self, key: str) -> Optional[str]:
+        row = SchemaMetaModel.get_or_none(SchemaMetaModel.key == key)
+        return row.value if row else None
+    
+    def _set(self, key: str, value: str) -> None:
+        SchemaMetaModel.replace(key=key, value=value).execute()
+    
+    @staticmethod
+    def _backfill_key(migration: Migration) -> str:
+        return f"backfill:{migration.version}"
+    
+    def current_version(self) -> int:
+        """The last fully applied migration version (0 for a new or pre-versioning database)"""
+        return int(self._get(self.VERSION_KEY) or 0)
+    
+    def pending(self) -> List[Migration]:
+        """Migrations that have not been fully applied yet"""
+        current = self.current_version()
+        return [m for m in self.migrations if m.version > current]
+    
+    def status(self) -> Dict[str, object]:
+        """Schema version, pending migrations and the position of a running backfill"""
+        pending = self.pending()
+        return {
+            'version': self.current_version(),
+            'latest': self.migrations[-1].version if self.migrations else 0,
+            'pending': [f"{m.version}: {m.name}" for m in pending],
+            'backfill_position': self._get(self._backfill_key(pending[0])) if pending else None,
+        }
+    
+    def run(self,
+            batch_size: int = 500,
+            progress: Optional[Callable[[Migration, int, int], None]] = None) -> int:
+        """
+        Apply all pending migrations
+        
+        Args:
+            batch_size: Rows per backfill transaction
+            progress: Called as progress(migration, last_id, max_id) after each backfill batch
+            
+        Returns:
+            int: Number of migrations applied
+        """
+        applied = 0
+        for migration in self.pending():
+            migration.apply(self.db, self.db_type)
+            
+            if migration.backfill:
+                self._run_backfill(migration, batch_size, progress)
+            
+            with self.db.atomic():
+                self._set(self.VERSION_KEY, str(migration.version))
+                SchemaMetaModel.delete().where(SchemaMetaModel.key == self._backfill_key(migration)).execute()
+            applied += 1
+        
+        return applied
+    
+    def _run_backfill(self,
+                      migration: Migration,
+                      batch_size: int,
+                      progress: Optional[Callable[[Migration, int, int], None]]) -> None:
+        """Run a backfill from its saved position, saving the position after each batch"""
+        key = self._backfill_key(migration)
+        position = int(self._get(key) or 0)
+        max_id = ProcessedJobModel.select(ProcessedJobModel.id).order_by(ProcessedJobModel.id.desc()).scalar() or 0
+        
+        while True:
+            last_id = migration.backfill(self.db, self.db_type, position, batch_size)
+            if last_id is None:
+                break
+            position = last_id
+            self._set(key, str(position))
+            if progress:
+                progress(migration, position, max(max_id, position))
\ No newline at end of file
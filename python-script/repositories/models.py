@@ -2,12 +2,82 @@
 Peewee models for job processing database
 """
 from peewee import *
-from datetime import datetime
+from playhouse.pool import PooledDatabase
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Mapping, Optional
+from utils.lazy_json import LazyJSONDict, analysis_summary
+from utils.text_extractors import LocationExtractor, SalaryExtractor
 
-# Database proxy - will be initialized by the repository
-database_proxy = DatabaseProxy()
+class DatabaseRouter(DatabaseProxy):
+    """
+    Database proxy that resolves to the database bound in the current context
+    
+    Repositories bind their own database around each call with use(), so several
+    repositories on different databases can live in one process and be shared by
+    worker threads. Outside a binding the proxy falls back to the database it was
+    initialized with, as a plain DatabaseProxy would.
+    """
+    
+    __slots__ = ('_default', '_bound')
+    
+    def __init__(self):
+        object.__setattr__(self, '_bound', ContextVar('bound_database', default=None))
+        super().__init__()
+    
+    def __setattr__(self, attr, value):
+        # Proxy.initialize assigns obj, which here is the fallback database
+        object.__setattr__(self, '_default' if attr == 'obj' else attr, value)
+    
+    @property
+    def obj(self) -> Optional[Database]:
+        bound = self._bound.get()
+        return bound if bound is not None else self._default
+    
+    @contextmanager
+    def use(self, database: Database) -> Iterator[Database]:
+        """Route model queries in this context (thread or task) to a database"""
+        token = self._bound.set(database)
+        try:
+            yield database
+        finally:
+            self._bound.reset(token)
+
+# Database proxy - initialized with the default database, bound per call by repositories
+database_proxy = DatabaseRouter()
+
+@contextmanager
+def checked_out(db: Database) -> Iterator[Database]:
+    """
+    Hold a connection of a pooled database until the outermost caller is done
+    
+    The connection goes back to the pool on exit, unless a transaction is still
+    open on it; SQLite keeps one connection open per thread instead.
+    """
+    opened = isinstance(db, PooledDatabase) and db.is_closed()
+    if opened:
+        db.connect()
+    try:
+        yield db
+    finally:
+        if opened and not db.in_transaction():
+            db.close()
+
+@contextmanager
+def bound_connection(db: Database) -> Iterator[Database]:
+    """Route model queries in this context to a database, on a connection held for the block"""
+    with database_proxy.use(db), checked_out(db):
+        yield db
+
+def utc_now() -> datetime:
+    """The current time as state shared between machines is stored: naive UTC"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """A timezone-aware time, or a naive local one, as stored: naive UTC"""
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value else None
 
 class BaseModel(Model):
     """Base model with common functionality"""
@@ -37,19 +107,41 @@ class ProcessedJobModel(BaseModel):
     fit_score = IntegerField(constraints=[Check('fit_score >= 1 AND fit_score <= 5')])
     analysis_json = TextField()  # JSON string of full analysis
     
+    # Normalized from the fields above and analysis_json on save, for indexed filtering.
+    # is_remote is NULL only on rows that have not been backfilled yet.
+    salary_min = IntegerField(null=True)  # Yearly, in the posting's currency
+    salary_max = IntegerField(null=True)
+    is_remote = BooleanField(null=True)
+    
+    # Absolute posting time in UTC, resolved from relative times like "2 days ago" when parsed
+    posted_at = DateTimeField(null=True, index=True)
+    
     # Metadata
     processed_at = DateTimeField(default=datetime.now, index=True)
     content_hash = CharField(max_length=64)  # SHA-256 hash
     processing_version = CharField(max_length=10, default='1.0')
     
+    # HTTP validators of the fetched page, for conditional re-fetches
+    etag = CharField(max_length=255, null=True)
+    last_modified = CharField(max_length=64, null=True)
+    
     class Meta:
         table_name = 'processed_jobs'
         indexes = (
             # Compound indexes for common queries
             (('recommendation', 'processed_at'), False),
+            (('processed_at', 'id'), False),  # Keyset pagination
+            (('recommendation', 'is_remote', 'salary_max'), False),  # "apply + remote + salary >= X"
+            (('is_remote', 'salary_max'), False),
             (('job_url', 'content_hash'), True),  # Unique constraint
         )
     
+    @classmethod
+    def next_id_batch(cls, after_id: int, batch_size: int) -> List[int]:
+        """Ids of the next batch_size rows after an id, for batched backfills"""
+        query = cls.select(cls.id).where(cls.id > after_id).order_by(cls.id).limit(batch_size)
+        return [job_id for job_id, in query.tuples()]
+    
     def get_analysis_dict(self) -> Dict[str, Any]:
         """Parse analysis JSON to dictionary"""
         try:
@@ -57,12 +149,133 @@ class ProcessedJobModel(BaseModel):
         except json.JSONDecodeError:
             return {}
     
-    def set_analysis_dict(self, analysis: Dict[str, Any]) -> None:
+    def get_analysis_lazy(self) -> LazyJSONDict:
+        """Wrap analysis JSON so it is only parsed when a field is accessed"""
+        return LazyJSONDict(self.analysis_json)
+    
+    def set_analysis_dict(self, analysis: Mapping[str, Any]) -> None:
         """Set analysis from dictionary"""
-        self.analysis_json = json.dumps(analysis)
+        if isinstance(analysis, LazyJSONDict):
+            self.analysis_json = analysis.to_json()
+        else:
+            self.analysis_json = json.dumps(analysis)
     
     def __str__(self):
         return f"{self.job_title} at {self.company or 'Unknown'} - {self.recommendation}"
 
+class JobFingerprintModel(BaseModel):
+    """SimHash fingerprint of a processed job's content, split into indexed bands"""
+    
+    job_url = CharField(unique=True, max_length=500)
+    fingerprint = CharField(max_length=16)  # 64-bit SimHash as hex
+    band0 = IntegerField(index=True)
+    band1 = IntegerField(index=True)
+    band2 = IntegerField(index=True)
+    band3 = IntegerField(index=True)
+    
+    class Meta:
+        table_name = 'job_fingerprints'
+
+class JobTechnologyModel(BaseModel):
+    """Normalized technology from a processed job's analysis, one row per job and technology"""
+    
+    job_url = CharField(max_length=500, index=True)
+    technology = CharField(max_length=100)  # Lowercased
+    
+    class Meta:
+        table_name = 'job_technologies'
+        indexes = (
+            (('technology', 'job_url'), True),
+        )
+    
+    @classmethod
+    def replace_for_job(cls, job_url: str, technologies: List[str]) -> None:
+        """Replace the stored technologies of a job"""
+        cls.delete().where(cls.job_url == job_url).execute()
+        if technologies:
+            cls.insert_many([
+                {'job_url': job_url, 'technology': technology} for technology in technologies
+            ]).execute()
+
+class WorkItemModel(BaseModel):
+    """
+    Durable pipeline state of a discovered job, with artifacts of finished stages
+    
+    Times are naive UTC, so workers on machines in different timezones agree on them.
+    """
+    
+    job_url = CharField(unique=True, max_length=500)
+    job_json = TextField()  # The discovered Job
+    state = CharField(max_length=20, default='discovered')
+    
+    # Stage artifacts, cleared once the job reaches a final state
+    content = TextField(null=True)
+    content_hash = CharField(max_length=64, null=True)
+    content_fingerprint = CharField(max_length=16, null=True)
+    analysis_json = TextField(null=True)
+    etag = CharField(max_length=255, null=True)  # HTTP validators of the fetched page
+    last_modified = CharField(max_length=64, null=True)
+    
+    # Scheduling: items are claimed in deadline order, failed items wait until retry_at
+    priority = FloatField(null=True)
+    posted_at = DateTimeField(null=True)
+    deadline = DateTimeField(null=True)
+    retry_at = DateTimeField(null=True)
+    
+    attempts = IntegerField(default=0)
+    last_error = TextField(null=True)
+    lease_owner = CharField(max_length=100, null=True)
+    lease_expires_at = DateTimeField(null=True)
+    created_at = DateTimeField(default=utc_now)
+    updated_at = DateTimeField(default=utc_now)
+    
+    class Meta:
+        table_name = 'work_queue'
+        indexes = (
+            # Claim scans: unfinished items whose lease is free or expired
+            (('state', 'lease_expires_at'), False),
+            # Claim order
+            (('deadline',), False),
+        )
+
+class SearchWatermarkModel(BaseModel):
+    """How far a search query has been covered, for incremental date windows"""
+    
+    query = CharField(primary_key=True, max_length=255)
+    searched_at = DateTimeField()  # Fetch time of the last successful search, naive UTC
+    newest_posted_at = DateTimeField(null=True)  # Newest posting seen for the query, naive UTC
+    
+    class Meta:
+        table_name = 'search_watermarks'
+
+def normalized_fields(salary: Optional[str], location: Optional[str],
+                      analysis: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Normalized column values for a processed job
+    
+    The salary comes from the extracted salary text, falling back to the analysis
+    salary range; a job is remote if either its location or the analysis location
+    says so.
+    """
+    summary = analysis_summary(analysis)
+    salary_min, salary_max = SalaryExtractor.parse_range(salary)
+    if salary_min is None:
+        salary_min, salary_max = SalaryExtractor.parse_range(summary.get('salary_range'))
+    
+    return {
+        'salary_min': salary_min,
+        'salary_max': salary_max,
+        'is_remote': LocationExtractor.is_remote(location, summary.get('location')),
+    }
+
+def normalized_technologies(analysis: Mapping[str, Any]) -> List[str]:
+    """Lowercased, de-duplicated key technologies from an analysis"""
+    technologies = analysis_summary(analysis).get('key_technologies') or []
+    if not isinstance(technologies, list):
+        return []
+    
+    names = (tech.strip().lower()[:100] for tech in technologies if isinstance(tech, str))
+    return list(dict.fromkeys(name for name in names if name))
+
 # List of all models for easy reference
-MODELS = [ProcessedJobModel]
\ No newline at end of file
+MODELS = [ProcessedJobModel, JobFingerprintModel, JobTechnologyModel, WorkItemModel, SearchWatermarkModel]
\ No newline at end of file
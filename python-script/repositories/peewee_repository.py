@@ -2,11 +2,63 @@
 Peewee ORM implementation of JobRepository
 """
 from peewee import *
-from typing import Optional, Dict, Any, List
+from playhouse.pool import PooledDatabase
+from typing import Optional, Dict, Any, List, Callable, Iterator, Iterable, Tuple
 from datetime import datetime
+import functools
+import inspect
 
 from .base import JobRepository, ProcessedJob
-from .models import ProcessedJobModel, database_proxy, MODELS
+from .models import (
+    ProcessedJobModel, JobFingerprintModel, JobTechnologyModel, database_proxy, bound_connection, checked_out,
+    normalized_fields, normalized_technologies
+)
+from .migrations import MigrationRunner
+from .search_index import FullTextIndex, get_full_text_index
+from .write_queue import SerializedWriter
+from utils.error_handling import DatabaseError
+from utils.hash_utils import SimHasher
+
+def _reads(method):
+    """Run a repository method against the repository's own database"""
+    if inspect.isgeneratorfunction(method):
+        @functools.wraps(method)
+        def generator(self, *args, **kwargs):
+            # Bound only while the generator runs: a binding held across yields would
+            # route the consumer's own queries to this database. A pooled connection
+            # stays checked out until the generator finishes.
+            with checked_out(self.db):
+                items = method(self, *args, **kwargs)
+                try:
+                    while True:
+                        with database_proxy.use(self.db):
+                            try:
+                                item = next(items)
+                            except StopIteration:
+                                return
+                        yield item
+                finally:
+                    with database_proxy.use(self.db):
+                        items.close()
+        return generator
+    
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with bound_connection(self.db):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def _writes(method):
+    """Like _reads, but runs on the serialized writer when the repository has one"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        def write():
+            with bound_connection(self.db):
+                return method(self, *args, **kwargs)
+        if self._writer is None:
+            return write()
+        return self._writer.call(write)
+    return wrapper
 
 class PeeweeJobRepository(JobRepository):
     """Peewee ORM implementation of JobRepository"""
@@ -19,42 +71,104 @@ class PeeweeJobRepository(JobRepository):
             database_config: Database configuration dict with keys:
                 - type: 'sqlite', 'postgresql', 'mysql'
                 - path/host: database path or host
+                - auto_migrate: apply pending schema migrations on startup (default True)
+                - max_connections, stale_timeout: connection pool settings (PostgreSQL/MySQL)
+                - serialize_writes: run all writes on one writer thread (default True for SQLite)
                 - Additional connection parameters
+        
+        The repository is safe to share between threads: every thread gets its own
+        connection (from the pool on PostgreSQL/MySQL) and model queries are routed
+        to this repository's database even when other repositories exist.
         """
+        self.db_type = database_config.get('type', 'sqlite').lower()
         self.db = self._create_database(database_config)
+        # Fallback for model queries made outside repository methods
         database_proxy.initialize(self.db)
-        self._create_tables()
+        self._pooled = isinstance(self.db, PooledDatabase)
+        self._writer = None
+        if database_config.get('serialize_writes', self.db_type == 'sqlite'):
+            self._writer = SerializedWriter(on_exit=self.db.close)
+        self.full_text_index = None
+        if database_config.get('auto_migrate', True):
+            self._create_tables()
     
     def _create_database(self, config: Dict[str, Any]) -> Database:
         """Create database instance based on configuration"""
         db_type = config.get('type', 'sqlite').lower()
         
+        pool = {
+            'max_connections': config.get('max_connections', 20),
+            'stale_timeout': config.get('stale_timeout', 300),
+        }
+        
         if db_type == 'sqlite':
-            return SqliteDatabase(config.get('path', 'jobs.db'))
+            # Connections are per thread. WAL lets readers run while the writer commits,
+            # and the timeout makes a blocked writer wait instead of failing at once.
+            return SqliteDatabase(
+                config.get('path', 'jobs.db'),
+                timeout=config.get('busy_timeout', 10),
+                pragmas={'journal_mode': 'wal'}
+            )
         elif db_type == 'postgresql':
-            return PostgresqlDatabase(
+            # The extension database adds server-side (named) cursors for streaming reads
+            try:
+                from playhouse.pool import PooledPostgresqlExtDatabase
+            except ImportError:
+                from playhouse.postgres_ext import PooledPostgresqlExtDatabase
+            return PooledPostgresqlExtDatabase(
                 config['database'],
                 host=config.get('host', 'localhost'),
                 port=config.get('port', 5432),
                 user=config.get('user'),
-                password=config.get('password')
+                password=config.get('password'),
+                **pool
             )
         elif db_type == 'mysql':
-            return MySQLDatabase(
+            from playhouse.pool import PooledMySQLDatabase
+            return PooledMySQLDatabase(
                 config['database'],
                 host=config.get('host', 'localhost'),
                 port=config.get('port', 3306),
                 user=config.get('user'),
-                password=config.get('password')
+                password=config.get('password'),
+                **pool
             )
         else:
             raise ValueError(f"Unsupported database type: {db_type}")
     
     def _create_tables(self):
-        """Create database tables if they don't exist"""
-        with self.db:
-            self.db.create_tables(MODELS, safe=True)
+        """Create or upgrade the schema by applying pending migrations"""
+        self.migrate()
+    
+    @_writes
+    def migrate(self,
+                batch_size: int = 500,
+                progress: Optional[Callable[[Any, int, int], None]] = None) -> int:
+        """
+        Apply pending schema migrations and their data backfills
+        
+        Backfills save their position after every batch, so an interrupted
+        migration continues where it stopped the next time this runs.
+        
+        Args:
+            batch_size: Rows per backfill transaction
+            progress: Called as progress(migration, last_id, max_id) after each batch
+            
+        Returns:
+            int: Number of migrations applied
+        """
+        # No enclosing transaction: each migration step and backfill batch commits on its own
+        with self.db.connection_context():
+            applied = MigrationRunner(self.db, self.db_type).run(batch_size, progress)
+            self.full_text_index = get_full_text_index(self.db, self.db_type)
+        return applied
     
+    @_reads
+    def get_schema_status(self) -> Dict[str, Any]:
+        """Current schema version, pending migrations and backfill position"""
+        return MigrationRunner(self.db, self.db_type).status()
+    
+    @_reads
     def is_job_processed(self, job_url: str) -> bool:
         """Check if a job has been processed"""
         try:
@@ -64,8 +178,32 @@ class PeeweeJobRepository(JobRepository):
         except Exception:
             return False
     
+    def _write_transaction(self):
+        """
+        Transaction for a write
+        
+        On SQLite it takes the write lock up front: a deferred transaction that has
+        already read cannot wait for a lock held by another connection (e.g. a work
+        queue thread) and fails at once with "database is locked".
+        """
+        return self.db.atomic('IMMEDIATE') if self.db_type == 'sqlite' else self.db.atomic()
+    
+    @_writes
     def save_processed_job(self, processed_job: ProcessedJob) -> None:
         """Save a processed job"""
+        # One transaction, so concurrent readers never see a partly saved job
+        with self._write_transaction():
+            self._save(processed_job)
+    
+    @_writes
+    def save_processed_jobs(self, processed_jobs: Iterable[ProcessedJob]) -> None:
+        """Save a batch of processed jobs in a single transaction"""
+        with self._write_transaction():
+            for processed_job in processed_jobs:
+                self._save(processed_job)
+    
+    def _save(self, processed_job: ProcessedJob) -> None:
+        """Write a processed job, its technologies and fingerprint; caller holds a transaction"""
         model_data = {
             'job_url': processed_job.job_url,
             'job_title': processed_job.job_title,
@@ -80,21 +218,45 @@ class PeeweeJobRepository(JobRepository):
             'fit_score': processed_job.fit_score,
             'processed_at': processed_job.processed_at,
             'content_hash': processed_job.content_hash,
-            'processing_version': processed_job.processing_version
+            'processing_version': processed_job.processing_version,
+            'posted_at': processed_job.posted_at,
+            'etag': processed_job.etag,
+            'last_modified': processed_job.last_modified,
+            **normalized_fields(processed_job.salary, processed_job.location, processed_job.analysis_json)
         }
         
         # Create model instance and set analysis JSON
         model = ProcessedJobModel(**model_data)
         model.set_analysis_dict(processed_job.analysis_json)
         
-        # Use replace to handle duplicates
-        try:
-            model.save(force_insert=False)
-        except IntegrityError:
-            # If URL already exists, update it
-            ProcessedJobModel.replace(**model_data, 
-                                    analysis_json=model.analysis_json).execute()
+        # Upsert: a URL saved again keeps its row and id, and the update fires the
+        # full-text index trigger (REPLACE deleted the row without firing any)
+        values = {**model_data, 'analysis_json': model.analysis_json}
+        conflict = {} if self.db_type == 'mysql' else {'conflict_target': [ProcessedJobModel.job_url]}
+        ProcessedJobModel.insert(**values).on_conflict(
+            preserve=[getattr(ProcessedJobModel, name) for name in values if name != 'job_url'], **conflict
+        ).execute()
     
+        JobTechnologyModel.replace_for_job(
+            processed_job.job_url, normalized_technologies(processed_job.analysis_json)
+        )
+        
+        if processed_job.content_fingerprint:
+            self._save_fingerprint(processed_job.job_url, processed_job.content_fingerprint)
+    
+    def _save_fingerprint(self, job_url: str, fingerprint: str) -> None:
+        """Store the content fingerprint and its lookup bands for a job"""
+        bands = SimHasher.bands(fingerprint)
+        JobFingerprintModel.replace(
+            job_url=job_url,
+            fingerprint=fingerprint,
+            band0=bands[0],
+            band1=bands[1],
+            band2=bands[2],
+            band3=bands[3]
+        ).execute()
+    
+    @_reads
     def get_processed_job(self, job_url: str) -> Optional[ProcessedJob]:
         """Retrieve a specific processed job"""
         try:
@@ -103,6 +265,16 @@ class PeeweeJobRepository(JobRepository):
         except ProcessedJobModel.DoesNotExist:
             return None
     
+    @_reads
+    def get_job_state(self, job_url: str) -> Optional[Tuple[str, str]]:
+        """(content_hash, recommendation) of a processed job, without loading its analysis"""
+        return (ProcessedJobModel
+                .select(ProcessedJobModel.content_hash, ProcessedJobModel.recommendation)
+                .where(ProcessedJobModel.job_url == job_url)
+                .tuples()
+                .first())
+    
+    @_reads
     def get_processed_jobs(self, 
                           recommendation: Optional[str] = None,
                           limit: Optional[int] = None,
@@ -118,6 +290,186 @@ class PeeweeJobRepository(JobRepository):
         
         return [self._model_to_processed_job(model) for model in query]
     
+    @_reads
+    def iter_processed_jobs(self,
+                            filters: Optional[Dict[str, Any]] = None,
+                            batch_size: int = 1000) -> Iterator[ProcessedJob]:
+        """
+        Stream processed jobs, newest first, in constant memory
+        
+        Uses keyset pagination on (processed_at, id), so each batch is an index range
+        scan regardless of depth, and rows are converted one at a time.
+        
+        Args:
+            filters: Optional filters - 'recommendation', 'processed_after',
+                     'processed_before' (datetimes, exclusive), 'min_id', 'max_id'
+                     (inclusive), 'remote' (bool), 'min_salary' (yearly amount the
+                     salary range reaches), 'technology' (case-insensitive),
+                     'posted_after' (naive UTC datetime, exclusive)
+            batch_size: Number of rows fetched per query
+            
+        Yields:
+            ProcessedJob: Processed jobs ordered by processed_at, id descending
+        """
+        filters = filters or {}
+        last_key = None
+        
+        while True:
+            query = self._apply_filters(ProcessedJobModel.select(), filters).order_by(
+                ProcessedJobModel.processed_at.desc(), ProcessedJobModel.id.desc()
+            )
+            
+            if last_key:
+                processed_at, job_id = last_key
+                query = query.where(
+                    (ProcessedJobModel.processed_at < processed_at) |
+                    ((ProcessedJobModel.processed_at == processed_at) & (ProcessedJobModel.id < job_id))
+                )
+            
+            count = 0
+            for model in self._iterate(query.limit(batch_size)):
+                count += 1
+                last_key = (model.processed_at, model.id)
+                yield self._model_to_processed_job(model)
+            
+            if count < batch_size:
+                break
+    
+    @_reads
+    def iter_job_states(self,
+                        processed_after: Optional[datetime] = None,
+                        limit: Optional[int] = None,
+                        after_id: Optional[int] = None) -> Iterator[Tuple[int, str, str, str]]:
+        """Stream (id, job_url, content_hash, recommendation), newest first, in one query"""
+        query = (ProcessedJobModel
+                 .select(ProcessedJobModel.id, ProcessedJobModel.job_url,
+                         ProcessedJobModel.content_hash, ProcessedJobModel.recommendation)
+                 .order_by(ProcessedJobModel.processed_at.desc(), ProcessedJobModel.id.desc()))
+        if processed_after:
+            query = query.where(ProcessedJobModel.processed_at > processed_after)
+        if after_id is not None:
+            query = query.where(ProcessedJobModel.id > after_id)
+        if limit:
+            query = query.limit(limit)
+        yield from query.tuples().iterator()
+    
+    @staticmethod
+    def _apply_filters(query: Select, filters: Dict[str, Any]) -> Select:
+        """Apply iter_processed_jobs style filters to a ProcessedJobModel query"""
+        if filters.get('recommendation'):
+            query = query.where(ProcessedJobModel.recommendation == filters['recommendation'])
+        if filters.get('processed_after'):
+            query = query.where(ProcessedJobModel.processed_at > filters['processed_after'])
+        if filters.get('processed_before'):
+            query = query.where(ProcessedJobModel.processed_at < filters['processed_before'])
+        if filters.get('posted_after'):
+            query = query.where(ProcessedJobModel.posted_at > filters['posted_after'])
+        if filters.get('min_id') is not None:
+            query = query.where(ProcessedJobModel.id >= filters['min_id'])
+        if filters.get('max_id') is not None:
+            query = query.where(ProcessedJobModel.id <= filters['max_id'])
+        if filters.get('remote') is not None:
+            query = query.where(ProcessedJobModel.is_remote == bool(filters['remote']))
+        if filters.get('min_salary') is not None:
+            # Jobs whose advertised range reaches the requested salary
+            query = query.where(ProcessedJobModel.salary_max >= filters['min_salary'])
+        if filters.get('technology'):
+            query = query.where(ProcessedJobModel.job_url.in_(
+                JobTechnologyModel.select(JobTechnologyModel.job_url).where(
+                    JobTechnologyModel.technology == filters['technology'].strip().lower()
+                )
+            ))
+        return query
+    
+    @_reads
+    def search_processed_jobs(self,
+                              query: str,
+                              filters: Optional[Dict[str, Any]] = None,
+                              limit: int = 50) -> List[ProcessedJob]:
+        """
+        Full-text search over job titles, companies and analysis summaries
+        
+        Every term in the query has to match (as a word prefix). Results are ranked
+        by bm25 on SQLite and ts_rank_cd on PostgreSQL. Databases without a
+        full-text index fall back to an unranked substring scan.
+        
+        Args:
+            query: Free text search query
+            filters: Same filters as iter_processed_jobs
+            limit: Maximum number of results
+            
+        Returns:
+            List[ProcessedJob]: Matching jobs, best match first
+        """
+        terms = FullTextIndex.terms(query)
+        if not terms:
+            return []
+        
+        select = self._apply_filters(ProcessedJobModel.select(), filters or {})
+        
+        if self.full_text_index is not None:
+            select = self.full_text_index.search(select, terms)
+        else:
+            for term in terms:
+                select = select.where(
+                    ProcessedJobModel.job_title.contains(term) |
+                    ProcessedJobModel.company.contains(term) |
+                    ProcessedJobModel.analysis_json.contains(term)
+                )
+            select = select.order_by(ProcessedJobModel.processed_at.desc())
+        
+        return [self._model_to_processed_job(model) for model in select.limit(limit)]
+    
+    @_writes
+    def rebuild_search_index(self) -> int:
+        """
+        Rebuild the full-text index from processed_jobs
+        
+        Returns:
+            int: Number of rows indexed
+            
+        Raises:
+            DatabaseError: If the database has no full-text index (MySQL, SQLite without
+                FTS5, or migrations not applied yet)
+        """
+        if self.full_text_index is None:
+            raise DatabaseError(f"No full-text index on this {self.db_type} database; "
+                                f"it needs FTS5 (SQLite) or PostgreSQL and the schema migrations applied")
+        return self.full_text_index.rebuild()
+    
+    def _iterate(self, query: Select) -> Iterable[ProcessedJobModel]:
+        """Iterate a query without caching rows; uses a server-side cursor on Postgres"""
+        if self.db_type == 'postgresql':
+            from playhouse.postgres_ext import ServerSide
+            
+            # Named cursors only live inside a transaction
+            with self.db.atomic():
+                yield from ServerSide(query)
+        else:
+            yield from query.iterator()
+    
+    @_reads
+    def get_id_bucket_counts(self, bucket_size: int) -> Dict[int, int]:
+        """
+        Count processed jobs per id range
+        
+        Only touches the primary key index, so it stays cheap even when the
+        table is large.
+        
+        Args:
+            bucket_size: Number of ids per bucket
+            
+        Returns:
+            Dict[int, int]: Row count keyed by id // bucket_size
+        """
+        bucket = (ProcessedJobModel.id / bucket_size).alias('bucket')
+        query = (ProcessedJobModel
+                 .select(bucket, fn.COUNT(ProcessedJobModel.id).alias('count'))
+                 .group_by(SQL('bucket'))
+                 .tuples())
+        return {int(bucket): count for bucket, count in query}
+    
+    @_reads
     def get_processing_stats(self) -> Dict[str, Any]:
         """Get statistics about processed jobs"""
         try:
@@ -164,6 +516,7 @@ class PeeweeJobRepository(JobRepository):
                 'avg_confidence': 0.0
             }
     
+    @_reads
     def has_content_changed(self, job_url: str, current_content_hash: str) -> bool:
         """Check if job content has changed since last processing"""
         try:
@@ -172,9 +525,110 @@ class PeeweeJobRepository(JobRepository):
         except ProcessedJobModel.DoesNotExist:
             return True  # Job not processed yet, so content is "changed"
     
+    @_reads
+    def find_near_duplicate(self, content_fingerprint: str, max_distance: int = 3) -> Optional[ProcessedJob]:
+        """
+        Find a processed job whose content fingerprint is within max_distance bits
+        
+        Candidates are looked up through the indexed bands, so only jobs sharing at
+        least one band are compared. This is exhaustive for max_distance < SimHasher.BANDS.
+        
+        Args:
+            content_fingerprint: SimHash fingerprint of the new content
+            max_distance: Maximum Hamming distance to treat as a duplicate
+            
+        Returns:
+            ProcessedJob: Closest matching processed job, or None
+        """
+        bands = SimHasher.bands(content_fingerprint)
+        candidates = JobFingerprintModel.select().where(
+            (JobFingerprintModel.band0 == bands[0]) |
+            (JobFingerprintModel.band1 == bands[1]) |
+            (JobFingerprintModel.band2 == bands[2]) |
+            (JobFingerprintModel.band3 == bands[3])
+        )
+        
+        best_match, best_distance = None, max_distance + 1
+        for candidate in candidates:
+            distance = SimHasher.hamming_distance(content_fingerprint, candidate.fingerprint)
+            if distance < best_distance:
+                best_match, best_distance = candidate, distance
+        
+        if best_match is None:
+            return None
+        
+        processed_job = self.get_processed_job(best_match.job_url)
+        if processed_job:
+            processed_job.content_fingerprint = best_match.fingerprint
+        return processed_job
+    
+    @_writes
+    def merge_duplicate_urls(self, canonicalize: Callable[[str], str]) -> Dict[str, int]:
+        """
+        One-off migration: rewrite job URLs to their canonical form and merge rows
+        that collapse onto the same URL, keeping the most recently processed one
+        
+        Rewritten rows get a new processed_at, so incremental readers such as the
+        sharded report pick them up.
+        
+        Args:
+            canonicalize: Function mapping a raw job URL to its canonical form
+            
+        Returns:
+            Dict with counts of 'rewritten' and 'merged' rows
+        """
+        groups: Dict[str, List[ProcessedJobModel]] = {}
+        query = ProcessedJobModel.select().order_by(ProcessedJobModel.processed_at.desc())
+        for model in query:
+            groups.setdefault(canonicalize(model.job_url), []).append(model)
+        
+        counts = {'rewritten': 0, 'merged': 0}
+        with self._write_transaction():
+            for canonical_url, models in groups.items():
+                keep, duplicates = models[0], models[1:]
+                
+                fingerprints = {
+                    row.job_url: row for row in JobFingerprintModel.select().where(
+                        JobFingerprintModel.job_url.in_([m.job_url for m in models])
+                    )
+                }
+                fingerprint = fingerprints.get(keep.job_url) or next(iter(fingerprints.values()), None)
+                
+                if duplicates:
+                    duplicate_urls = [m.job_url for m in duplicates]
+                    ProcessedJobModel.delete().where(ProcessedJobModel.job_url.in_(duplicate_urls)).execute()
+                    counts['merged'] += len(duplicates)
+                
+                if keep.job_url != canonical_url:
+                    ProcessedJobModel.update(job_url=canonical_url, processed_at=datetime.now()).where(
+                        ProcessedJobModel.id == keep.id
+                    ).execute()
+                    counts['rewritten'] += 1
+                
+                if duplicates:
+                    JobTechnologyModel.delete().where(
+                        JobTechnologyModel.job_url.in_(duplicate_urls)
+                    ).execute()
+                if keep.job_url != canonical_url:
+                    JobTechnologyModel.update(job_url=canonical_url).where(
+                        JobTechnologyModel.job_url == keep.job_url
+                    ).execute()
+                
+                if fingerprints:
+                    JobFingerprintModel.delete().where(
+                        JobFingerprintModel.job_url.in_(list(fingerprints.keys()))
+                    ).execute()
+                    self._save_fingerprint(canonical_url, fingerprint.fingerprint)
+        
+        return counts
+    
     def close(self) -> None:
-        """Clean up resources"""
-        if not self.db.is_closed():
+        """Finish queued writes and close all connections"""
+        if self._writer is not None:
+            self._writer.close()
+        if self._pooled:
+            self.db.close_all()
+        elif not self.db.is_closed():
             self.db.close()
     
     def _model_to_processed_job(self, model: ProcessedJobModel) -> ProcessedJob:
@@ -191,8 +645,15 @@ class PeeweeJobRepository(JobRepository):
             recommendation=model.recommendation,
             confidence=model.confidence,
             fit_score=model.fit_score,
-            analysis_json=model.get_analysis_dict(),
+            analysis_json=model.get_analysis_lazy(),
             processed_at=model.processed_at,
             content_hash=model.content_hash,
-            processing_version=model.processing_version
+            processing_version=model.processing_version,
+            salary_min=model.salary_min,
+            salary_max=model.salary_max,
+            is_remote=model.is_remote,
+            posted_at=model.posted_at,
+            etag=model.etag,
+            last_modified=model.last_modified,
+            id=model.id
         )
\ No newline at end of file
@@ -0,0 +1,278 @@
+"""
+Full-text search index over processed jobs
+
+SQLite uses an FTS5 table kept in sync by triggers; PostgreSQL uses a tsvector
+column maintained by a trigger and covered by a GIN index. Both index the job
+title, company and the job_summary, fit_summary and key_technologies fields of
+the analysis JSON.
+"""
+import re
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional
+
+from peewee import Database, Entity, Expression, NodeList, SQL, Select, Table, fn
+
+from .models import ProcessedJobModel
+
+TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+class FullTextIndex(ABC):
+    """Database specific full-text index for the processed_jobs table"""
+    
+    def __init__(self, db: Database):
+        self.db = db
+    
+    @staticmethod
+    def terms(text: str) -> List[str]:
+        """Split a user query into search terms, dropping any query syntax"""
+        return TERM_PATTERN.findall(text.lower())
+    
+    @abstractmethod
+    def create(self) -> None:
+        """Create the index structures and triggers if missing; existing rows are not indexed"""
+        pass
+    
+    @abstractmethod
+    def exists(self) -> bool:
+        """Whether the index has been created"""
+        pass
+    
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all indexed rows"""
+        pass
+    
+    @abstractmethod
+    def _index_range(self, min_id: int, max_id: int) -> None:
+        """(Re)index the processed_jobs rows with ids in [min_id, max_id]"""
+        pass
+    
+    def optimize(self) -> None:
+        """Compact the index after a bulk load"""
+        pass
+    
+    def prune(self) -> None:
+        """Remove entries of rows that no longer exist"""
+        pass
+    
+    def index_batch(self, after_id: int, batch_size: int) -> Optional[int]:
+        """
+        Index the next batch of rows after an id, in one transaction
+        
+        Returns:
+            Optional[int]: Last id indexed, or None when no rows are left
+        """
+        ids = ProcessedJobModel.next_id_batch(after_id, batch_size)
+        if not ids:
+            return None
+        with self.db.atomic():
+            self._index_range(ids[0], ids[-1])
+        return ids[-1]
+    
+    def rebuild(self, batch_size: int = 1000, progress: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Rebuild the index from processed_jobs in batches
+        
+        Each batch is its own transaction, so writers are never blocked for long.
+        
+        Args:
+            batch_size: Rows per transaction
+            progress: Called with the last indexed id after each batch
+            
+        Returns:
+            int: Number of rows indexed
+        """
+        self.clear()
+        count = 0
+        last_id = 0
+        while True:
+            ids = ProcessedJobModel.next_id_batch(last_id, batch_size)
+            if not ids:
+                break
+            with self.db.atomic():
+                self._index_range(ids[0], ids[-1])
+            count += len(ids)
+            last_id = ids[-1]
+            if progress:
+                progress(last_id)
+        self.optimize()
+        return count
+    
+    @abstractmethod
+    def search(self, query: Select, terms: List[str]) -> Select:
+        """Restrict a ProcessedJobModel query to rows matching all terms, best match first"""
+        pass
+
+class SQLiteFullTextIndex(FullTextIndex):
+    """FTS5 virtual table keyed by processed_jobs.id"""
+    
+    TABLE = 'processed_jobs_fts'
+    COLUMNS = ('job_title', 'company', 'job_summary', 'fit_summary', 'key_technologies')
+    # bm25 column weights, in COLUMNS order
+    WEIGHTS = (10.0, 5.0, 2.0, 1.0, 4.0)
+    
+    @classmethod
+    def _values(cls, row: str) -> str:
+        """SQL expressions for the indexed columns of a processed_jobs row alias"""
+        analysis = f"CASE WHEN json_valid({row}.analysis_json) THEN {row}.analysis_json ELSE '{{}}' END"
+        return ', '.join([
+            f"{row}.job_title",
+            f"{row}.company",
+            f"json_extract({analysis}, '$.job_summary')",
+            f"json_extract({analysis}, '$.fit_summary')",
+            f"(SELECT group_concat(value, ' ') FROM json_each({analysis}, '$.summary.key_technologies'))",
+        ])
+    
+    def _insert_sql(self, row: str) -> str:
+        return f"INSERT INTO {self.TABLE}(rowid, {', '.join(self.COLUMNS)}) VALUES ({row}.id, {self._values(row)})"
+    
+    def create(self) -> None:
+        with self.db.atomic():
+            self.db.execute_sql(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.TABLE} USING fts5("
+                f"{', '.join(self.COLUMNS)}, tokenize = 'porter unicode61')"
+            )
+            # Ids can be reused after the newest row is deleted, so clear the rowid first.
+            # Saves upsert rather than REPLACE, which would delete rows without firing _ad.
+            # Triggers are dropped and recreated, so running create again updates their definitions
+            triggers = {
+                'ai': f"AFTER INSERT ON processed_jobs BEGIN "
+                      f"DELETE FROM {self.TABLE} WHERE rowid = new.id; "
+                      f"{self._insert_sql('new')}; END",
+                'ad': f"AFTER DELETE ON processed_jobs BEGIN "
+                      f"DELETE FROM {self.TABLE} WHERE rowid = old.id; END",
+                'au': f"AFTER UPDATE OF job_title, company, analysis_json ON processed_jobs BEGIN "
+                      f"DELETE FROM {self.TABLE} WHERE rowid = old.id; "
+                      f"{self._insert_sql('new')}; END",
+            }
+            for suffix, definition in triggers.items():
+                self.db.execute_sql(f"DROP TRIGGER IF EXISTS {self.TABLE}_{suffix}")
+                self.db.execute_sql(f"CREATE TRIGGER {self.TABLE}_{suffix} {definition}")
+    
+    def exists(self) -> bool:
+        return self.db.table_exists(self.TABLE)
+    
+    def clear(self) -> None:
+        self.db.execute_sql(f"DELETE FROM {self.TABLE}")
+    
+    def _index_range(self, min_id: int, max_id: int) -> None:
+        # Rows written since the triggers were created are already indexed
+        self.db.execute_sql(f"DELETE FROM {self.TABLE} WHERE rowid BETWEEN ? AND ?", (min_id, max_id))
+        self.db.execute_sql(
+            f"INSERT INTO {self.TABLE}(rowid, {', '.join(self.COLUMNS)}) "
+            f"SELECT p.id, {self._values('p')} FROM processed_jobs p WHERE p.id BETWEEN ? AND ?",
+            (min_id, max_id)
+        )
+    
+    def optimize(self) -> None:
+        self.db.execute_sql(f"INSERT INTO {self.TABLE}({self.TABLE}) VALUES ('optimize')")
+    
+    def prune(self) -> None:
+        self.db.execute_sql(f"DELETE FROM {self.TABLE} WHERE rowid NOT IN (SELECT id FROM processed_jobs)")
+    
+    def search(self, query: Select, terms: List[str]) -> Select:
+        # Each term is quoted, so FTS5 operators in user input are matched literally
+        match = ' '.join(f'"{term}"*' for term in terms)
+        fts = Table(self.TABLE).alias(self.TABLE)
+        table = Entity(self.TABLE)
+        # MATCH has to be evaluated on the FTS table itself, so rank in a subquery
+        matches = (fts
+                   .select(fts.c.rowid, fn.bm25(table, *self.WEIGHTS).alias('rank'))
+                   .where(NodeList((table, SQL('MATCH'), match)))
+                   .alias('matches'))
+        return (query
+                .join(matches, on=(matches.c.rowid == ProcessedJobModel.id))
+                .order_by(matches.c.rank))
+
+class PostgresFullTextIndex(FullTextIndex):
+    """Weighted tsvector column on processed_jobs with a GIN index"""
+    
+    COLUMN = 'search_vector'
+    CONFIG = 'english'
+    
+    def create(self) -> None:
+        with self.db.atomic():
+            self.db.execute_sql(f"ALTER TABLE processed_jobs ADD COLUMN IF NOT EXISTS {self.COLUMN} tsvector")
+            self.db.execute_sql(f"""
+                CREATE OR REPLACE FUNCTION processed_jobs_search_vector() RETURNS trigger AS $$
+                DECLARE
+                    analysis jsonb;
+                    technologies text;
+                BEGIN
+                    BEGIN
+                        analysis := NEW.analysis_json::jsonb;
+                    EXCEPTION WHEN others THEN
+                        analysis := '{{}}'::jsonb;
+                    END;
+                    IF jsonb_typeof(analysis->'summary'->'key_technologies') = 'array' THEN
+                        SELECT string_agg(value, ' ') INTO technologies
+                        FROM jsonb_array_elements_text(analysis->'summary'->'key_technologies');
+                    END IF;
+                    NEW.{self.COLUMN} :=
+                        setweight(to_tsvector('{self.CONFIG}', coalesce(NEW.job_title, '')), 'A') ||
+                        setweight(to_tsvector('{self.CONFIG}', coalesce(NEW.company, '')), 'B') ||
+                        setweight(to_tsvector('{self.CONFIG}', coalesce(technologies, '')), 'B') ||
+                        setweight(to_tsvector('{self.CONFIG}', coalesce(analysis->>'job_summary', '')), 'C') ||
+                        setweight(to_tsvector('{self.CONFIG}', coalesce(analysis->>'fit_summary', '')), 'D');
+                    RETURN NEW;
+                END
+                $$ LANGUAGE plpgsql
+            """)
+            self.db.execute_sql("DROP TRIGGER IF EXISTS processed_jobs_search_vector_trigger ON processed_jobs")
+            self.db.execute_sql(
+                "CREATE TRIGGER processed_jobs_search_vector_trigger "
+                "BEFORE INSERT OR UPDATE OF job_title, company, analysis_json ON processed_jobs "
+                "FOR EACH ROW EXECUTE FUNCTION processed_jobs_search_vector()"
+            )
+        # Outside the transaction: a concurrent build does not block writers
+        self.db.execute_sql(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS processed_jobs_search_idx "
+            f"ON processed_jobs USING GIN ({self.COLUMN})"
+        )
+    
+    def exists(self) -> bool:
+        return any(column.name == self.COLUMN for column in self.db.get_columns('processed_jobs'))
+    
+    def clear(self) -> None:
+        # Vectors are recomputed in place, so a rebuild never leaves rows unsearchable
+        pass
+    
+    def _index_range(self, min_id: int, max_id: int) -> None:
+        # Touching an indexed column fires the trigger, which recomputes the vector
+        self.db.execute_sql(
+            "UPDATE processed_jobs SET job_title = job_title WHERE id BETWEEN %s AND %s",
+            (min_id, max_id)
+        )
+    
+    def search(self, query: Select, terms: List[str]) -> Select:
+        # Prefix match every term; terms are \w+ so they carry no tsquery syntax
+        tsquery = fn.to_tsquery(self.CONFIG, ' & '.join(f"{term}:*" for term in terms))
+        vector = SQL(self.COLUMN)
+        return (query
+                .where(Expression(vector, '@@', tsquery))
+                .order_by(fn.ts_rank_cd(vector, tsquery).desc()))
+
+def full_text_index_for(db: Database, db_type: str) -> Optional[FullTextIndex]:
+    """
+    The full-text index implementation for a database type
+    
+    Returns:
+        Optional[FullTextIndex]: None when the database type (e.g. MySQL) has no
+        supported full-text search
+    """
+    if db_type == 'sqlite':
+        return SQLiteFullTextIndex(db)
+    if db_type == 'postgresql':
+        return PostgresFullTextIndex(db)
+    return None
+
+def get_full_text_index(db: Database, db_type: str) -> Optional[FullTextIndex]:
+    """
+    The full-text index of a database, if it has been created by the migrations
+    
+    Returns:
+        Optional[FullTextIndex]: None when the database has no full-text index, e.g.
+        MySQL or SQLite compiled without FTS5
+    """
+    index = full_text_index_for(db, db_type)
+    return index if index is not None and index.exists() else None
\ No newline at end of file
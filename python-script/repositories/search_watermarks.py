@@ -0,0 +1,128 @@
+"""
+Per-query high-water marks for incremental searches
+"""
+import math
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from peewee import Database
+
+from .models import SearchWatermarkModel, bound_connection
+
+DATE_RESTRICT_PATTERN = re.compile(r'^([dwmy])(\d+)$')
+DAYS_PER_UNIT = {'d': 1, 'w': 7, 'm': 31, 'y': 366}
+
+def _to_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored naive UTC time as a timezone-aware datetime"""
+    return value.replace(tzinfo=timezone.utc) if value else None
+
+def _to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Timezone-aware time as stored, in naive UTC"""
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value else None
+
+class SearchWatermarks:
+    """
+    How far each search query has been covered, so later runs only ask for what is new
+    
+    After a successful search the fetch time is recorded for its query. The next
+    search of the query picks the narrowest dateRestrict window (in whole days,
+    as the search API counts them) reaching back to that time, less index_lag_hours
+    for postings the search index had not picked up yet. Queries never searched,
+    or not searched for longer than the default window, use the default window.
+    """
+    
+    def __init__(self, db: Database, db_type: str, index_lag_hours: float = 12, default_window: str = 'd3'):
+        """
+        Args:
+            db: Database holding the search_watermarks table (created by the migrations)
+            db_type: 'sqlite', 'postgresql' or 'mysql'
+            index_lag_hours: How long after posting a job may first show up in search results
+            default_window: dateRestrict of a first search, and the widest window used
+        """
+        self.db = db
+        self.db_type = db_type
+        self.index_lag = timedelta(hours=index_lag_hours)
+        self.default_window = default_window
+    
+    @staticmethod
+    def window_days(date_restrict: str) -> int:
+        """Days covered by a dateRestrict value such as 'd3' or 'w1'"""
+        match = DATE_RESTRICT_PATTERN.match(date_restrict or '')
+        if not match:
+            raise ValueError(f"Invalid dateRestrict: {date_restrict!r}")
+        return DAYS_PER_UNIT[match.group(1)] * int(match.group(2))
+    
+    def get(self, query: str) -> Optional[SearchWatermarkModel]:
+        """The stored watermark of a query, if it has been searched"""
+        with bound_connection(self.db):
+            return SearchWatermarkModel.get_or_none(SearchWatermarkModel.query == query)
+    
+    def cutoff(self, query: str) -> Optional[datetime]:
+        """
+        Posting time up to which the query's results were already seen
+        
+        Returns:
+            datetime: Timezone-aware UTC time, or None if the query was never searched
+        """
+        watermark = self.get(query)
+        if watermark is None:
+            return None
+        return _to_utc(watermark.searched_at) - self.index_lag
+    
+    def date_restrict(self, query: str, now: Optional[datetime] = None) -> str:
+        """
+        The narrowest dateRestrict covering everything since the query's last search
+        
+        Args:
+            query: Search query
+            now: Time of the new search, timezone-aware (default: now)
+            
+        Returns:
+            str: dateRestrict value, e.g. 'd1'
+        """
+        cutoff = self.cutoff(query)
+        if cutoff is None:
+            return self.default_window
+        
+        days = math.ceil(((now or datetime.now(timezone.utc)) - cutoff) / timedelta(days=1))
+        if days >= self.window_days(self.default_window):
+            return self.default_window
+        return f"d{max(days, 1)}"
+    
+    def covers(self, query: str, date_restrict: Optional[str], now: Optional[datetime] = None) -> bool:
+        """
+        Whether a search with this dateRestrict reaches back to the query's cutoff
+        
+        Windows at least as wide as the default one count as covering: older gaps
+        are never searched again either way.
+        """
+        cutoff = self.cutoff(query)
+        if cutoff is None or not date_restrict:
+            return True
+        days = self.window_days(date_restrict)
+        if days >= self.window_days(self.default_window):
+            return True
+        return (now or datetime.now(timezone.utc)) - timedelta(days=days) <= cutoff
+    
+    def advance(self, query: str, searched_at: datetime, newest_posted_at: Optional[datetime] = None) -> None:
+        """
+        Record a successful search of a query
+        
+        Args:
+            query: Search query
+            searched_at: When the search results were fetched, timezone-aware
+            newest_posted_at: Newest posting time among the results, if any was known
+        """
+        with bound_connection(self.db), self.db.atomic():
+            watermark = SearchWatermarkModel.get_or_none(SearchWatermarkModel.query == query)
+            newest = _to_naive_utc(newest_posted_at)
+            if watermark is None:
+                SearchWatermarkModel.create(query=query, searched_at=_to_naive_utc(searched_at),
+                                            newest_posted_at=newest)
+                return
+            if watermark.newest_posted_at and (newest is None or watermark.newest_posted_at > newest):
+                newest = watermark.newest_posted_at
+            SearchWatermarkModel.update(
+                searched_at=max(watermark.searched_at, _to_naive_utc(searched_at)), newest_posted_at=newest
+            ).where(SearchWatermarkModel.query == query).execute()
\ No newline at end of file
@@ -0,0 +1,368 @@
+"""
+Durable work queue for resumable job processing
+"""
+import json
+import os
+import socket
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Optional, Dict, Any, List, Iterator
+
+from peewee import Database, fn
+from playhouse.pool import PooledDatabase
+
+from job_types import Job
+from utils.error_handling import LeaseLostError
+from .models import WorkItemModel, bound_connection, utc_now, to_naive_utc
+
+class WorkState(Enum):
+    """Pipeline stage a work item has completed"""
+    DISCOVERED = "discovered"
+    FETCHED = "fetched"
+    CLASSIFIED = "classified"
+    ANALYZED = "analyzed"
+    SAVED = "saved"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+
+FINAL_STATES = (WorkState.SAVED, WorkState.SKIPPED, WorkState.FAILED)
+
+@dataclass
+class WorkItem:
+    """A discovered job and the artifacts of the stages it has completed"""
+    job: Job
+    state: WorkState = WorkState.DISCOVERED
+    content: Optional[str] = None
+    content_hash: Optional[str] = None
+    content_fingerprint: Optional[str] = None
+    analysis: Optional[Dict[str, Any]] = None
+    etag: Optional[str] = None  # HTTP validators of the fetched page
+    last_modified: Optional[str] = None
+    priority: Optional[float] = None
+    posted_at: Optional[datetime] = None
+    deadline: Optional[datetime] = None
+    attempts: int = 0
+    id: Optional[int] = None  # Set for items stored in a WorkQueue
+    last_error: Optional[str] = field(default=None, repr=False)
+
+def default_owner() -> str:
+    """Lease owner unique to this process across machines sharing a database"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class WorkQueue:
+    """
+    Persisted queue of discovered jobs with per-stage state and leased claims
+    
+    Every stage result is stored as it completes, so a run that dies resumes each
+    job at the stage where it stopped, reusing fetched content and analyses that
+    were already paid for. Items are claimed earliest deadline first; without
+    explicit deadlines that is the order they were queued in. A failed item is
+    retried after retry_seconds, doubling with each attempt, until it has failed
+    max_attempts times.
+    
+    Any number of processes, on any number of machines, can share one queue.
+    Claims never hand the same item to two owners: PostgreSQL and MySQL lock the
+    claimed rows with SKIP LOCKED, so concurrent claims pass over each other's
+    rows instead of waiting, and SQLite claims with a single UPDATE under the
+    database write lock. Claimed items are leased to their owner, and a
+    heartbeat thread renews the leases while the owner is alive; the items of a
+    worker that dies become claimable once its leases expire. Lease, retry and
+    deadline times are stored in naive UTC, so workers in different timezones
+    agree on them.
+    """
+    
+    ARTIFACTS = ('content', 'content_hash', 'content_fingerprint', 'analysis', 'etag', 'last_modified')
+    
+    def __init__(self,
+                 db: Database,
+                 db_type: str,
+                 owner: Optional[str] = None,
+                 lease_seconds: int = 60,
+                 max_attempts: int = 3,
+                 retry_seconds: int = 300,
+                 heartbeat: bool = True):
+        """
+        Args:
+            db: Database holding the work_queue table (created by the migrations)
+            db_type: 'sqlite', 'postgresql' or 'mysql'
+            owner: Lease owner, host:pid by default. A fixed owner takes its items
+                   back on restart instead of waiting for their leases to expire,
+                   but must not be shared by processes running at the same time.
+            lease_seconds: How long a claim is valid without being renewed
+            max_attempts: Failures after which an item is marked failed
+            retry_seconds: Wait before retrying a failed item, doubled per attempt
+            heartbeat: Renew held leases every lease_seconds / 3 from a background thread
+        """
+        self.db = db
+        self.db_type = db_type
+        self.owner = owner or default_owner()
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_attempts = max_attempts
+        self.retry_delay = timedelta(seconds=retry_seconds)
+        self._pooled = isinstance(db, PooledDatabase)
+        self._heartbeat = heartbeat
+        self._heartbeat_thread = None
+        self._stopped = threading.Event()
+        # Ids of claimed items still being worked on, possibly by several threads
+        self._held = set()
+        self._held_lock = threading.Lock()
+    
+    @contextmanager
+    def _transaction(self):
+        """A write transaction bound to this queue's database"""
+        with bound_connection(self.db):
+            if self.db_type == 'sqlite':
+                # Take the write lock up front so a claim's read and update are atomic
+                with self.db.atomic('IMMEDIATE'):
+                    yield
+            else:
+                with self.db.atomic():
+                    yield
+    
+    @staticmethod
+    def _to_item(row: WorkItemModel) -> WorkItem:
+        return WorkItem(
+            job=Job(**json.loads(row.job_json)),
+            state=WorkState(row.state),
+            content=row.content,
+            content_hash=row.content_hash,
+            content_fingerprint=row.content_fingerprint,
+            analysis=json.loads(row.analysis_json) if row.analysis_json else None,
+            etag=row.etag,
+            last_modified=row.last_modified,
+            priority=row.priority,
+            posted_at=row.posted_at,
+            deadline=row.deadline,
+            attempts=row.attempts,
+            id=row.id,
+            last_error=row.last_error,
+        )
+    
+    def enqueue(self,
+                job: Job,
+                priority: Optional[float] = None,
+                posted_at: Optional[datetime] = None,
+                deadline: Optional[datetime] = None) -> bool:
+        """
+        Add a discovered job unless its URL is already queued
+        
+        Args:
+            job: Discovered job
+            priority: Scheduling priority, for reference
+            posted_at: Absolute posting time in naive UTC, if known
+            deadline: Claim order key in naive UTC (default: now, i.e. first in, first out)
+            
+        Returns:
+            bool: True if the job was added
+        """
+        with self._transaction():
+            inserted = (WorkItemModel
+                        .insert(job_url=job.url, job_json=json.dumps(job.to_dict()),
+                                priority=priority, posted_at=posted_at,
+                                deadline=deadline or utc_now())
+                        .on_conflict_ignore()
+                        .as_rowcount()
+                        .execute())
+        return inserted > 0
+    
+    def _claimable(self, now: datetime):
+        """Unfinished items due for a (re)try whose lease is free, expired or already ours"""
+        return (WorkItemModel.state.not_in([state.value for state in FINAL_STATES]) &
+                (WorkItemModel.retry_at.is_null() | (WorkItemModel.retry_at <= now)) &
+                (WorkItemModel.lease_expires_at.is_null() |
+                 (WorkItemModel.lease_expires_at < now) |
+                 (WorkItemModel.lease_owner == self.owner)))
+    
+    def claim(self, limit: int = 1) -> List[WorkItem]:
+        """
+        Lease up to limit claimable items to this queue's owner
+        
+        Returns:
+            List[WorkItem]: Claimed items, earliest deadline first
+        """
+        now = utc_now()
+        expires_at = now + self.lease
+        with self._held_lock:
+            held = list(self._held)
+        candidates = (WorkItemModel
+                      .select(WorkItemModel.id)
+                      .where(self._claimable(now) & WorkItemModel.id.not_in(held))
+                      .order_by(WorkItemModel.deadline, WorkItemModel.id)
+                      .limit(limit))
+        lease = {'lease_owner': self.owner, 'lease_expires_at': expires_at, 'updated_at': now}
+        
+        with self._transaction():
+            if self.db_type == 'sqlite':
+                # One statement picks and leases the items; the stamp identifies them afterwards
+                claimed = WorkItemModel.update(**lease).where(WorkItemModel.id.in_(candidates)).execute()
+                query = WorkItemModel.select().where(
+                    (WorkItemModel.lease_owner == self.owner) & (WorkItemModel.lease_expires_at == expires_at)
+                )
+            else:
+                # Rows locked by a concurrent claim are skipped rather than waited for
+                ids = [row.id for row in candidates.for_update('FOR UPDATE SKIP LOCKED')]
+                claimed = len(ids) and WorkItemModel.update(**lease).where(WorkItemModel.id.in_(ids)).execute()
+                query = WorkItemModel.select().where(WorkItemModel.id.in_(ids))
+            rows = list(query.order_by(WorkItemModel.deadline, WorkItemModel.id)) if claimed else []
+        
+        with self._held_lock:
+            self._held.update(row.id for row in rows)
+        if rows and self._heartbeat:
+            self._start_heartbeat()
+        return [self._to_item(row) for row in rows]
+    
+    def iter_claims(self, batch_size: int = 10) -> Iterator[WorkItem]:
+        """Claim and yield items in batches until none are claimable"""
+        while True:
+            items = self.claim(batch_size)
+            if not items:
+                return
+            yield from items
+    
+    def next_deadline(self) -> Optional[datetime]:
+        """Earliest deadline among claimable items not held by this owner"""
+        now = utc_now()
+        with bound_connection(self.db):
+            row = (WorkItemModel
+                   .select(WorkItemModel.deadline)
+                   .where(self._claimable(now) &
+                          (WorkItemModel.lease_owner.is_null() | (WorkItemModel.lease_owner != self.owner)))
+                   .order_by(WorkItemModel.deadline)
+                   .first())
+        return row.deadline if row else None
+    
+    def _update(self, item: WorkItem, release: bool = False, **values) -> None:
+        if item.id is None:
+            return
+        if release:
+            values.update(lease_owner=None, lease_expires_at=None)
+        with self._transaction():
+            updated = WorkItemModel.update(updated_at=utc_now(), **values).where(
+                (WorkItemModel.id == item.id) & (WorkItemModel.lease_owner == self.owner)
+            ).execute()
+        if release or not updated:
+            with self._held_lock:
+                self._held.discard(item.id)
+        if not updated:
+            raise LeaseLostError(f"Lease on {item.job.url} was taken over by another worker")
+    
+    def advance(self, item: WorkItem, state: WorkState, **artifacts) -> None:
+        """
+        Record a completed stage and its artifacts, renewing the lease
+        
+        Args:
+            item: Claimed item; updated in place
+            state: Stage just completed
+            **artifacts: content, content_hash, content_fingerprint, analysis, etag and/or last_modified
+            
+        Raises:
+            LeaseLostError: If the item's lease expired and another worker claimed it
+        """
+        for name, value in artifacts.items():
+            if name not in self.ARTIFACTS:
+                raise ValueError(f"Unknown work item artifact: {name}")
+            setattr(item, name, value)
+        item.state = state
+        
+        values = {name: value for name, value in artifacts.items() if name != 'analysis'}
+        if 'analysis' in artifacts:
+            values['analysis_json'] = json.dumps(artifacts['analysis'])
+        self._update(item, state=state.value, lease_expires_at=utc_now() + self.lease, **values)
+    
+    def finish(self, item: WorkItem, state: WorkState, reason: Optional[str] = None) -> None:
+        """
+        Mark an item saved or skipped, dropping its artifacts and lease
+        
+        Only mark an item saved once its processed job is stored: enqueue skips
+        the URL from then on.
+        """
+        item.state = state
+        self._update(item, release=True, state=state.value, last_error=reason, content=None, analysis_json=None)
+    
+    def fail(self, item: WorkItem, error: str) -> None:
+        """Count a failed attempt; the item is retried later or, after max_attempts, marked failed"""
+        item.attempts += 1
+        item.last_error = error
+        if item.attempts >= self.max_attempts:
+            item.state = WorkState.FAILED
+        retry_at = utc_now() + self.retry_delay * 2 ** (item.attempts - 1)
+        self._update(item, release=True, state=item.state.value, attempts=item.attempts, last_error=error,
+                     retry_at=retry_at)
+    
+    def park(self, item: WorkItem, until: datetime, reason: str) -> None:
+        """
+        Give a claimed item back until a given time without counting an attempt, e.g. while a service is down
+        
+        Args:
+            item: Claimed item
+            until: When it may be claimed again, timezone-aware or naive local time
+            reason: Why it was parked
+        """
+        item.last_error = reason
+        self._update(item, release=True, last_error=reason, retry_at=to_naive_utc(until))
+    
+    def release(self, item: WorkItem) -> None:
+        """Give a claimed item back without counting an attempt"""
+        self._update(item, release=True)
+    
+    def renew_leases(self) -> int:
+        """
+        Extend the leases of all unfinished items held by this owner
+        
+        Returns:
+            int: Number of leases renewed
+        """
+        with self._transaction():
+            return WorkItemModel.update(lease_expires_at=utc_now() + self.lease).where(
+                (WorkItemModel.lease_owner == self.owner) &
+                WorkItemModel.state.not_in([state.value for state in FINAL_STATES])
+            ).execute()
+    
+    def release_all(self) -> int:
+        """Give back every item held by this owner, e.g. on shutdown"""
+        with self._transaction():
+            released = WorkItemModel.update(lease_owner=None, lease_expires_at=None).where(
+                WorkItemModel.lease_owner == self.owner
+            ).execute()
+        with self._held_lock:
+            self._held.clear()
+        return released
+    
+    def _start_heartbeat(self) -> None:
+        if self._heartbeat_thread is None or not self._heartbeat_thread.is_alive():
+            self._stopped.clear()
+            self._heartbeat_thread = threading.Thread(
+                target=self._run_heartbeat, name='work-queue-heartbeat', daemon=True
+            )
+            self._heartbeat_thread.start()
+    
+    def _run_heartbeat(self) -> None:
+        interval = self.lease.total_seconds() / 3
+        try:
+            while not self._stopped.wait(interval):
+                try:
+                    self.renew_leases()
+                except Exception as e:
+                    print(f"Work queue heartbeat failed: {e}")
+        finally:
+            if not self._pooled:
+                self.db.close()
+    
+    def counts(self) -> Dict[str, int]:
+        """Number of items in each state"""
+        with bound_connection(self.db):
+            query = (WorkItemModel
+                     .select(WorkItemModel.state, fn.COUNT(WorkItemModel.id))
+                     .group_by(WorkItemModel.state)
+                     .tuples())
+            return {state: count for state, count in query}
+    
+    def close(self) -> None:
+        """Stop the heartbeat and hand unfinished items back to other workers"""
+        self._stopped.set()
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join()
+        self.release_all()
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""
+Serialized database writer shared by concurrent workers
+"""
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+class SerializedWriter:
+    """
+    Runs write operations one at a time on a dedicated thread
+    
+    SQLite allows a single writer per database; several threads writing through
+    their own connections contend for the lock and eventually fail with
+    "database is locked". Funnelling all writes through one thread (and one
+    connection) removes that contention while readers keep their own connections.
+    """
+    
+    def __init__(self, name: str = 'db-writer', on_exit: Optional[Callable[[], Any]] = None):
+        """
+        Args:
+            name: Name of the writer thread
+            on_exit: Called on the writer thread when it stops, e.g. to close its connection
+        """
+        self.name = name
+        self.on_exit = on_exit
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+    
+    def _start(self) -> None:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"{self.name} is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+    
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            future, func, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+        
+        if self.on_exit:
+            self.on_exit()
+    
+    def in_writer_thread(self) -> bool:
+        """Whether the caller is the writer thread itself"""
+        return threading.current_thread() is self._thread
+    
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> Future:
+        """Queue a write and return a future for its result"""
+        self._start()
+        future: Future = Future()
+        self._queue.put((future, func, args, kwargs))
+        return future
+    
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a write on the writer thread and wait for its result
+        
+        Writes issued from the writer thread itself (e.g. a write method calling
+        another) run inline instead of deadlocking on the queue.
+        """
+        if self.in_writer_thread():
+            return func(*args, **kwargs)
+        return self.submit(func, *args, **kwargs).result()
+    
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Finish queued writes and stop the writer thread"""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            self._queue.put(None)
+            thread.join(timeout)
\ No newline at end of file
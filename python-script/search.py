@@ -7,11 +7,11 @@ https://www.googleapis.com/customsearch/v1?key=AIzaSyBZ8z92vQwxxsXEwKl2p3T_4Px-T
 import requests
 from ollama import chat
 import urllib.parse
-import re
 import hashlib
 from typing import List, Optional
 
 from job_types import Job
+from utils.text_extractors import ExtractionEngine
 from data import RESUME, PREFERENCES
 from repositories.factory import RepositoryFactory
 from repositories.base import ProcessedJob
@@ -62,96 +62,20 @@ def search_and_process_jobs(search_term: str) -> List[Job]:
     
     # Transform to simplified structure
     jobs = []
+    extraction_engine = ExtractionEngine()
     
     # Process each job listing
     for item in data.get('items', []):
         title = item.get('title', '')
         snippet = item.get('snippet', '')
         link = item.get('link', '')
-        display_link = item.get('displayLink', '')
         
-        # Extract posted time from snippet (e.g., "2 days ago", "10 hours ago")
-        posted_time_match = re.search(r'(\d+\s+(?:day|hour|minute|second)s?\s+ago)', snippet)
-        posted_time = posted_time_match.group(1) if posted_time_match else 'Unknown'
-        
-        # Extract company name from multiple sources
-        company = None
-        
-        # Method 1: Look for "@ Company" pattern in title
-        company_match = re.search(r'@\s*([^\|\-]+?)(?:\s*$|\s*\||\s*\-)', title)
-        if company_match:
-            company = company_match.group(1).strip()
-        
-        # Method 2: Try to extract from display link (e.g., "boards.greenhouse.io" -> look for company in URL)
-        if not company and 'greenhouse.io' in display_link:
-            # For greenhouse URLs like "boards.greenhouse.io/toast/jobs/6940670"
-            greenhouse_match = re.search(r'boards\.greenhouse\.io/([^/]+)/', link)
-            if greenhouse_match:
-                company = greenhouse_match.group(1).replace('-', ' ').title()
-        
-        # Method 3: Look for company names in metatags
-        if not company:
-            pagemap = item.get('pagemap', {})
-            metatags = pagemap.get('metatags', [{}])
-            if metatags:
-                og_title = metatags[0].get('og:title', '')
-                # Look for patterns like "Job Title - Company" or "Job Title | Company"
-                company_patterns = [
-                    r'\-\s*([^\-\|]+?)\s*$',  # "Job Title - Company"
-                    r'\|\s*([^\-\|]+?)\s*$',  # "Job Title | Company"
-                    r'at\s+([^\-\|]+?)(?:\s*$|\s*\||\s*\-)',  # "Job Title at Company"
-                ]
-                for pattern in company_patterns:
-                    match = re.search(pattern, og_title)
-                    if match:
-                        company = match.group(1).strip()
-                        break
-        
-        # Extract location from title and metadata
-        location = None
-        
-        # Method 1: Look for location patterns in title
-        location_patterns = [
-            r'Remote\s*-\s*([^\-\|]+)',  # "Remote - USA"
-            r'([^\-\|]+)\s*-\s*Remote',  # "USA - Remote" 
-            r'\-\s*([^\-\|,]+(?:,\s*[^\-\|]+)*)\s*$',  # Location at end after dash
-        ]
-        
-        for pattern in location_patterns:
-            match = re.search(pattern, title)
-            if match:
-                potential_location = match.group(1).strip()
-                # Filter out common non-location terms
-                if not re.search(r'(engineer|developer|software|job|position)', potential_location.lower()):
-                    location = potential_location
-                    break
-        
-        # Method 2: Check snippet for location indicators
-        if not location:
-            snippet_location = re.search(r'Location[:\.]?\s*([^\n\r\.]+)', snippet)
-            if snippet_location:
-                location = snippet_location.group(1).strip()
-        
-        # Method 3: Look for "Remote" keyword
-        if not location and re.search(r'\bremote\b', title.lower()):
-            location = 'Remote'
-        
-        # Extract salary information from snippet
-        salary = None
-        salary_patterns = [
-            r'\$([\d,]+)\s*[–\-]\s*\$([\d,]+)',  # "$150K – $200K"
-            r'Compensation[:\.]?\s*\$([\d,]+)\s*[–\-]\s*\$([\d,]+)',  # "Compensation: $150K – $200K"
-            r'([\d,]+)K\s*[–\-]\s*([\d,]+)K',  # "150K – 200K"
-        ]
-        
-        for pattern in salary_patterns:
-            match = re.search(pattern, snippet)
-            if match:
-                if len(match.groups()) == 2:
-                    salary = f"${match.group(1)} - ${match.group(2)}"
-                else:
-                    salary = f"${match.group(1)}"
-                break
+        # Extract posted time, company, location and salary in one pass
+        fields = extraction_engine.extract_item(item)
+        posted_time = fields.posted_time
+        company = fields.company
+        location = fields.location
+        salary = fields.salary
         
         # Get logo URL from pagemap
         logo_url = None
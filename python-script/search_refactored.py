@@ -3,14 +3,25 @@ JobSeekr - AI-powered job search and analysis tool (Refactored)
 
 This is the new main entry point using the refactored architecture.
 """
+import sys
+import time
 from services.search_service import SearchService
-from services.content_service import ContentService
+from services.content_service import ContentServiceFactory, ContentBackend
 from services.ai_service import AIServiceFactory, AIBackend
 from parsers.job_parser import JobParser
 from parsers.content_analyzer import ContentAnalyzer
 from core.job_workflow import JobWorkflow
+from core.scheduler import PriorityScheduler
 from repositories.factory import RepositoryFactory
+from repositories.buffered import BufferedJobRepository
+from repositories.caching import CachingJobRepository
+from repositories.bloom import BloomFilterJobRepository, default_filter_path
+from repositories.instrumented import InstrumentedJobRepository
+from repositories.work_queue import WorkQueue
+from repositories.search_watermarks import SearchWatermarks
 from config import config
+from utils.adaptive_limiter import get_limiter
+from utils.circuit_breaker import get_breaker
 from utils.error_handling import JobSeekrError, ConfigurationError
 
 def create_workflow() -> JobWorkflow:
@@ -37,6 +48,15 @@ def create_workflow() -> JobWorkflow:
         if not api_key or not cx:
             raise ConfigurationError("Google Search API key and CX are required")
         
+        # Concurrency limits shared by all clients of each external service
+        for service, options in config.get('limits', {}).items():
+            get_limiter(service, **options)
+        
+        # Circuit breakers, so a service that is down fails fast instead of timing out per job
+        breaker_config = config.get('circuit_breaker', {})
+        for service in ('search', 'content', 'ollama', 'anthropic'):
+            get_breaker(service, **breaker_config)
+        
         # Create services
         search_service = SearchService(
             api_key=api_key,
@@ -44,15 +64,17 @@ def create_workflow() -> JobWorkflow:
             base_url=search_config.get('base_url', 'https://www.googleapis.com/customsearch/v1')
         )
         
-        content_service = ContentService(
-            base_url=content_config.get('base_url', 'https://r.jina.ai'),
-            timeout=content_config.get('timeout', 30),
-            max_retries=content_config.get('max_retries', 3)
-        )
+        try:
+            content_backend = ContentBackend(content_config.get('backend', 'jina'))
+        except ValueError:
+            raise ConfigurationError(f"Unknown content backend: {content_config.get('backend')}")
+        content_service = ContentServiceFactory.create(content_backend, **content_config)
         
         # Create AI service
         ai_backend = AIBackend.OLLAMA if ai_config.get('provider') == 'ollama' else AIBackend.ANTHROPIC
         ai_service_kwargs = {'model': ai_config.get('model', 'qwen2.5:14b-instruct-q4_K_M')}
+        if ai_config.get('base_url'):
+            ai_service_kwargs['host' if ai_backend == AIBackend.OLLAMA else 'base_url'] = ai_config['base_url']
         
         if ai_backend == AIBackend.ANTHROPIC:
             anthropic_key = ai_config.get('anthropic_api_key')
@@ -69,13 +91,59 @@ def create_workflow() -> JobWorkflow:
         # Create repository
         repository = RepositoryFactory.create('peewee', database_config=db_config)
         
+        # Take database commits off the per-job critical path
+        write_buffer = db_config.get('write_buffer')
+        if write_buffer:
+            repository = BufferedJobRepository(repository, **write_buffer)
+        
+        # Answer repeated per-URL lookups from memory
+        read_cache = db_config.get('read_cache')
+        if read_cache:
+            repository = CachingJobRepository(repository, **read_cache)
+        
+        # Skip the cache and the database for URLs that were never processed; above the
+        # cache, whose misses would otherwise go straight to the database
+        seen_filter = db_config.get('seen_filter')
+        if seen_filter:
+            seen_filter = {'path': default_filter_path(db_config), **seen_filter}
+            repository = BloomFilterJobRepository(repository, **seen_filter)
+        
+        # Time database calls, including those answered by the layers above
+        repository = InstrumentedJobRepository(repository)
+        
+        # Persist per-job pipeline state so an interrupted run resumes where it stopped
+        work_queue = None
+        scheduler = None
+        queue_config = db_config.get('work_queue')
+        if queue_config:
+            work_queue = WorkQueue(repository.db, repository.db_type, **queue_config)
+            
+            # Claim fresh, promising jobs first
+            scheduler_config = config.get('scheduler')
+            if scheduler_config:
+                scheduler = PriorityScheduler(**scheduler_config)
+        
+        # Search only the time since each query's last run
+        watermarks = None
+        incremental_config = config.get('search.incremental')
+        if incremental_config:
+            watermarks = SearchWatermarks(repository.db, repository.db_type,
+                                          default_window=search_config.get('default_date_restrict', 'd3'),
+                                          **incremental_config)
+        
         # Create workflow
         workflow = JobWorkflow(
             search_service=search_service,
             ai_service=ai_service,
             job_parser=job_parser,
             content_analyzer=content_analyzer,
-            repository=repository
+            repository=repository,
+            work_queue=work_queue,
+            scheduler=scheduler,
+            watermarks=watermarks,
+            threads=config.get('worker.threads', 1),
+            report_path=config.get('instrumentation.report'),
+            trace_path=config.get('instrumentation.trace')
         )
         
         return workflow
@@ -83,19 +151,60 @@ def create_workflow() -> JobWorkflow:
     except Exception as e:
         raise ConfigurationError(f"Failed to create workflow: {str(e)}")
 
+def run_worker(workflow: JobWorkflow, poll_interval: float = 30.0, exit_when_idle: bool = False) -> None:
+    """
+    Process jobs from the shared work queue until interrupted
+    
+    Several workers, on one or more machines, can run against the same database;
+    each job is claimed by only one of them.
+    
+    Args:
+        workflow: Workflow with a work queue
+        poll_interval: Seconds to wait before checking an empty queue again
+        exit_when_idle: Stop once a pass over the queue makes no progress
+    """
+    print(f"👷 Worker {workflow.work_queue.owner} waiting for queued jobs...")
+    while True:
+        workflow.process_queued_jobs()
+        stats = workflow.run_stats
+        # Wait before retrying when every claimed item failed or was parked, as well as when idle
+        if stats['claimed'] == stats['failed_attempts'] + stats['leases_lost'] + stats['parked']:
+            if exit_when_idle:
+                return
+            time.sleep(poll_interval)
+
 def main():
-    """Main entry point"""
+    """
+    Main entry point
+    
+    Usage:
+        python search_refactored.py                 # search, queue and process jobs
+        python search_refactored.py worker [--once] # process queued jobs (--once: exit when idle)
+    """
     try:
+        worker = len(sys.argv) > 1 and sys.argv[1] == 'worker'
         print("🚀 Starting JobSeekr (Refactored)...")
         
         # Create workflow
         workflow = create_workflow()
         
         try:
-            # Process jobs
-            print("🔍 Searching for Software Engineer (Remote) jobs...")
-            processed_jobs = workflow.search_and_process_jobs('Software engineer (remote)')
-            print(f'\\n✅ Successfully processed {len(processed_jobs)} new jobs')
+            if worker:
+                if workflow.work_queue is None:
+                    raise ConfigurationError("Worker mode requires the database.work_queue setting")
+                run_worker(
+                    workflow,
+                    poll_interval=config.get('worker.poll_interval', 30),
+                    exit_when_idle='--once' in sys.argv[2:]
+                )
+            else:
+                # Process jobs
+                print("🔍 Searching for Software Engineer (Remote) jobs...")
+                processed_jobs = workflow.search_and_process_jobs(
+                    'Software engineer (remote)',
+                    max_results=config.get('search.max_results', 10)
+                )
+                print(f'\\n✅ Successfully processed {len(processed_jobs)} new jobs')
             
         finally:
             # Clean up
@@ -5,8 +5,11 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
 from enum import Enum
 import json
-from ollama import chat
-from utils.error_handling import AIAnalysisError
+from ollama import Client
+from utils.error_handling import AIAnalysisError, CircuitOpenError
+from utils.adaptive_limiter import AdaptiveLimiter, get_limiter
+from utils.circuit_breaker import CircuitBreaker, get_breaker
+from utils.instrumentation import span
 
 class AIBackend(Enum):
     """Supported AI backends"""
@@ -18,6 +21,12 @@ class AnalysisType(Enum):
     JOB_POSTING_CLASSIFICATION = "job_posting_classification"
     JOB_FIT_ANALYSIS = "job_fit_analysis"
 
+# Instrumentation stage of each analysis type
+ANALYSIS_STAGES = {
+    AnalysisType.JOB_POSTING_CLASSIFICATION: 'classify',
+    AnalysisType.JOB_FIT_ANALYSIS: 'analyze',
+}
+
 class AIService(ABC):
     """Abstract base class for AI services"""
     
@@ -35,9 +44,14 @@ class OllamaService(AIService):
     """AI service implementation using Ollama"""
     
     def __init__(self, classification_model: str = "qwen2.5:14b-instruct-q4_K_M", 
-                 fit_analysis_model: str = "mistral-small:24b"):
+                 fit_analysis_model: str = "mistral-small:24b", host: Optional[str] = None,
+                 limiter: Optional[AdaptiveLimiter] = None, breaker: Optional[CircuitBreaker] = None):
         self.classification_model = classification_model
         self.fit_analysis_model = fit_analysis_model
+        # Default host: OLLAMA_HOST, or the local server
+        self.client = Client(host=host)
+        self.limiter = limiter or get_limiter('ollama')
+        self.breaker = breaker or get_breaker('ollama')
     
     def analyze_content(self, content: str, analysis_type: AnalysisType, **kwargs) -> str:
         """
@@ -53,6 +67,7 @@ class OllamaService(AIService):
             
         Raises:
             AIAnalysisError: If analysis fails
+            CircuitOpenError: If the backend is down
         """
         try:
             if analysis_type == AnalysisType.JOB_POSTING_CLASSIFICATION:
@@ -64,13 +79,20 @@ class OllamaService(AIService):
             else:
                 raise AIAnalysisError(f"Unsupported analysis type: {analysis_type}")
             
-            response = chat(
-                model=model,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            with span(ANALYSIS_STAGES[analysis_type], backend='ollama', model=model) as timing:
+                with self.breaker.guard() as slot, self.limiter.slot(slot):
+                    response = self.client.chat(
+                        model=model,
+                        messages=[{"role": "user", "content": prompt}]
+                    )
+                    # The client raises on error responses, so returning means the service answered
+                    slot.record(200)
+                timing.tag(prompt_tokens=response.prompt_eval_count, output_tokens=response.eval_count)
             
             return response.message.content
             
+        except CircuitOpenError:
+            raise
         except Exception as e:
             raise AIAnalysisError(f"Ollama analysis failed: {str(e)}")
     
@@ -78,7 +100,7 @@ class OllamaService(AIService):
         """Check if Ollama is available"""
         try:
             # Test with classification model as it's used first
-            response = chat(
+            response = self.client.chat(
                 model=self.classification_model,
                 messages=[{"role": "user", "content": "test"}]
             )
@@ -174,10 +196,13 @@ Focus on practical fit assessment. Consider technical skills match, seniority le
 class AnthropicService(AIService):
     """AI service implementation using Anthropic Claude"""
     
-    def __init__(self, api_key: str, model: str = "claude-sonnet-4-20250514"):
+    def __init__(self, api_key: str, model: str = "claude-sonnet-4-20250514", base_url: Optional[str] = None,
+                 limiter: Optional[AdaptiveLimiter] = None, breaker: Optional[CircuitBreaker] = None):
         import anthropic
-        self.client = anthropic.Anthropic(api_key=api_key)
+        self.client = anthropic.Anthropic(api_key=api_key, base_url=base_url)
         self.model = model
+        self.limiter = limiter or get_limiter('anthropic')
+        self.breaker = breaker or get_breaker('anthropic')
     
     def analyze_content(self, content: str, analysis_type: AnalysisType, **kwargs) -> str:
         """
@@ -193,6 +218,7 @@ class AnthropicService(AIService):
             
         Raises:
             AIAnalysisError: If analysis fails
+            CircuitOpenError: If the backend is down
         """
         try:
             if analysis_type == AnalysisType.JOB_POSTING_CLASSIFICATION:
@@ -202,15 +228,24 @@ class AnthropicService(AIService):
             else:
                 raise AIAnalysisError(f"Unsupported analysis type: {analysis_type}")
             
-            message = self.client.beta.messages.create(
-                model=self.model,
-                max_tokens=20000,
-                temperature=0.5,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            with span(ANALYSIS_STAGES[analysis_type], backend='anthropic', model=self.model) as timing:
+                with self.breaker.guard() as slot, self.limiter.slot(slot):
+                    message = self.client.beta.messages.create(
+                        model=self.model,
+                        max_tokens=20000,
+                        temperature=0.5,
+                        messages=[{"role": "user", "content": prompt}]
+                    )
+                    # The SDK raises on error responses, so returning means the service answered
+                    slot.record(200)
+                if message.usage:
+                    timing.tag(prompt_tokens=message.usage.input_tokens, output_tokens=message.usage.output_tokens)
             
-            return message.content
+            # The reply is a list of content blocks
+            return ''.join(block.text for block in message.content if block.type == 'text')
             
+        except CircuitOpenError:
+            raise
         except Exception as e:
             raise AIAnalysisError(f"Anthropic analysis failed: {str(e)}")
     
@@ -252,13 +287,14 @@ class AIServiceFactory:
         if backend == AIBackend.OLLAMA:
             classification_model = kwargs.get('classification_model', 'qwen2.5:14b-instruct-q4_K_M')
             fit_analysis_model = kwargs.get('fit_analysis_model', 'mistral-small:24b')
-            return OllamaService(classification_model=classification_model, fit_analysis_model=fit_analysis_model)
+            return OllamaService(classification_model=classification_model, fit_analysis_model=fit_analysis_model,
+                                 host=kwargs.get('host'))
         elif backend == AIBackend.ANTHROPIC:
             api_key = kwargs.get('api_key')
             model = kwargs.get('model', 'claude-sonnet-4-20250514')
             if not api_key:
                 raise AIAnalysisError("Anthropic API key is required")
-            return AnthropicService(api_key=api_key, model=model)
+            return AnthropicService(api_key=api_key, model=model, base_url=kwargs.get('base_url'))
         else:
             raise AIAnalysisError(f"Unsupported backend: {backend}")
 
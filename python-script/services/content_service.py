@@ -1,66 +1,341 @@
 """
-Content fetching service using Jina AI reader API
+Content fetching services: the Jina AI reader API, or direct fetches with local extraction
 """
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+import multiprocessing
 import requests
-from typing import Optional
-import time
-from utils.error_handling import ContentFetchError
+from requests.adapters import HTTPAdapter
+from typing import Optional, Tuple, NamedTuple
+from urllib3.util.request import ACCEPT_ENCODING
+from utils.error_handling import ContentFetchError, ContentNotModifiedError
+from utils.adaptive_limiter import AdaptiveLimiter, get_limiter
+from utils.circuit_breaker import CircuitBreaker, get_breaker
+from utils.instrumentation import span, tag
+from utils.html_extractor import extract_page, decode_html
+from parsers.structured_data import JobPostingData
 
-class ContentService:
+def extract_reader_text(body: bytes, url: str, encoding: Optional[str]) -> Tuple[str, int]:
+    """
+    Main content of an HTML page in reader layout, with its JobPosting data if it has any
+    
+    Runs in the extraction processes of LocalContentService. Pages rendered by
+    JavaScript often still embed their JobPosting, whose description then
+    stands in for the missing page text.
+    
+    Returns:
+        Tuple[str, int]: The reader text, and the length of its markdown content
+    """
+    html = decode_html(body, encoding)
+    page = extract_page(html, url)
+    posting = JobPostingData.from_html(html)
+    if posting and posting.description and len(posting.description) > len(page.markdown):
+        page = page._replace(markdown=extract_page(posting.description, url).markdown)
+    return page.as_reader_text(url, [posting.to_reader_line()] if posting else ()), len(page.markdown)
+
+class ContentBackend(Enum):
+    """Supported content backends"""
+    JINA = "jina"
+    LOCAL = "local"
+
+class PageValidators(NamedTuple):
+    """HTTP validators of a fetched page, for conditional requests"""
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+class BaseContentService(ABC):
+    """Abstract base class for content services, returning pages as reader-style markdown"""
+    
+    @abstractmethod
+    def fetch_content(self, url: str, validators: Optional[PageValidators] = None) -> Optional[str]:
+        """
+        Fetch a page's content
+        
+        Services that revalidate raise ContentNotModifiedError when the page is
+        unchanged since validators and they hold no copy of it.
+        """
+        pass
+    
+    def validators(self, url: str) -> Optional[PageValidators]:
+        """Validators of the page's last fetch, if the service keeps them"""
+        return None
+    
+    @abstractmethod
+    def is_content_available(self, url: str) -> bool:
+        """Check if a page's content can be fetched"""
+        pass
+    
+    def close(self) -> None:
+        """Release pooled connections and worker processes"""
+        pass
+
+class ContentService(BaseContentService):
     """Service for fetching webpage content via Jina AI"""
     
-    def __init__(self, base_url: str = "https://r.jina.ai", timeout: int = 30, max_retries: int = 3):
+    def __init__(self, base_url: str = "https://r.jina.ai", timeout: int = 30, max_retries: int = 3,
+                 limiter: Optional[AdaptiveLimiter] = None, breaker: Optional[CircuitBreaker] = None):
         self.base_url = base_url
         self.timeout = timeout
         self.max_retries = max_retries
+        # Shared with every other client of the reader API; paces retries after 429s
+        self.limiter = limiter or get_limiter('content')
+        # Fails every fetch fast while the reader API is down
+        self.breaker = breaker or get_breaker('content')
     
-    def fetch_content(self, url: str) -> Optional[str]:
+    def fetch_content(self, url: str, validators: Optional[PageValidators] = None) -> Optional[str]:
         """
         Fetch content from a URL using Jina AI reader
         
         Args:
             url: The URL to fetch content from
+            validators: Ignored; the reader does not revalidate pages
             
         Returns:
             str: The fetched content, or None if failed
             
         Raises:
             ContentFetchError: If content fetching fails after retries
+            CircuitOpenError: If the reader API is down
         """
         jina_url = f"{self.base_url}/{url}"
+        with span('fetch', backend='jina') as timing:
+            for attempt in range(self.max_retries):
+                timing.tag(attempts=attempt + 1)
+                try:
+                    with self.breaker.guard() as slot, self.limiter.slot(slot):
+                        response = requests.get(jina_url, timeout=self.timeout)
+                        slot.record(response.status_code, response.headers.get('Retry-After'))
+                    timing.tag(status=str(response.status_code))
         
-        for attempt in range(self.max_retries):
-            try:
-                response = requests.get(jina_url, timeout=self.timeout)
+                    if response.status_code == 200:
+                        timing.tag(bytes=len(response.content))
+                        return response.text
+                    elif response.status_code == 429:  # Rate limited
+                        if attempt < self.max_retries - 1:
+                            # The limiter holds the retry until its overload pause is over
+                            continue
+                        else:
+                            raise ContentFetchError(f"Rate limited after {self.max_retries} attempts")
+                    else:
+                        raise ContentFetchError(f"HTTP {response.status_code}: {response.text}")
                 
-                if response.status_code == 200:
-                    return response.text
-                elif response.status_code == 429:  # Rate limited
+                except requests.exceptions.Timeout:
                     if attempt < self.max_retries - 1:
-                        wait_time = (attempt + 1) * 2  # Exponential backoff
-                        time.sleep(wait_time)
                         continue
                     else:
-                        raise ContentFetchError(f"Rate limited after {self.max_retries} attempts")
-                else:
-                    raise ContentFetchError(f"HTTP {response.status_code}: {response.text}")
+                        raise ContentFetchError(f"Timeout after {self.max_retries} attempts")
+                except requests.exceptions.RequestException as e:
+                    if attempt < self.max_retries - 1:
+                        continue
+                    else:
+                        raise ContentFetchError(f"Request failed: {str(e)}")
                     
+            return None
+    
+    def is_content_available(self, url: str) -> bool:
+        """
+        Check if content is available without fetching the full content
+        
+        Args:
+            url: The URL to check
+            
+        Returns:
+            bool: True if content is available, False otherwise
+        """
+        try:
+            jina_url = f"{self.base_url}/{url}"
+            response = requests.head(jina_url, timeout=5)
+            return response.status_code == 200
+        except requests.exceptions.RequestException:
+            return False
+
+class LocalContentService(BaseContentService):
+    """
+    Fetches pages directly and extracts their main content locally
+    
+    Requests go through one pooled session that accepts every compression
+    urllib3 can decode (gzip and deflate, plus br and zstd when their packages
+    are installed), and revalidate pages with If-None-Match / If-Modified-Since:
+    recently fetched ones from memory, others with validators stored by the
+    caller, e.g. with the processed job. HTML is turned into markdown in a process pool, so the
+    CPU-bound parsing runs on all cores while threads wait on the network.
+    The output uses the Jina reader's layout, so the classifier sees the same
+    shape of text from either backend.
+    
+    Pages that cannot be fetched directly (blocked, non-HTML) or whose HTML
+    holds too little text (rendered by JavaScript) go to the fallback service.
+    """
+    
+    USER_AGENT = 'Mozilla/5.0 (compatible; jobseekr/1.0)'
+    
+    def __init__(self, timeout: int = 30, max_retries: int = 3, processes: Optional[int] = None,
+                 pool_size: int = 16, cache_entries: int = 1000, min_content_chars: int = 300,
+                 fallback: Optional[BaseContentService] = None, limiter: Optional[AdaptiveLimiter] = None):
+        """
+        Args:
+            timeout: Request timeout in seconds
+            max_retries: Attempts per page on timeouts, connection errors and 429s
+            processes: Extraction processes (default: CPU count; 0 extracts in the calling thread)
+            pool_size: Connections kept open per host
+            cache_entries: Pages whose validators and content are kept for conditional requests
+            min_content_chars: Shortest extracted content accepted before trying the fallback
+            fallback: Service for pages that cannot be fetched or extracted locally, e.g. Jina
+            limiter: Concurrency limit for page fetches
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        self.cache_entries = cache_entries
+        self.min_content_chars = min_content_chars
+        self.fallback = fallback
+        # Pages come from many sites, so there is no circuit breaker: one site
+        # being down says nothing about the next
+        self.limiter = limiter or get_limiter('pages')
+        self.stats = Counter()
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': self.USER_AGENT,
+            'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.8',
+            'Accept-Encoding': ACCEPT_ENCODING,
+        })
+        
+        self._cache: OrderedDict = OrderedDict()  # url -> (etag, last_modified, content)
+        self._cache_lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+    
+    def fetch_content(self, url: str, validators: Optional[PageValidators] = None) -> Optional[str]:
+        """
+        Fetch a page and extract its main content as markdown
+        
+        Args:
+            url: The URL to fetch content from
+            validators: Validators of an earlier fetch, sent when the page is not cached
+            
+        Returns:
+            str: The page in reader layout (title, source URL, markdown content)
+            
+        Raises:
+            ContentNotModifiedError: If the page is unchanged since validators and not cached
+            ContentFetchError: If neither a direct fetch nor the fallback succeeds
+        """
+        with span('fetch', backend='local') as timing:
+            try:
+                content = self._fetch_direct(url, validators)
+            except ContentNotModifiedError:
+                raise
+            except ContentFetchError:
+                if self.fallback is None:
+                    raise
+                content = None
+            
+            if content is None and self.fallback is not None:
+                self.stats['fallbacks'] += 1
+                timing.tag(fallback=True)
+                return self.fallback.fetch_content(url)
+            return content
+    
+    def _fetch_direct(self, url: str, validators: Optional[PageValidators] = None) -> Optional[str]:
+        """The extracted page, or None if it has too little text to be extracted locally"""
+        with self._cache_lock:
+            cached = self._cache.get(url)
+        if cached:
+            validators = PageValidators(cached[0], cached[1])
+        headers = {}
+        if validators:
+            etag, last_modified = validators
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
+        response = self._get(url, headers)
+        tag(status=str(response.status_code))
+        if response.status_code == 304 and validators:
+            self.stats['not_modified'] += 1
+            tag(cache_hit=True)
+            if not cached:
+                raise ContentNotModifiedError(f"{url} is unchanged since it was last fetched")
+            with self._cache_lock:
+                self._cache.move_to_end(url)
+            return cached[2]
+        if response.status_code != 200:
+            raise ContentFetchError(f"HTTP {response.status_code} fetching {url}")
+        
+        content_type = response.headers.get('Content-Type', '').lower()
+        if 'html' not in content_type and not content_type.startswith('text/'):
+            raise ContentFetchError(f"Unsupported content type {content_type or 'unknown'} at {url}")
+        
+        self.stats['fetched'] += 1
+        self.stats['bytes'] += len(response.content)
+        tag(bytes=len(response.content))
+        # The charset only if the server declared one; otherwise the page's meta tag decides
+        encoding = response.encoding if 'charset' in content_type else None
+        if 'html' in content_type:
+            content, content_chars = self._extract(response.content, response.url, encoding)
+            if content_chars < self.min_content_chars:
+                return None
+        else:
+            content = response.text
+        
+        etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+        if etag or last_modified:
+            with self._cache_lock:
+                self._cache[url] = (etag, last_modified, content)
+                self._cache.move_to_end(url)
+                while len(self._cache) > self.cache_entries:
+                    self._cache.popitem(last=False)
+        return content
+    
+    def validators(self, url: str) -> Optional[PageValidators]:
+        """Validators of the page's last direct fetch, while it is cached"""
+        with self._cache_lock:
+            cached = self._cache.get(url)
+        return PageValidators(cached[0], cached[1]) if cached else None
+    
+    def _get(self, url: str, headers: dict) -> requests.Response:
+        """GET with retries on timeouts, connection errors and 429s"""
+        for attempt in range(self.max_retries):
+            last = attempt == self.max_retries - 1
+            try:
+                with self.limiter.slot() as slot:
+                    response = self.session.get(url, headers=headers, timeout=self.timeout)
+                    slot.record(response.status_code, response.headers.get('Retry-After'))
             except requests.exceptions.Timeout:
-                if attempt < self.max_retries - 1:
-                    continue
-                else:
+                if last:
                     raise ContentFetchError(f"Timeout after {self.max_retries} attempts")
+                continue
             except requests.exceptions.RequestException as e:
-                if attempt < self.max_retries - 1:
-                    continue
-                else:
+                if last:
                     raise ContentFetchError(f"Request failed: {str(e)}")
-        
-        return None
+                continue
+            
+            if response.status_code != 429 or last:
+                return response
+            # The limiter holds the retry until its overload pause is over
+        raise ContentFetchError(f"Rate limited after {self.max_retries} attempts")
+    
+    def _extract(self, body: bytes, url: str, encoding: Optional[str]) -> Tuple[str, int]:
+        with span('extract', backend='local', bytes=len(body)):
+            if not self.processes:
+                return extract_reader_text(body, url, encoding)
+            with self._pool_lock:
+                if self._pool is None:
+                    # Spawned, not forked: the parent runs threads and holds database connections
+                    self._pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context('spawn'))
+            return self._pool.submit(extract_reader_text, body, url, encoding).result()
     
     def is_content_available(self, url: str) -> bool:
         """
-        Check if content is available without fetching the full content
+        Check if a page can be fetched directly
         
         Args:
             url: The URL to check
@@ -69,8 +344,44 @@ class ContentService:
             bool: True if content is available, False otherwise
         """
         try:
-            jina_url = f"{self.base_url}/{url}"
-            response = requests.head(jina_url, timeout=5)
+            response = self.session.head(url, timeout=5, allow_redirects=True)
             return response.status_code == 200
         except requests.exceptions.RequestException:
-            return False
\ No newline at end of file
+            return False
+    
+    def close(self) -> None:
+        """Shut down the extraction processes and close pooled connections"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+        self.session.close()
+        if self.fallback is not None:
+            self.fallback.close()
+
+class ContentServiceFactory:
+    """Factory for creating content service instances"""
+    
+    @staticmethod
+    def create(backend: ContentBackend, **kwargs) -> BaseContentService:
+        """
+        Create a content service instance
+        
+        Args:
+            backend: The content backend to use
+            **kwargs: Backend-specific configuration
+            
+        Returns:
+            BaseContentService: Configured content service instance
+        """
+        jina_options = {key: kwargs[key] for key in ('base_url', 'timeout', 'max_retries') if key in kwargs}
+        if backend == ContentBackend.JINA:
+            return ContentService(**jina_options)
+        elif backend == ContentBackend.LOCAL:
+            local_options = {key: kwargs[key] for key in ('timeout', 'max_retries', 'processes', 'pool_size',
+                                                          'cache_entries', 'min_content_chars') if key in kwargs}
+            # Jina remains the fallback unless disabled
+            fallback = ContentService(**jina_options) if kwargs.get('fallback', 'jina') == 'jina' else None
+            return LocalContentService(fallback=fallback, **local_options)
+        else:
+            raise ContentFetchError(f"Unsupported backend: {backend}")
\ No newline at end of file
@@ -3,16 +3,29 @@ Google Custom Search API service for job searching
 """
 import requests
 import urllib.parse
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Iterator
 from utils.error_handling import SearchAPIError
+from utils.adaptive_limiter import AdaptiveLimiter, get_limiter
+from utils.circuit_breaker import CircuitBreaker, get_breaker
+from utils.instrumentation import span
+from utils.json_stream import iter_json_items
 
 class SearchService:
     """Service for interacting with Google Custom Search API"""
     
-    def __init__(self, api_key: str, cx: str, base_url: str = "https://www.googleapis.com/customsearch/v1"):
+    # Custom Search returns at most 10 results per request and 100 per query
+    PAGE_SIZE = 10
+    MAX_RESULTS = 100
+    
+    def __init__(self, api_key: str, cx: str, base_url: str = "https://www.googleapis.com/customsearch/v1",
+                 max_retries: int = 3, limiter: Optional[AdaptiveLimiter] = None,
+                 breaker: Optional[CircuitBreaker] = None):
         self.api_key = api_key
         self.cx = cx
         self.base_url = base_url
+        self.max_retries = max_retries
+        self.limiter = limiter or get_limiter('search')
+        self.breaker = breaker or get_breaker('search')
     
     def search(self, query: str, **kwargs) -> Dict[str, Any]:
         """
@@ -28,6 +41,24 @@ class SearchService:
         Raises:
             SearchAPIError: If the search request fails
         """
+        return self._get(query, **kwargs).json()
+    
+    def _get(self, query: str, stream: bool = False, **kwargs) -> requests.Response:
+        """
+        Make a Custom Search request and check its status
+        
+        Args:
+            query: Search term to query for
+            stream: Leave the body unread so it can be parsed incrementally
+            **kwargs: Additional search parameters
+            
+        Returns:
+            requests.Response: The successful response
+            
+        Raises:
+            SearchAPIError: If the search request fails
+            CircuitOpenError: If the search API is down
+        """
         params = {
             'key': self.api_key,
             'cx': self.cx,
@@ -44,11 +75,21 @@ class SearchService:
             query_string = '&'.join([f'{k}={urllib.parse.quote(str(v))}' for k, v in params.items()])
             url = f'{self.base_url}?{query_string}'
             
-            # Make the request
-            response = requests.get(url)
+            # Make the request, retrying rate limits once the limiter's pause is over
+            with span('search', backend='google_cse') as timing:
+                for attempt in range(self.max_retries):
+                    with self.breaker.guard() as slot, self.limiter.slot(slot):
+                        response = requests.get(url, stream=stream)
+                        slot.record(response.status_code, response.headers.get('Retry-After'))
+                    if response.status_code != 429 or attempt == self.max_retries - 1:
+                        break
+                    response.close()
+                # A streamed body is read later, outside the span
+                timing.tag(status=str(response.status_code), attempts=attempt + 1,
+                           bytes=None if stream else len(response.content))
             
             if response.status_code == 200:
-                return response.json()
+                return response
             elif response.status_code == 400:
                 raise SearchAPIError(f"Bad request: {response.text}")
             elif response.status_code == 403:
@@ -78,6 +119,46 @@ class SearchService:
         
         return self.search(search_term, **params)
     
+    def iter_search_items(self, search_term: str, date_restrict: Optional[str] = None,
+                          max_results: int = 10) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield result items across as many pages as needed
+        
+        Each page is requested only when the previous one has been consumed, and its
+        body is parsed incrementally from the response stream.
+        
+        Args:
+            search_term: The job search term
+            date_restrict: Date restriction (e.g., 'd3' for last 3 days)
+            max_results: Maximum number of items to yield (capped at MAX_RESULTS)
+            
+        Yields:
+            Dict: Raw search result items
+        """
+        max_results = min(max_results, self.MAX_RESULTS)
+        
+        for start in range(1, max_results + 1, self.PAGE_SIZE):
+            params = {'start': start, 'num': min(self.PAGE_SIZE, max_results - start + 1)}
+            if date_restrict:
+                params['dateRestrict'] = date_restrict
+            
+            response = self._get(search_term, stream=True, **params)
+            response.raw.decode_content = True
+            
+            page_count = 0
+            try:
+                for item in iter_json_items(response.raw):
+                    if page_count == params['num']:
+                        break
+                    page_count += 1
+                    yield item
+            finally:
+                response.close()
+            
+            # A short page means there are no more results
+            if page_count < params['num']:
+                break
+    
     def validate_credentials(self) -> bool:
         """
         Validate API credentials by making a simple test request
@@ -0,0 +1,64 @@
+"""
+Tests for the adaptive concurrency limiter
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from services.ai_service import AnalysisType, AnthropicService, OllamaService
+from utils.adaptive_limiter import AdaptiveLimiter
+from utils.circuit_breaker import CircuitBreaker
+
+class Overloaded(Exception):
+    status_code = 503
+
+def test_completed_requests_raise_the_limit():
+    limiter = AdaptiveLimiter('test', initial_limit=2, max_limit=8)
+    for _ in range(30):
+        with limiter.slot() as slot:
+            slot.record(200)
+    assert limiter.limit > 2
+    assert limiter.snapshot()['p95_ms'] is not None
+
+def test_requests_without_a_response_leave_the_limit_alone():
+    limiter = AdaptiveLimiter('test', initial_limit=2)
+    for _ in range(10):
+        with limiter.slot():
+            pass
+    with pytest.raises(ValueError):
+        with limiter.slot():
+            raise ValueError("bad request body")
+    assert limiter.limit == 2
+    assert limiter.stats['incomplete'] == 11
+
+def test_overload_cuts_the_limit_and_pauses():
+    limiter = AdaptiveLimiter('test', initial_limit=8, pause_seconds=5)
+    with limiter.slot() as slot:
+        slot.record(429, retry_after='20')
+    assert limiter.limit == 4
+    assert limiter.snapshot()['paused_s'] > 5
+
+def test_overload_errors_count_as_overloads():
+    limiter = AdaptiveLimiter('test', initial_limit=8, pause_seconds=0.01)
+    with pytest.raises(Overloaded):
+        with limiter.slot():
+            raise Overloaded()
+    assert limiter.limit == 4
+    assert limiter.stats['overloads'] == 1
+
+@pytest.mark.parametrize('service_class, client', [
+    (OllamaService, SimpleNamespace(chat=lambda **kwargs: SimpleNamespace(
+        prompt_eval_count=10, eval_count=5, message=SimpleNamespace(content='individual')))),
+    (lambda **kwargs: AnthropicService(api_key='test', **kwargs), SimpleNamespace(beta=SimpleNamespace(
+        messages=SimpleNamespace(create=lambda **kwargs: SimpleNamespace(
+            usage=None, content=[SimpleNamespace(type='text', text='individual')]))))),
+])
+def test_ai_services_record_successful_responses(service_class, client):
+    limiter = AdaptiveLimiter('ai', initial_limit=2, max_limit=8)
+    service = service_class(limiter=limiter, breaker=CircuitBreaker('ai'))
+    service.client = client
+    for _ in range(30):
+        assert service.analyze_content('page', AnalysisType.JOB_POSTING_CLASSIFICATION) == 'individual'
+    
+    assert limiter.stats['incomplete'] == 0
+    assert limiter.limit > 2
\ No newline at end of file
@@ -0,0 +1,71 @@
+"""
+Tests for the persistent Bloom filter of processed URLs
+"""
+import pytest
+
+from job_types import Job
+from repositories.base import ProcessedJob
+from repositories.bloom import BloomFilterJobRepository
+from repositories.caching import CachingJobRepository
+from repositories.factory import create_sqlite_repository
+from utils.bloom_filter import BloomFilter
+
+def _processed_job(n: int) -> ProcessedJob:
+    job = Job(id=str(n), title='Engineer', url=f"https://example.com/jobs/{n}",
+              description='Backend role', postedTime='1 day ago')
+    return ProcessedJob.from_job_and_analysis(job, {'recommendation': 'apply', 'confidence': 4, 'fit_score': 4},
+                                              'hash')
+
+@pytest.fixture
+def repo(tmp_path):
+    repository = create_sqlite_repository(str(tmp_path / 'jobs.db'))
+    yield repository
+    repository.close()
+
+def test_filter_has_no_false_negatives(tmp_path):
+    bloom = BloomFilter.create(str(tmp_path / 'urls.seen'), 1000, 0.01)
+    urls = [f"https://example.com/jobs/{n}" for n in range(500)]
+    for url in urls:
+        bloom.add(url)
+    bloom.close()
+    
+    reopened = BloomFilter.open(str(tmp_path / 'urls.seen'))
+    assert all(url in reopened for url in urls)
+    assert reopened.count == 500
+    reopened.close()
+
+def test_unseen_urls_skip_the_cache_and_database(repo, tmp_path):
+    repo.save_processed_job(_processed_job(0))
+    cache = CachingJobRepository(repo, warm_days=None)
+    seen = BloomFilterJobRepository(cache, str(tmp_path / 'jobs.db.seen'))
+    
+    assert seen.is_job_processed(_processed_job(0).job_url)
+    for n in range(1, 201):
+        assert not seen.is_job_processed(_processed_job(n).job_url)
+    
+    stats = seen.get_runtime_stats()
+    assert stats['seen_filter']['definite_misses'] >= 195
+    assert stats['read_cache']['is_job_processed_misses'] <= 6
+    seen.filter.close()
+
+def test_saves_by_other_workers_are_caught_up(repo, tmp_path):
+    seen = BloomFilterJobRepository(repo, str(tmp_path / 'jobs.db.seen'), sync_interval=0)
+    assert not seen.is_job_processed(_processed_job(1).job_url)
+    
+    # Written straight to the database, as another process would
+    repo.save_processed_job(_processed_job(1))
+    assert seen.is_job_processed(_processed_job(1).job_url)
+    assert seen.filter.watermark == 1
+    seen.filter.close()
+
+def test_filter_file_persists_its_watermark(repo, tmp_path):
+    path = str(tmp_path / 'jobs.db.seen')
+    repo.save_processed_job(_processed_job(0))
+    BloomFilterJobRepository(repo, path).filter.close()
+    repo.save_processed_job(_processed_job(1))
+    
+    seen = BloomFilterJobRepository(repo, path)
+    assert seen.stats['rebuilds'] == 0
+    assert seen.stats['caught_up'] == 1
+    assert seen.is_job_processed(_processed_job(1).job_url)
+    seen.filter.close()
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""
+Tests for the write-behind buffer
+"""
+import pytest
+
+from job_types import Job
+from repositories.base import ProcessedJob
+from repositories.buffered import BufferedJobRepository
+from repositories.decorators import RepositoryDecorator
+from repositories.factory import create_sqlite_repository
+
+class FailingWrites(RepositoryDecorator):
+    """Fails the next bulk save, as a locked or unreachable database would"""
+    
+    failures = 1
+    
+    def save_processed_jobs(self, processed_jobs):
+        if self.failures:
+            self.failures -= 1
+            raise IOError("database is locked")
+        self.repository.save_processed_jobs(processed_jobs)
+
+def _processed_job(n: int, content_hash: str = 'hash') -> ProcessedJob:
+    job = Job(id=str(n), title='Engineer', url=f"https://example.com/jobs/{n}",
+              description='Backend role', postedTime='1 day ago')
+    return ProcessedJob.from_job_and_analysis(job, {'recommendation': 'apply', 'confidence': 4, 'fit_score': 4},
+                                              content_hash)
+
+@pytest.fixture
+def repo(tmp_path):
+    repository = create_sqlite_repository(str(tmp_path / 'jobs.db'))
+    yield repository
+    repository.close()
+
+def _buffered(repository) -> BufferedJobRepository:
+    return BufferedJobRepository(repository, max_batch=100, max_delay=60, handle_sigterm=False)
+
+def test_lookups_see_buffered_jobs(repo):
+    buffered = _buffered(repo)
+    buffered.save_processed_job(_processed_job(1, content_hash='new'))
+    
+    assert not repo.is_job_processed(_processed_job(1).job_url)
+    assert buffered.is_job_processed(_processed_job(1).job_url)
+    assert buffered.get_job_state(_processed_job(1).job_url) == ('new', 'apply')
+    assert not buffered.has_content_changed(_processed_job(1).job_url, 'new')
+    buffered.close()
+
+def test_queries_over_many_jobs_flush_first(repo):
+    buffered = _buffered(repo)
+    buffered.save_processed_jobs(_processed_job(n) for n in range(3))
+    
+    assert len(buffered.get_processed_jobs()) == 3
+    assert buffered.stats['flushes'] == 1
+    assert buffered.get_runtime_stats()['write_buffer']['buffered'] == 0
+    buffered.close()
+
+def test_failed_flush_keeps_its_jobs(repo):
+    buffered = _buffered(FailingWrites(repo))
+    buffered.save_processed_job(_processed_job(1))
+    with pytest.raises(IOError):
+        buffered.flush()
+    assert buffered.stats['flush_errors'] == 1
+    assert buffered.is_job_processed(_processed_job(1).job_url)
+    
+    assert buffered.flush() == 1
+    assert repo.is_job_processed(_processed_job(1).job_url)
+    buffered.close()
+
+def test_listeners_see_written_batches_only(repo):
+    written = []
+    buffered = _buffered(FailingWrites(repo))
+    buffered.add_flush_listener(lambda jobs: written.extend(job.job_url for job in jobs))
+    buffered.add_flush_listener(lambda jobs: 1 / 0)
+    buffered.save_processed_jobs([_processed_job(1), _processed_job(2)])
+    
+    with pytest.raises(IOError):
+        buffered.flush()
+    assert written == []
+    buffered.flush()
+    assert written == [_processed_job(1).job_url, _processed_job(2).job_url]
+    assert buffered.stats['listener_errors'] == 1
+    buffered.close()
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""
+Tests for the read-through job state cache
+"""
+import pytest
+
+from job_types import Job
+from repositories import caching
+from repositories.base import ProcessedJob
+from repositories.caching import CachingJobRepository
+from repositories.decorators import RepositoryDecorator
+from repositories.factory import create_sqlite_repository
+
+URL = 'https://example.com/jobs/1'
+
+class NarrowReads(RepositoryDecorator):
+    """Fails full row loads, so misses have to use the narrow state lookup"""
+    
+    def get_processed_job(self, job_url: str):
+        raise AssertionError("cache misses should not load the full row")
+
+def _processed_job(url: str = URL, content_hash: str = 'hash') -> ProcessedJob:
+    job = Job(id='1', title='Engineer', url=url, description='Backend role', postedTime='1 day ago')
+    return ProcessedJob.from_job_and_analysis(job, {'recommendation': 'apply', 'confidence': 4, 'fit_score': 4},
+                                              content_hash)
+
+@pytest.fixture
+def repo(tmp_path):
+    repository = create_sqlite_repository(str(tmp_path / 'jobs.db'))
+    yield repository
+    repository.close()
+
+def test_misses_read_only_the_job_state(repo):
+    repo.save_processed_job(_processed_job())
+    cache = CachingJobRepository(NarrowReads(repo), warm_days=None)
+    
+    assert cache.is_job_processed(URL)
+    assert not cache.has_content_changed(URL, 'hash')
+    assert cache.has_content_changed(URL, 'other')
+    assert cache.stats['is_job_processed_misses'] == 1
+    assert cache.stats['has_content_changed_hits'] == 2
+
+def test_saves_update_the_cached_state(repo):
+    cache = CachingJobRepository(repo, warm_days=None)
+    assert not cache.is_job_processed(URL)
+    
+    cache.save_processed_job(_processed_job(content_hash='new'))
+    assert cache.is_job_processed(URL)
+    assert not cache.has_content_changed(URL, 'new')
+    assert cache.stats['is_job_processed_misses'] == 1
+
+def test_not_processed_entries_expire(repo, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(caching.time, 'monotonic', lambda: now[0])
+    cache = CachingJobRepository(repo, warm_days=None, negative_ttl=30)
+    assert not cache.is_job_processed(URL)
+    
+    # Saved by another worker, behind the cache's back
+    repo.save_processed_job(_processed_job())
+    assert not cache.is_job_processed(URL)
+    now[0] += 31
+    assert cache.is_job_processed(URL)
+    assert cache.stats['negative_expired'] == 1
+
+def test_warm_loads_recent_jobs(repo):
+    repo.save_processed_job(_processed_job())
+    cache = CachingJobRepository(NarrowReads(repo), warm_days=7)
+    
+    assert cache.stats['warmed'] == 1
+    assert cache.is_job_processed(URL)
+    assert cache.hit_rate() == 1.0
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""
+Tests for circuit breakers
+"""
+import pytest
+
+from utils import circuit_breaker
+from utils.circuit_breaker import BreakerState, CircuitBreaker, is_outage
+from utils.error_handling import CircuitOpenError
+
+def _call(breaker: CircuitBreaker, status_code: int) -> None:
+    with breaker.guard() as slot:
+        slot.record(status_code)
+
+def test_rate_limits_are_not_outages():
+    assert not is_outage(429)
+    assert is_outage(503)
+    assert is_outage(error=TimeoutError())
+    assert not is_outage(error=ValueError())
+
+def test_consecutive_outages_open_the_circuit():
+    breaker = CircuitBreaker('test', failure_threshold=3, reset_seconds=60)
+    for _ in range(2):
+        _call(breaker, 503)
+    _call(breaker, 200)
+    for _ in range(2):
+        _call(breaker, 503)
+    assert breaker.state == BreakerState.CLOSED
+    
+    _call(breaker, 503)
+    assert breaker.state == BreakerState.OPEN
+    with pytest.raises(CircuitOpenError):
+        _call(breaker, 200)
+    assert breaker.stats['rejected'] == 1
+
+def test_probe_closes_or_reopens_the_circuit(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, 'monotonic', lambda: now[0])
+    breaker = CircuitBreaker('test', failure_threshold=1, reset_seconds=10, max_reset_seconds=60)
+    _call(breaker, 503)
+    assert breaker.state == BreakerState.OPEN
+    
+    # A failed probe opens the circuit again, for twice as long
+    now[0] += 10
+    _call(breaker, 503)
+    assert breaker.state == BreakerState.OPEN
+    now[0] += 15
+    with pytest.raises(CircuitOpenError):
+        _call(breaker, 200)
+    
+    now[0] += 5
+    _call(breaker, 200)
+    assert breaker.state == BreakerState.CLOSED
+    assert breaker.stats['probes'] == 2
\ No newline at end of file
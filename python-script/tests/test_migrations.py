@@ -0,0 +1,72 @@
+"""
+Tests for schema migrations and the full-text index they maintain
+"""
+import os
+import shutil
+
+import pytest
+
+from job_types import Job
+from repositories.base import ProcessedJob
+from repositories.factory import RepositoryFactory
+from repositories.migrations import MIGRATIONS, MigrationRunner, SchemaMetaModel
+from repositories.models import bound_connection
+
+LEGACY_DB = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'jobs.db')
+
+def _repository(path: str):
+    return RepositoryFactory.create('peewee', database_config={'type': 'sqlite', 'path': path, 'auto_migrate': False})
+
+def _processed_job(title: str) -> ProcessedJob:
+    job = Job(id='1', title=title, url='https://example.com/jobs/1', description='Backend role',
+              postedTime='2 days ago', salary='$150k - $180k')
+    return ProcessedJob.from_job_and_analysis(job, {'recommendation': 'apply', 'confidence': 4, 'fit_score': 4},
+                                              'hash')
+
+def _fts_rowids(repo) -> list:
+    cursor = repo.db.execute_sql(f"SELECT rowid FROM {repo.full_text_index.TABLE} ORDER BY rowid")
+    return [rowid for rowid, in cursor]
+
+@pytest.fixture
+def repo(tmp_path):
+    repository = _repository(str(tmp_path / 'jobs.db'))
+    repository.migrate()
+    yield repository
+    repository.close()
+
+def test_legacy_database_is_upgraded_and_backfilled(tmp_path):
+    path = str(tmp_path / 'legacy.db')
+    shutil.copy(LEGACY_DB, path)
+    repo = _repository(path)
+    assert repo.get_schema_status()['version'] == 0
+    
+    assert repo.migrate() == MIGRATIONS[-1].version
+    status = repo.get_schema_status()
+    assert status['version'] == status['latest'] and status['pending'] == []
+    
+    jobs = list(repo.iter_processed_jobs())
+    assert jobs and all(job.posted_at is not None for job in jobs)
+    assert len(_fts_rowids(repo)) == len(jobs)
+    assert repo.migrate() == 0
+    repo.close()
+
+def test_resaving_a_job_keeps_one_full_text_entry(repo):
+    repo.save_processed_job(_processed_job('Backend Engineer'))
+    repo.save_processed_job(_processed_job('Platform Engineer'))
+    
+    job = repo.get_processed_job('https://example.com/jobs/1')
+    assert (job.salary_min, job.salary_max) == (150000, 180000)
+    assert _fts_rowids(repo) == [job.id]
+    assert [found.job_title for found in repo.search_processed_jobs('platform')] == ['Platform Engineer']
+    assert repo.search_processed_jobs('backend') == []
+
+def test_orphaned_full_text_entries_are_pruned(repo):
+    repo.save_processed_job(_processed_job('Backend Engineer'))
+    # Left behind by a save that replaced its row without firing the delete trigger
+    repo.db.execute_sql(f"INSERT INTO {repo.full_text_index.TABLE}(rowid, job_title) VALUES (99, 'Stale')")
+    with bound_connection(repo.db):
+        SchemaMetaModel.replace(key=MigrationRunner.VERSION_KEY, value='12').execute()
+    
+    assert repo.migrate() == 1
+    assert 99 not in _fts_rowids(repo)
+    assert repo.search_processed_jobs('stale') == []
\ No newline at end of file
@@ -0,0 +1,31 @@
+"""
+Tests for schema.org JobPosting extraction
+"""
+import json
+
+from parsers.structured_data import JobPostingData
+
+def _page(data) -> str:
+    return f'<html><head><script type="application/ld+json">{json.dumps(data)}</script></head></html>'
+
+def _posting(title: str) -> dict:
+    return {'@type': 'JobPosting', 'title': title, 'hiringOrganization': {'name': 'Acme'}}
+
+def test_single_posting_is_read():
+    posting = JobPostingData.from_html(_page(_posting('Backend Engineer')))
+    assert posting.title == 'Backend Engineer'
+    assert posting.company == 'Acme'
+
+def test_listing_page_with_several_postings_is_not_one_job():
+    graph = {'@context': 'https://schema.org',
+             '@graph': [_posting('Backend Engineer'), _posting('Frontend Engineer'), _posting('Data Engineer')]}
+    assert JobPostingData.from_html(_page(graph)) is None
+
+def test_repeated_posting_counts_once():
+    page = _page(_posting('Backend Engineer')) + _page([_posting('Backend Engineer')])
+    assert JobPostingData.from_html(page).title == 'Backend Engineer'
+
+def test_pagemap_with_several_postings_is_not_one_job():
+    pagemap = {'jobposting': [{'title': 'Backend Engineer'}, {'title': 'Frontend Engineer'}]}
+    assert JobPostingData.from_pagemap(pagemap) is None
+    assert JobPostingData.from_pagemap({'jobposting': [{'title': 'Backend Engineer'}]}).title == 'Backend Engineer'
\ No newline at end of file
@@ -0,0 +1,13 @@
+"""
+Tests for salary parsing
+"""
+from utils.text_extractors import SalaryExtractor
+
+def test_retirement_plans_are_not_salaries():
+    assert SalaryExtractor.parse_range('$150k + equity, 401k match') == (150000, 150000)
+    assert SalaryExtractor.parse_range('401(k), $90k') == (90000, 90000)
+
+def test_ranges_need_a_separator_between_bounds():
+    assert SalaryExtractor.parse_range('150 - 200k') == (150000, 200000)
+    assert SalaryExtractor.parse_range('$130,000 to $160,000') == (130000, 160000)
+    assert SalaryExtractor.parse_range('$120k base, 15,000 signing bonus') == (120000, 120000)
\ No newline at end of file
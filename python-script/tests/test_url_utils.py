@@ -0,0 +1,30 @@
+"""
+Tests for URL canonicalization
+"""
+from parsers.job_parser import JobParser
+from utils.url_utils import URLCanonicalizer
+
+def test_greenhouse_job_ids_stay_distinct():
+    canonicalizer = URLCanonicalizer()
+    first = canonicalizer.canonicalize('https://stripe.com/jobs/search?gh_jid=123')
+    second = canonicalizer.canonicalize('https://stripe.com/jobs/search?gh_jid=456')
+    assert first == 'https://stripe.com/jobs/search?gh_jid=123'
+    assert second == 'https://stripe.com/jobs/search?gh_jid=456'
+
+def test_greenhouse_job_ids_are_not_duplicates():
+    items = [
+        {'title': 'Backend Engineer', 'link': 'https://stripe.com/jobs/search?gh_jid=123&gh_src=abc'},
+        {'title': 'Frontend Engineer', 'link': 'https://stripe.com/jobs/search?gh_jid=456'},
+    ]
+    parser = JobParser()
+    jobs = list(parser.iter_jobs(items))
+    assert [job.url for job in jobs] == ['https://stripe.com/jobs/search?gh_jid=123',
+                                         'https://stripe.com/jobs/search?gh_jid=456']
+    assert parser.stats['duplicate_urls_skipped'] == 0
+
+def test_generic_keys_are_stripped_only_on_known_hosts():
+    canonicalizer = URLCanonicalizer()
+    lever = 'https://jobs.lever.co/acme?source=linkedin&team=eng'
+    assert canonicalizer.canonicalize(lever) == 'https://jobs.lever.co/acme?team=eng'
+    careers = 'https://example.com/careers?ref=platform&utm_source=google'
+    assert canonicalizer.canonicalize(careers) == 'https://example.com/careers?ref=platform'
\ No newline at end of file
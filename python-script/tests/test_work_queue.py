@@ -0,0 +1,98 @@
+"""
+Tests for the work queue's lease, claim and finish cycle
+"""
+import pytest
+
+from core.job_workflow import JobWorkflow
+from job_types import Job
+from repositories.base import ProcessedJob
+from repositories.buffered import BufferedJobRepository
+from repositories.factory import create_sqlite_repository
+from repositories.work_queue import WorkQueue, WorkState
+from utils.error_handling import LeaseLostError
+
+ANALYSIS = {'recommendation': 'apply', 'confidence': 4, 'fit_score': 4}
+
+def _job(n: int) -> Job:
+    return Job(id=str(n), title=f"Engineer {n}", url=f"https://example.com/jobs/{n}",
+               description='Backend role', postedTime='1 day ago')
+
+@pytest.fixture
+def repo(tmp_path):
+    repository = create_sqlite_repository(str(tmp_path / 'jobs.db'))
+    yield repository
+    repository.close()
+
+def _queue(repo, owner: str, **options) -> WorkQueue:
+    return WorkQueue(repo.db, repo.db_type, owner=owner, heartbeat=False, **options)
+
+def test_claimed_items_are_leased_to_one_owner(repo):
+    first, second = _queue(repo, 'a'), _queue(repo, 'b')
+    for n in range(3):
+        assert first.enqueue(_job(n))
+    assert not first.enqueue(_job(0))
+    
+    claimed = first.claim(2)
+    assert [item.job.url for item in claimed] == [_job(0).url, _job(1).url]
+    assert [item.job.url for item in second.claim(5)] == [_job(2).url]
+    assert first.claim(5) == []
+
+def test_finished_items_drop_their_artifacts_and_stay_finished(repo):
+    queue = _queue(repo, 'a')
+    queue.enqueue(_job(0))
+    item = queue.claim()[0]
+    queue.advance(item, WorkState.FETCHED, content='page', content_hash='hash')
+    queue.finish(item, WorkState.SAVED)
+    
+    assert queue.counts() == {'saved': 1}
+    assert queue.claim() == []
+    assert not queue.enqueue(_job(0))
+
+def test_expired_lease_moves_to_another_owner(repo):
+    first, second = _queue(repo, 'a', lease_seconds=0), _queue(repo, 'b')
+    first.enqueue(_job(0))
+    item = first.claim()[0]
+    
+    taken = second.claim()
+    assert [other.id for other in taken] == [item.id]
+    with pytest.raises(LeaseLostError):
+        first.advance(item, WorkState.FETCHED, content='page')
+
+def test_resumed_item_keeps_its_completed_stages(repo):
+    first, second = _queue(repo, 'a'), _queue(repo, 'b')
+    first.enqueue(_job(0))
+    item = first.claim()[0]
+    first.advance(item, WorkState.ANALYZED, content='page', analysis=ANALYSIS, etag='"v1"')
+    first.release(item)
+    
+    resumed = second.claim()[0]
+    assert resumed.state == WorkState.ANALYZED
+    assert (resumed.content, resumed.analysis, resumed.etag) == ('page', ANALYSIS, '"v1"')
+
+def test_failed_items_are_retried_until_max_attempts(repo):
+    queue = _queue(repo, 'a', max_attempts=2, retry_seconds=0)
+    queue.enqueue(_job(0))
+    
+    queue.fail(queue.claim()[0], 'timeout')
+    item = queue.claim()[0]
+    assert item.attempts == 1
+    queue.fail(item, 'timeout')
+    assert queue.counts() == {'failed': 1}
+    assert queue.claim() == []
+
+def test_buffered_save_is_marked_saved_only_once_written(repo):
+    buffered = BufferedJobRepository(repo, max_batch=100, max_delay=60, handle_sigterm=False)
+    queue = _queue(repo, 'a')
+    workflow = JobWorkflow(None, None, None, None, buffered, work_queue=queue)
+    queue.enqueue(_job(0))
+    item = queue.claim()[0]
+    queue.advance(item, WorkState.ANALYZED, content='page', content_hash='hash', analysis=ANALYSIS)
+    
+    workflow._save(item, ProcessedJob.from_job_and_analysis(item.job, item.analysis, item.content_hash))
+    # A crash now must leave the item to be saved again, with its analysis
+    assert queue.counts() == {'analyzed': 1}
+    assert not repo.is_job_processed(_job(0).url)
+    
+    buffered.flush()
+    assert queue.counts() == {'saved': 1}
+    assert repo.is_job_processed(_job(0).url)
\ No newline at end of file
@@ -0,0 +1,244 @@
+"""
+Adaptive (AIMD) concurrency limits for external services
+"""
+import math
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterator
+
+def is_overload(status_code: Optional[int] = None, error: Optional[BaseException] = None,
+                rate_limits: bool = True) -> bool:
+    """
+    Whether a response or error means the service is at capacity
+    
+    429s, 5xx responses, timeouts and refused connections count; other errors
+    (bad requests, parse failures) say nothing about load.
+    
+    Args:
+        status_code: Response status, if there was a response
+        error: Exception raised by the request, if any
+        rate_limits: Count 429s (circuit breakers do not: a service that rate-limits us is up)
+    """
+    if status_code is None and error is not None:
+        status_code = getattr(error, 'status_code', None)
+    if status_code is not None:
+        return (rate_limits and status_code == 429) or status_code >= 500
+    if error is None:
+        return False
+    name = type(error).__name__.lower()
+    return isinstance(error, (TimeoutError, ConnectionError)) or 'timeout' in name or 'connect' in name
+
+class RequestSlot:
+    """Outcome of one request made under a limiter"""
+    
+    def __init__(self):
+        self.status_code: Optional[int] = None
+        self.retry_after: Optional[float] = None
+    
+    def record(self, status_code: int, retry_after: Optional[str] = None) -> None:
+        """
+        Record the HTTP status of the response
+        
+        Args:
+            status_code: Response status
+            retry_after: Retry-After header value in seconds, if the service sent one
+        """
+        self.status_code = status_code
+        if retry_after:
+            try:
+                self.retry_after = float(retry_after)
+            except ValueError:
+                pass
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit that follows a service's observed capacity
+    
+    Additive increase, multiplicative decrease: while the p95 latency of recent
+    successful requests stays within latency_tolerance of its baseline, every
+    limit successes raise the limit by one. A 429, 5xx or timeout cuts the limit
+    by the backoff factor, at most once per p95 interval so that one burst of
+    failures counts once. Every overload also pauses all new requests, retries
+    included: for pause_seconds, doubling with each overload that persists past
+    a pause, or for the service's Retry-After if that is longer.
+    Rising latency holds the limit where it is. Requests that end without a
+    response (errors other than overloads, interrupts) leave the limit alone.
+    
+    One limiter is shared by every client of a service; see get_limiter.
+    """
+    
+    def __init__(self,
+                 name: str,
+                 initial_limit: float = 2,
+                 min_limit: float = 1,
+                 max_limit: float = 16,
+                 window: int = 20,
+                 latency_tolerance: float = 1.5,
+                 backoff: float = 0.5,
+                 pause_seconds: float = 1.0,
+                 max_pause_seconds: float = 60.0):
+        """
+        Args:
+            name: Service name, used in metrics
+            initial_limit: Concurrent requests allowed at first
+            min_limit, max_limit: Bounds of the limit
+            window: Number of recent latencies the p95 is taken over
+            latency_tolerance: p95 growth over the baseline still counted as stable
+            backoff: Factor the limit is multiplied by on overload
+            pause_seconds: First pause after an overload without Retry-After
+            max_pause_seconds: Longest pause
+        """
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self.pause_seconds = pause_seconds
+        self.max_pause_seconds = max_pause_seconds
+        self.stats = Counter()
+        
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._latencies = deque(maxlen=window)
+        self._baseline: Optional[float] = None
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._consecutive_overloads = 0
+        self._condition = threading.Condition()
+    
+    @property
+    def limit(self) -> int:
+        """Concurrent requests currently allowed"""
+        return max(int(self._limit), 1)
+    
+    def _p95(self) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+    
+    def acquire(self) -> None:
+        """Wait for a free slot and for any overload pause to end"""
+        with self._condition:
+            waited = False
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause <= 0 and self._in_flight < self.limit:
+                    break
+                waited = True
+                self._condition.wait(pause if pause > 0 else None)
+            self._in_flight += 1
+            self.stats['waits'] += waited
+    
+    def release(self, latency: float, overload: bool = False, retry_after: Optional[float] = None,
+                completed: bool = True) -> None:
+        """
+        Free a slot and adapt the limit to the request's outcome
+        
+        Args:
+            latency: Seconds the request took
+            overload: The service signalled it is at capacity
+            retry_after: Seconds the service asked to wait, if any
+            completed: The service answered; requests that did not say nothing about its capacity
+        """
+        now = time.monotonic()
+        with self._condition:
+            self._in_flight -= 1
+            self.stats['requests'] += 1
+            if overload:
+                self._on_overload(now, retry_after)
+            elif completed:
+                self._on_success(latency)
+            else:
+                self.stats['incomplete'] += 1
+            self._condition.notify_all()
+    
+    def _on_overload(self, now: float, retry_after: Optional[float]) -> None:
+        self.stats['overloads'] += 1
+        # Overloads of requests sent before the current pause ended do not lengthen the next one
+        if now >= self._paused_until:
+            self._consecutive_overloads += 1
+        # Requests already in flight when the limit was cut do not cut it again
+        if self._limit > self.min_limit and now - self._last_decrease >= (self._p95() or 0.0):
+            self._limit = max(self._limit * self.backoff, self.min_limit)
+            self._last_decrease = now
+            self.stats['decreases'] += 1
+        # Hold everyone back, so no retry goes straight back out
+        pause = max(self.pause_seconds * 2 ** (max(self._consecutive_overloads, 1) - 1), retry_after or 0.0)
+        self._paused_until = max(self._paused_until, now + min(pause, self.max_pause_seconds))
+        self.stats['pauses'] += 1
+    
+    def _on_success(self, latency: float) -> None:
+        self._consecutive_overloads = 0
+        self._latencies.append(latency)
+        p95 = self._p95()
+        if self._baseline is None or p95 < self._baseline:
+            self._baseline = p95
+        elif len(self._latencies) == self._latencies.maxlen:
+            # Let the baseline follow lasting shifts, e.g. longer prompts
+            self._baseline += 0.05 * (p95 - self._baseline)
+        if p95 <= self._baseline * self.latency_tolerance:
+            self._limit = min(self._limit + 1 / self._limit, self.max_limit)
+        else:
+            self.stats['latency_holds'] += 1
+    
+    @contextmanager
+    def slot(self, slot: Optional[RequestSlot] = None) -> Iterator[RequestSlot]:
+        """
+        Run one request under the limit
+        
+        Record the response status on the yielded slot; exceptions raised inside
+        the block are classified with is_overload. Only requests with a recorded
+        status, or overload errors, adapt the limit.
+        
+        Args:
+            slot: Slot to record into, e.g. one shared with a circuit breaker
+        """
+        self.acquire()
+        slot = slot or RequestSlot()
+        start = time.monotonic()
+        overload = False
+        try:
+            yield slot
+            overload = is_overload(slot.status_code)
+        except BaseException as e:
+            overload = is_overload(slot.status_code, e)
+            raise
+        finally:
+            self.release(time.monotonic() - start, overload, slot.retry_after, slot.status_code is not None)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Live limit, load and latency figures"""
+        with self._condition:
+            p95 = self._p95()
+            return {
+                **self.stats,
+                'limit': self.limit,
+                'in_flight': self._in_flight,
+                'p95_ms': round(p95 * 1000) if p95 is not None else None,
+                'paused_s': round(max(self._paused_until - time.monotonic(), 0.0), 1),
+            }
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(name: str, **options) -> AdaptiveLimiter:
+    """
+    The process-wide limiter of a service, created with options on first use
+    
+    Args:
+        name: Service name, e.g. 'search', 'content', 'ollama'
+        **options: AdaptiveLimiter arguments, used only when the limiter is created
+    """
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = AdaptiveLimiter(name, **options)
+        return _limiters[name]
+
+def limiter_metrics() -> Dict[str, Dict[str, Any]]:
+    """Snapshots of all limiters, keyed by service name"""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.snapshot() for limiter in limiters}
\ No newline at end of file
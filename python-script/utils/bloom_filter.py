@@ -0,0 +1,194 @@
+"""
+Persistent Bloom filter backed by a memory-mapped file
+"""
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from typing import Optional, Tuple, Iterator
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: writes are only serialized within the process
+    fcntl = None
+
+class BloomFilter:
+    """
+    Set membership with no false negatives and a bounded false-positive rate
+    
+    The bit array lives in a memory-mapped file, so opening a filter of millions
+    of keys costs no load time and additions persist without an explicit save.
+    Positions use double hashing of one BLAKE2b digest per key. Writes hold an
+    exclusive lock on the file, so processes sharing it do not lose each other's
+    bits or header updates.
+    
+    File layout: a fixed header (magic, version, bit count, hash count, keys
+    added, capacity, a caller-defined watermark) followed by the bit array.
+    """
+    
+    MAGIC = b'JSBF'
+    VERSION = 1
+    HEADER = struct.Struct('<4sIQIQQQ')
+    
+    def __init__(self, path: str, mapping: mmap.mmap, file):
+        self.path = path
+        self._mmap = mapping
+        self._file = file
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        _, _, self.num_bits, self.num_hashes, _, self.capacity, _ = self.HEADER.unpack_from(mapping, 0)
+    
+    @staticmethod
+    def optimal_parameters(capacity: int, error_rate: float) -> Tuple[int, int]:
+        """Bit count and hash count for capacity keys at the given false-positive rate"""
+        num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return num_bits, num_hashes
+    
+    @classmethod
+    def create(cls, path: str, capacity: int, error_rate: float) -> 'BloomFilter':
+        """Create an empty filter, replacing any existing file atomically"""
+        num_bits, num_hashes = cls.optimal_parameters(max(capacity, 1), error_rate)
+        size = cls.HEADER.size + (num_bits + 7) // 8
+        
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, num_bits, num_hashes, 0, capacity, 0))
+            # Sparse file: the zeroed bit array takes no disk space until bits are set
+            f.truncate(size)
+        os.replace(temp_path, path)
+        return cls.open(path)
+    
+    @classmethod
+    def open(cls, path: str) -> Optional['BloomFilter']:
+        """Open an existing filter, or return None if the file is missing or not a filter"""
+        try:
+            file = open(path, 'r+b')
+        except FileNotFoundError:
+            return None
+        try:
+            mapping = mmap.mmap(file.fileno(), 0)
+        except ValueError:
+            # Empty file
+            file.close()
+            return None
+        
+        valid = len(mapping) >= cls.HEADER.size
+        if valid:
+            magic, version, num_bits, _, _, _, _ = cls.HEADER.unpack_from(mapping, 0)
+            valid = (magic == cls.MAGIC and version == cls.VERSION and
+                     len(mapping) == cls.HEADER.size + (num_bits + 7) // 8)
+        if not valid:
+            mapping.close()
+            file.close()
+            return None
+        return cls(path, mapping, file)
+    
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        # Odd step, so the probe sequence does not collapse onto a few positions
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+    
+    @contextmanager
+    def locked(self) -> Iterator['BloomFilter']:
+        """Hold the file's write lock, against other threads and processes; reentrant"""
+        with self._lock:
+            if self._lock_depth == 0 and fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield self
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+    
+    def add(self, key: str) -> bool:
+        """
+        Add a key
+        
+        Returns:
+            bool: True if the key was (probably) not present before
+        """
+        mapping = self._mmap
+        offset = self.HEADER.size
+        added = False
+        with self.locked():
+            for position in self._positions(key):
+                index = offset + (position >> 3)
+                bit = 1 << (position & 7)
+                byte = mapping[index]
+                if not byte & bit:
+                    mapping[index] = byte | bit
+                    added = True
+            if added:
+                self._set_header(count=self.count + 1)
+        return added
+    
+    def __contains__(self, key: str) -> bool:
+        mapping = self._mmap
+        offset = self.HEADER.size
+        return all(mapping[offset + (position >> 3)] & (1 << (position & 7))
+                   for position in self._positions(key))
+    
+    def _header(self) -> tuple:
+        return self.HEADER.unpack_from(self._mmap, 0)
+    
+    def _set_header(self, count: Optional[int] = None, watermark: Optional[int] = None) -> None:
+        # Callers hold the write lock: the header is read, modified and written back
+        magic, version, num_bits, num_hashes, old_count, capacity, old_watermark = self._header()
+        self.HEADER.pack_into(
+            self._mmap, 0, magic, version, num_bits, num_hashes,
+            old_count if count is None else count, capacity,
+            old_watermark if watermark is None else watermark
+        )
+    
+    @property
+    def count(self) -> int:
+        """Number of distinct keys added (approximate: colliding keys count once)"""
+        return self._header()[4]
+    
+    @property
+    def watermark(self) -> int:
+        """Caller-defined position (e.g. the last row id added) up to which the filter is complete"""
+        return self._header()[6]
+    
+    @watermark.setter
+    def watermark(self, value: int) -> None:
+        with self.locked():
+            self._set_header(watermark=value)
+    
+    def replaced(self) -> bool:
+        """Whether the file has been recreated since it was opened, e.g. rebuilt by another process"""
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            return True
+        opened = os.fstat(self._file.fileno())
+        return (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino)
+    
+    def fill_ratio(self) -> float:
+        """Fraction of bits set"""
+        bits = int.from_bytes(self._mmap[self.HEADER.size:], 'little').bit_count()
+        return bits / self.num_bits
+    
+    def estimated_error_rate(self) -> float:
+        """Current false-positive probability, from the fraction of bits set"""
+        return self.fill_ratio() ** self.num_hashes
+    
+    def flush(self) -> None:
+        """Write dirty pages to disk"""
+        self._mmap.flush()
+    
+    def close(self) -> None:
+        if not self._mmap.closed:
+            self._mmap.flush()
+            self._mmap.close()
+            self._file.close()
\ No newline at end of file
@@ -0,0 +1,188 @@
+"""
+Circuit breakers for external services
+"""
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Optional, Dict, Any, Iterator
+
+from .adaptive_limiter import RequestSlot, is_overload
+from .error_handling import CircuitOpenError
+
+def is_outage(status_code: Optional[int] = None, error: Optional[BaseException] = None) -> bool:
+    """
+    Whether a response or error means the service is down
+    
+    The overloads of is_overload except 429s, which are left to the adaptive
+    limiter: a service that rate-limits us is up.
+    """
+    return is_overload(status_code, error, rate_limits=False)
+
+class BreakerState(Enum):
+    """States of a circuit breaker"""
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+class CircuitBreaker:
+    """
+    Fails calls to a dead service fast instead of letting each one time out
+    
+    After failure_threshold consecutive outages (see is_outage) the circuit
+    opens and every call raises CircuitOpenError at once. After reset_seconds
+    it goes half-open and lets one probe call through: a success closes the
+    circuit, a failure opens it again for twice as long, up to
+    max_reset_seconds.
+    
+    One breaker is shared by every client of a service; see get_breaker.
+    """
+    
+    def __init__(self,
+                 name: str,
+                 failure_threshold: int = 5,
+                 reset_seconds: float = 30.0,
+                 max_reset_seconds: float = 600.0):
+        """
+        Args:
+            name: Service name, used in errors and metrics
+            failure_threshold: Consecutive outages that open the circuit
+            reset_seconds: Time open before the first probe
+            max_reset_seconds: Longest time open between probes
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.max_reset_seconds = max_reset_seconds
+        self.stats = Counter()
+        
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._open_seconds = reset_seconds
+        self._opened_at = 0.0
+        self._probing = False
+        self._failure_latency = 0.0  # Total seconds spent in calls that failed
+        self._rejected_latency = 0.0  # Total seconds spent in calls that failed fast
+        self._lock = threading.Lock()
+    
+    @property
+    def state(self) -> BreakerState:
+        with self._lock:
+            return self._state
+    
+    def _remaining(self, now: float) -> float:
+        return max(self._opened_at + self._open_seconds - now, 0.0)
+    
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless the call may go through"""
+        start = time.monotonic()
+        with self._lock:
+            if self._state == BreakerState.OPEN and not self._remaining(start):
+                self._state = BreakerState.HALF_OPEN
+            if self._state == BreakerState.CLOSED:
+                return
+            if self._state == BreakerState.HALF_OPEN and not self._probing:
+                self._probing = True
+                self.stats['probes'] += 1
+                return
+            self.stats['rejected'] += 1
+            remaining = self._remaining(start)
+            self._rejected_latency += time.monotonic() - start
+        raise CircuitOpenError(self.name, datetime.now() + timedelta(seconds=remaining))
+    
+    def after_call(self, latency: float, outage: bool) -> None:
+        """
+        Record the outcome of a call let through by before_call
+        
+        Args:
+            latency: Seconds the call took
+            outage: The call failed because the service is down
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.stats['calls'] += 1
+            probe, self._probing = self._probing, False
+            if not outage:
+                self._failures = 0
+                if self._state != BreakerState.CLOSED:
+                    self._state = BreakerState.CLOSED
+                    self._open_seconds = self.reset_seconds
+                    self.stats['closes'] += 1
+                return
+            
+            self.stats['failures'] += 1
+            self._failure_latency += latency
+            self._failures += 1
+            if probe:
+                # The service is still down: wait longer before the next probe
+                self._open_seconds = min(self._open_seconds * 2, self.max_reset_seconds)
+            elif self._state == BreakerState.OPEN or self._failures < self.failure_threshold:
+                return
+            self._state = BreakerState.OPEN
+            self._opened_at = now
+            self.stats['opens'] += 1
+    
+    @contextmanager
+    def guard(self, slot: Optional[RequestSlot] = None) -> Iterator[RequestSlot]:
+        """
+        Run one call through the breaker
+        
+        Raises CircuitOpenError without running the block while the circuit is
+        open. Record the response status on the yielded slot; exceptions raised
+        inside the block are classified with is_outage.
+        
+        Args:
+            slot: Slot to record into, e.g. one shared with an adaptive limiter
+        """
+        self.before_call()
+        slot = slot or RequestSlot()
+        start = time.monotonic()
+        outage = False
+        try:
+            yield slot
+            outage = is_outage(slot.status_code)
+        except BaseException as e:
+            outage = is_outage(slot.status_code, e)
+            raise
+        finally:
+            self.after_call(time.monotonic() - start, outage)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """State, counters and latency of failed versus failed-fast calls"""
+        with self._lock:
+            failures = self.stats['failures']
+            rejected = self.stats['rejected']
+            failure_ms = self._failure_latency / failures * 1000 if failures else None
+            return {
+                **self.stats,
+                'state': self._state.value,
+                'open_s': round(self._remaining(time.monotonic()), 1) if self._state == BreakerState.OPEN else 0.0,
+                'failure_ms': round(failure_ms) if failure_ms is not None else None,
+                'fail_fast_ms': round(self._rejected_latency / rejected * 1000, 3) if rejected else None,
+                # Time the rejected calls would have spent failing the slow way
+                'saved_s': round(rejected * failure_ms / 1000, 1) if rejected and failure_ms else 0.0,
+            }
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(name: str, **options) -> CircuitBreaker:
+    """
+    The process-wide circuit breaker of a service, created with options on first use
+    
+    Args:
+        name: Service name, e.g. 'search', 'content', 'ollama'
+        **options: CircuitBreaker arguments, used only when the breaker is created
+    """
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, **options)
+        return _breakers[name]
+
+def breaker_metrics() -> Dict[str, Dict[str, Any]]:
+    """Snapshots of all circuit breakers, keyed by service name"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
\ No newline at end of file
@@ -14,10 +14,22 @@ class SearchAPIError(APIError):
     """Error with Google Custom Search API"""
     pass
 
+class CircuitOpenError(APIError):
+    """A dependency is failing and its circuit breaker is rejecting calls"""
+    
+    def __init__(self, service: str, retry_at):
+        super().__init__(f"{service} is unavailable (circuit open until {retry_at:%H:%M:%S})")
+        self.service = service
+        self.retry_at = retry_at  # datetime of the next probe
+
 class ContentFetchError(APIError):
     """Error fetching content from Jina AI"""
     pass
 
+class ContentNotModifiedError(ContentFetchError):
+    """A page is unchanged since the validators sent with a conditional request"""
+    pass
+
 class AIAnalysisError(JobSeekrError):
     """Error with AI analysis (Ollama/Anthropic)"""
     pass
@@ -30,6 +42,10 @@ class DatabaseError(JobSeekrError):
     """Error with database operations"""
     pass
 
+class LeaseLostError(DatabaseError):
+    """A work item's lease expired and was claimed by another worker"""
+    pass
+
 class ConfigurationError(JobSeekrError):
     """Error with configuration or missing settings"""
     pass
\ No newline at end of file
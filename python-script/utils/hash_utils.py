@@ -2,7 +2,8 @@
 Content hashing utilities for change detection
 """
 import hashlib
-from typing import Optional
+import re
+from typing import Optional, List
 
 class ContentHasher:
     """Utilities for generating content hashes"""
@@ -27,4 +28,56 @@ class ContentHasher:
         """Compare two content hashes, handling None values"""
         if hash1 is None or hash2 is None:
             return False
-        return hash1 == hash2
\ No newline at end of file
+        return hash1 == hash2
+
+class SimHasher:
+    """SimHash fingerprints for near-duplicate content detection"""
+    
+    BITS = 64
+    # Splitting the fingerprint into BANDS blocks guarantees (pigeonhole) that two
+    # fingerprints within BANDS - 1 bits of each other share at least one block
+    BANDS = 4
+    BAND_BITS = BITS // BANDS
+    
+    _TOKEN_PATTERN = re.compile(r'\w+')
+    
+    def __init__(self, shingle_size: int = 4):
+        self.shingle_size = shingle_size
+    
+    def fingerprint(self, content: str) -> str:
+        """Generate a 64-bit SimHash of word shingles, as a 16 character hex string"""
+        tokens = self._TOKEN_PATTERN.findall(content.lower())
+        if len(tokens) < self.shingle_size:
+            shingles = [' '.join(tokens)]
+        else:
+            shingles = {
+                ' '.join(tokens[i:i + self.shingle_size])
+                for i in range(len(tokens) - self.shingle_size + 1)
+            }
+        
+        weights = [0] * self.BITS
+        for shingle in shingles:
+            value = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'big')
+            for bit in range(self.BITS):
+                if value >> bit & 1:
+                    weights[bit] += 1
+                else:
+                    weights[bit] -= 1
+        
+        fingerprint = 0
+        for bit, weight in enumerate(weights):
+            if weight > 0:
+                fingerprint |= 1 << bit
+        return f"{fingerprint:016x}"
+    
+    @classmethod
+    def bands(cls, fingerprint: str) -> List[int]:
+        """Split a fingerprint into BANDS integer blocks used as lookup keys"""
+        value = int(fingerprint, 16)
+        mask = (1 << cls.BAND_BITS) - 1
+        return [(value >> (i * cls.BAND_BITS)) & mask for i in range(cls.BANDS)]
+    
+    @staticmethod
+    def hamming_distance(fingerprint1: str, fingerprint2: str) -> int:
+        """Number of differing bits between two fingerprints"""
+        return bin(int(fingerprint1, 16) ^ int(fingerprint2, 16)).count('1')
\ No newline at end of file
@@ -0,0 +1,456 @@
+"""
+Readability-style main content extraction from HTML to markdown
+
+Pure functions on bytes and strings, so pages can be parsed in worker processes.
+Only the standard library is used: the page is parsed into a light tree with
+html.parser, blocks of text are scored by length, commas and link density, and
+the best scoring container (plus related siblings) is rendered as markdown.
+"""
+import re
+from html.parser import HTMLParser
+from typing import Optional, List, Dict, Iterable, NamedTuple, Union
+from urllib.parse import urljoin
+
+# Elements whose content is never page text
+SKIPPED_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'iframe', 'canvas', 'object', 'select',
+                'button', 'form', 'input', 'textarea', 'head'}
+# Page furniture removed before scoring
+BOILERPLATE_TAGS = {'nav', 'footer', 'aside'}
+BOILERPLATE_ROLES = {'navigation', 'banner', 'contentinfo', 'complementary', 'dialog', 'menu'}
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source',
+             'track', 'wbr'}
+BLOCK_TAGS = {'address', 'article', 'blockquote', 'dd', 'div', 'dl', 'dt', 'figcaption', 'figure', 'h1', 'h2',
+              'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'ol', 'p', 'pre', 'section', 'table', 'tr',
+              'ul'}
+# Elements scored as paragraphs of text
+PARAGRAPH_TAGS = {'p', 'pre', 'td', 'li', 'dd', 'blockquote'}
+# Start tags that implicitly close an open element of the same kind
+SELF_NESTING_TAGS = {'p', 'li', 'dt', 'dd', 'tr', 'td', 'th', 'option'}
+
+UNLIKELY = re.compile(r'-ad-|banner|breadcrumb|combx|comment|community|cookie|consent|disqus|extra|footer|gdpr|'
+                      r'header|menu|related|remark|replies|rss|shoutbox|sidebar|skyscraper|social|sponsor|'
+                      r'supplemental|pagination|pager|popup|share|subscribe|newsletter|modal|navbar|topnav', re.I)
+MAYBE = re.compile(r'and|article|body|column|content|main|shadow|job|posting|description', re.I)
+POSITIVE = re.compile(r'article|body|content|entry|main|page|post|text|blog|story|job|posting|description|'
+                      r'details', re.I)
+NEGATIVE = re.compile(r'-ad-|hidden|banner|combx|comment|contact|footer|gdpr|masthead|media|meta|outbrain|promo|'
+                      r'related|scroll|share|shoutbox|sidebar|skyscraper|sponsor|shopping|tags|widget|nav|menu|'
+                      r'cookie', re.I)
+WHITESPACE = re.compile(r'\s+')
+META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+
+class Node:
+    """An element of the parsed page"""
+    
+    __slots__ = ('tag', 'attrs', 'children', 'parent', 'text_len', 'link_len', 'score')
+    
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional['Node'] = None):
+        self.tag = tag
+        self.attrs = attrs
+        self.children: List[Union['Node', str]] = []
+        self.parent = parent
+        self.text_len = 0
+        self.link_len = 0
+        self.score: Optional[float] = None
+    
+    def class_and_id(self) -> str:
+        return f"{self.attrs.get('class', '')} {self.attrs.get('id', '')}"
+    
+    def text(self) -> str:
+        """Whitespace-normalized text content"""
+        parts = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+            else:
+                stack.extend(reversed(node.children))
+        return WHITESPACE.sub(' ', ''.join(parts)).strip()
+
+class _TreeBuilder(HTMLParser):
+    """Builds a Node tree, keeping the title and meta tags of the head"""
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node('#root', {})
+        self.current = self.root
+        self.skip_depth = 0
+        self.skip_tag: Optional[str] = None
+        self.in_title = False
+        self.title = ''
+        self.meta: Dict[str, str] = {}
+    
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value or '' for name, value in attrs}
+        if tag == 'meta':
+            key = attrs.get('property') or attrs.get('name')
+            if key and 'content' in attrs:
+                self.meta.setdefault(key.lower(), attrs['content'])
+            return
+        if tag == 'title':
+            self.in_title = True
+            return
+        if self.skip_depth:
+            if tag == self.skip_tag and tag not in VOID_TAGS:
+                self.skip_depth += 1
+            return
+        if tag in SKIPPED_TAGS:
+            if tag not in VOID_TAGS:
+                self.skip_tag, self.skip_depth = tag, 1
+            return
+        if tag in SELF_NESTING_TAGS:
+            self._close_open(tag)
+        node = Node(tag, attrs, self.current)
+        self.current.children.append(node)
+        if tag not in VOID_TAGS:
+            self.current = node
+    
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and not self.skip_depth and self.current.tag == tag:
+            self.current = self.current.parent
+    
+    def _close_open(self, tag: str) -> None:
+        """Close an open element of the same kind up to the nearest list or table"""
+        node = self.current
+        while node is not self.root and node.tag not in ('ul', 'ol', 'dl', 'table', 'tbody', 'thead', 'select'):
+            if node.tag == tag:
+                self.current = node.parent
+                return
+            node = node.parent
+    
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self.in_title = False
+            return
+        if self.skip_depth:
+            if tag == self.skip_tag:
+                self.skip_depth -= 1
+            return
+        # Close the nearest open element with this tag; stray end tags are ignored
+        node = self.current
+        while node is not self.root:
+            if node.tag == tag:
+                self.current = node.parent
+                return
+            node = node.parent
+    
+    def handle_data(self, data):
+        if self.in_title:
+            self.title += data
+        elif not self.skip_depth:
+            self.current.children.append(data)
+
+class ExtractedPage(NamedTuple):
+    """Main content of a page"""
+    title: str
+    published_time: Optional[str]
+    markdown: str
+    
+    def as_reader_text(self, url: str, extra_headers: Iterable[str] = ()) -> str:
+        """
+        The page in the layout of the Jina reader's plain text response
+        
+        Args:
+            url: Page URL, shown as the source
+            extra_headers: Further "Name: value" header lines
+        """
+        lines = [f"Title: {self.title}", '', f"URL Source: {url}", '']
+        if self.published_time:
+            lines += [f"Published Time: {self.published_time}", '']
+        for header in extra_headers:
+            lines += [header, '']
+        lines += ['Markdown Content:', self.markdown]
+        return '\n'.join(lines)
+
+def decode_html(body: bytes, encoding: Optional[str] = None) -> str:
+    """
+    Decode a page with the charset of its Content-Type, its meta tag, or UTF-8
+    
+    Args:
+        body: Raw (already content-decoded) response body
+        encoding: Charset from the Content-Type header, if any
+    """
+    if not encoding:
+        match = META_CHARSET.search(body[:2048])
+        encoding = match.group(1).decode('ascii') if match else 'utf-8'
+    try:
+        return body.decode(encoding, errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+
+def _is_boilerplate(node: Node) -> bool:
+    if node.tag in BOILERPLATE_TAGS or node.attrs.get('role') in BOILERPLATE_ROLES:
+        return True
+    if 'hidden' in node.attrs or node.attrs.get('aria-hidden') == 'true':
+        return True
+    if re.search(r'display\s*:\s*none', node.attrs.get('style', '')):
+        return True
+    if node.tag in ('body', 'article', 'main', 'a'):
+        return False
+    names = node.class_and_id()
+    return bool(UNLIKELY.search(names)) and not MAYBE.search(names)
+
+def _prune(node: Node) -> None:
+    """Remove page furniture and fill in text and link lengths, bottom up"""
+    children = []
+    for child in node.children:
+        if isinstance(child, str):
+            length = len(child.strip())
+            node.text_len += length
+            if node.tag == 'a':
+                node.link_len += length
+            children.append(child)
+        elif not _is_boilerplate(child):
+            _prune(child)
+            node.text_len += child.text_len
+            node.link_len += child.text_len if node.tag == 'a' else child.link_len
+            children.append(child)
+    node.children = children
+
+def _link_density(node: Node) -> float:
+    return node.link_len / node.text_len if node.text_len else 0.0
+
+def _class_weight(node: Node) -> int:
+    weight = 0
+    for name in (node.attrs.get('class', ''), node.attrs.get('id', '')):
+        if name:
+            weight += 25 if POSITIVE.search(name) else 0
+            weight -= 25 if NEGATIVE.search(name) else 0
+    return weight
+
+def _initial_score(node: Node) -> float:
+    score = {'div': 5, 'article': 10, 'main': 10, 'section': 3, 'pre': 3, 'td': 3, 'blockquote': 3,
+             'address': -3, 'ol': -3, 'ul': -3, 'dl': -3, 'dd': -3, 'dt': -3, 'li': -3,
+             'h1': -5, 'h2': -5, 'h3': -5, 'h4': -5, 'h5': -5, 'h6': -5, 'th': -5}.get(node.tag, 0)
+    return score + _class_weight(node)
+
+def _paragraphs(root: Node):
+    """Text blocks to score: paragraph elements, and divs without block children"""
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        children = [child for child in node.children if isinstance(child, Node)]
+        if node.tag in PARAGRAPH_TAGS or (
+                node.tag == 'div' and not any(child.tag in BLOCK_TAGS for child in children)):
+            yield node
+        stack.extend(children)
+
+def _score(root: Node) -> List[Node]:
+    """Score containers by the paragraphs inside them"""
+    candidates = []
+    for paragraph in _paragraphs(root):
+        if paragraph.text_len < 25 or paragraph.parent is None:
+            continue
+        text = paragraph.text()
+        content_score = 1 + text.count(',') + min(len(text) // 100, 3)
+        
+        # The parent gets the full score, ancestors further up a decreasing share
+        ancestor, level = paragraph.parent, 0
+        while ancestor is not None and ancestor.tag != '#root' and level < 3:
+            if ancestor.score is None:
+                ancestor.score = _initial_score(ancestor)
+                candidates.append(ancestor)
+            ancestor.score += content_score / (1 if level == 0 else 2 if level == 1 else level * 3)
+            ancestor, level = ancestor.parent, level + 1
+    
+    for candidate in candidates:
+        candidate.score *= 1 - _link_density(candidate)
+    return candidates
+
+def _main_content(root: Node) -> List[Node]:
+    """The best scoring container and the siblings that belong with it"""
+    candidates = _score(root)
+    if not candidates:
+        return [root]
+    top = max(candidates, key=lambda node: node.score)
+    
+    # A container holding only part of the text (e.g. one of several sections)
+    # gives way to its parent when the parent scores nearly as well
+    while (top.parent is not None and top.parent.score is not None and top.parent.tag != '#root'
+           and top.parent.score >= top.score * 0.75):
+        top = top.parent
+    if top.parent is None:
+        return [top]
+    
+    threshold = max(10, top.score * 0.2)
+    kept = []
+    for sibling in top.parent.children:
+        if not isinstance(sibling, Node):
+            continue
+        if sibling is top or (sibling.score is not None and sibling.score + _class_weight(top) >= threshold):
+            kept.append(sibling)
+        elif sibling.tag == 'p' and sibling.text_len > 80 and _link_density(sibling) < 0.25:
+            kept.append(sibling)
+    return kept
+
+class _MarkdownWriter:
+    """Renders nodes as markdown blocks"""
+    
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.blocks: List[str] = []
+        self.line: List[str] = []
+        self.prefixes: List[str] = []  # Blockquote and list indentation
+        self.pending_prefix = ''
+    
+    def flush(self) -> None:
+        text = '\n'.join(part.strip() for part in ''.join(self.line).split('\n'))
+        text = re.sub(r' {2,}', ' ', text).strip()
+        self.line = []
+        if text:
+            indent = ''.join(self.prefixes)
+            prefix, self.pending_prefix = self.pending_prefix, ''
+            lines = text.split('\n')
+            first = indent[:len(indent) - len(prefix)] + prefix if prefix else indent
+            self.blocks.append('\n'.join([first + lines[0]] + [indent + line for line in lines[1:]]))
+    
+    def render(self, node: Union[Node, str], pre: bool = False) -> None:
+        if isinstance(node, str):
+            self.line.append(node if pre else WHITESPACE.sub(' ', node))
+            return
+        
+        tag = node.tag
+        if tag in ('h1', 'h2', 'h3', 'h4', 'h5', 'h6'):
+            self.flush()
+            self.pending_prefix = '#' * int(tag[1]) + ' '
+            self._children(node)
+            self.line = [part.replace('\n', ' ') for part in self.line]
+            self.flush()
+        elif tag in ('ul', 'ol'):
+            self.flush()
+            start = len(self.blocks)
+            for number, item in enumerate(child for child in node.children
+                                          if isinstance(child, Node) and child.tag == 'li'):
+                marker = f"{number + 1}. " if tag == 'ol' else '- '
+                self.prefixes.append(' ' * len(marker))
+                self.pending_prefix = marker
+                self._children(item)
+                self.flush()
+                self.prefixes.pop()
+            # Tight list: items on consecutive lines
+            self.blocks[start:] = ['\n'.join(self.blocks[start:])] if len(self.blocks) > start else []
+        elif tag == 'pre':
+            self.flush()
+            code = ''.join(self._raw_text(node)).strip('\n')
+            if code.strip():
+                self.blocks.append(f"```\n{code}\n```")
+        elif tag == 'blockquote':
+            self.flush()
+            self.prefixes.append('> ')
+            self._children(node)
+            self.flush()
+            self.prefixes.pop()
+        elif tag == 'table':
+            self.flush()
+            self._table(node)
+        elif tag == 'hr':
+            self.flush()
+            self.blocks.append('---')
+        elif tag == 'br':
+            self.line.append('\n')
+        elif tag == 'a':
+            start = len(self.line)
+            self._children(node)
+            text = WHITESPACE.sub(' ', ''.join(self.line[start:])).strip()
+            href = node.attrs.get('href', '')
+            del self.line[start:]
+            if text and href and not href.startswith(('javascript:', '#')):
+                self.line.append(f"[{text}]({urljoin(self.base_url, href)})")
+            else:
+                self.line.append(text)
+        elif tag in ('strong', 'b', 'em', 'i', 'code'):
+            mark = {'strong': '**', 'b': '**', 'em': '*', 'i': '*', 'code': '`'}[tag]
+            start = len(self.line)
+            self._children(node)
+            text = ''.join(self.line[start:])
+            del self.line[start:]
+            if text.strip():
+                leading = ' ' if text[:1].isspace() else ''
+                trailing = ' ' if text[-1:].isspace() else ''
+                self.line.append(f"{leading}{mark}{text.strip()}{mark}{trailing}")
+        elif tag == 'img':
+            alt = node.attrs.get('alt', '').strip()
+            src = node.attrs.get('src')
+            if alt and src:
+                self.line.append(f"![{alt}]({urljoin(self.base_url, src)})")
+        elif tag in BLOCK_TAGS:
+            self.flush()
+            self._children(node)
+            self.flush()
+        else:
+            self._children(node)
+    
+    def _children(self, node: Node) -> None:
+        for child in node.children:
+            self.render(child)
+    
+    def _raw_text(self, node: Node) -> List[str]:
+        parts = []
+        for child in node.children:
+            if isinstance(child, str):
+                parts.append(child)
+            elif child.tag == 'br':
+                parts.append('\n')
+            else:
+                parts.extend(self._raw_text(child))
+        return parts
+    
+    def _table(self, table: Node) -> None:
+        rows = []
+        stack = [table]
+        while stack:
+            node = stack.pop()
+            for child in reversed(node.children):
+                if isinstance(child, Node):
+                    if child.tag == 'tr':
+                        rows.append(child)
+                    elif child.tag != 'table':
+                        stack.append(child)
+        rows.reverse()
+        
+        lines = []
+        for row in rows:
+            cells = []
+            for cell in row.children:
+                if isinstance(cell, Node) and cell.tag in ('td', 'th'):
+                    writer = _MarkdownWriter(self.base_url)
+                    writer._children(cell)
+                    writer.flush()
+                    cells.append(' '.join(writer.blocks).replace('\n', ' ').replace('|', '\\|'))
+            if any(cells):
+                lines.append('| ' + ' | '.join(cells) + ' |')
+                if len(lines) == 1:
+                    lines.append('|' + ' --- |' * len(cells))
+        if lines:
+            self.blocks.append('\n'.join(lines))
+
+def extract_page(body: Union[bytes, str], url: str, encoding: Optional[str] = None) -> ExtractedPage:
+    """
+    Extract the title, publication time and main content of a page
+    
+    Args:
+        body: HTML, raw or decoded
+        url: Page URL, used to resolve relative links
+        encoding: Charset from the Content-Type header, if any
+        
+    Returns:
+        ExtractedPage: Title, publication time (if the page declares one) and main content as markdown
+    """
+    html = decode_html(body, encoding) if isinstance(body, bytes) else body
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    
+    root = builder.root
+    _prune(root)
+    writer = _MarkdownWriter(url)
+    for node in _main_content(root):
+        writer.render(node)
+    writer.flush()
+    
+    meta = builder.meta
+    title = WHITESPACE.sub(' ', builder.title).strip() or meta.get('og:title', '')
+    published = meta.get('article:published_time') or meta.get('datepublished') or meta.get('date')
+    return ExtractedPage(title, published, '\n\n'.join(writer.blocks))
\ No newline at end of file
@@ -0,0 +1,267 @@
+"""
+Per-stage timing of service calls, with a run report and a trace export
+"""
+import bisect
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Iterator
+
+# Upper bounds of the latency histogram buckets, in milliseconds; a last bucket holds the rest
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+# String tags whose values are counted per stage, e.g. calls per backend or model
+GROUPED_TAGS = ('backend', 'model', 'op', 'status', 'outcome', 'error')
+# Durations kept per stage for percentiles; beyond that a uniform sample of all spans is kept
+SAMPLE_SIZE = 10000
+
+class Span:
+    """One timed call: its stage, tags, and time spent in nested spans"""
+    
+    __slots__ = ('stage', 'tags', 'start', 'duration', 'child_time', 'thread')
+    
+    def __init__(self, stage: str, tags: Dict[str, Any]):
+        self.stage = stage
+        self.tags = tags
+        self.start = 0.0
+        self.duration = 0.0
+        self.child_time = 0.0
+        self.thread = threading.get_ident()
+    
+    def tag(self, **tags) -> None:
+        """Add tags learned during the call, e.g. bytes received or tokens generated"""
+        self.tags.update(tags)
+    
+    @property
+    def self_time(self) -> float:
+        """Time not spent in nested spans"""
+        return max(self.duration - self.child_time, 0.0)
+
+class _StageStats:
+    """Aggregates of one stage's spans"""
+    
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.max_duration = 0.0
+        self.sample: List[float] = []  # Reservoir sample of durations, for percentiles
+        self.self_time = 0.0
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        self.totals = Counter()  # Numeric tags, summed
+        self.flags = Counter()  # Boolean tags, counted when true
+        self.groups: Dict[str, Counter] = defaultdict(Counter)
+    
+    def add(self, span: Span) -> None:
+        self.count += 1
+        self.total_time += span.duration
+        self.max_duration = max(self.max_duration, span.duration)
+        if len(self.sample) < SAMPLE_SIZE:
+            self.sample.append(span.duration)
+        else:
+            # Every span so far stays in the sample with equal probability
+            index = random.randrange(self.count)
+            if index < SAMPLE_SIZE:
+                self.sample[index] = span.duration
+        self.self_time += span.self_time
+        self.histogram[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, span.duration * 1000)] += 1
+        for name, value in span.tags.items():
+            if isinstance(value, bool):
+                self.flags[name] += value
+            elif isinstance(value, (int, float)):
+                self.totals[name] += value
+            elif name in GROUPED_TAGS and value is not None:
+                self.groups[name][str(value)] += 1
+    
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.sample)
+        
+        def percentile_ms(fraction: float) -> float:
+            index = min(len(ordered) - 1, max(int(fraction * len(ordered) + 0.5) - 1, 0))
+            return round(ordered[index] * 1000, 2)
+        
+        labels = [f"<={bound}" for bound in HISTOGRAM_BOUNDS_MS] + [f">{HISTOGRAM_BOUNDS_MS[-1]}"]
+        return {
+            'count': self.count,
+            'errors': sum(self.groups['error'].values()),
+            'total_s': round(self.total_time, 3),
+            'self_s': round(self.self_time, 3),
+            'mean_ms': round(self.total_time / self.count * 1000, 2),
+            'p50_ms': percentile_ms(0.5),
+            'p95_ms': percentile_ms(0.95),
+            'p99_ms': percentile_ms(0.99),
+            'max_ms': round(self.max_duration * 1000, 2),
+            'histogram_ms': {label: count for label, count in zip(labels, self.histogram) if count},
+            'totals': dict(self.totals),
+            'flags': dict(self.flags),
+            **{name: dict(counts) for name, counts in self.groups.items() if counts},
+        }
+
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+class RunRecorder:
+    """
+    Spans of one pipeline run, aggregated per stage
+    
+    Aggregates are always kept; individual spans only when trace is set, for
+    write_trace. The time breakdown charges each span its self time (its
+    duration less that of spans nested in it, on the same thread), so stages
+    add up without double counting: a job's own time is the pipeline work
+    outside any instrumented call.
+    """
+    
+    def __init__(self, trace: bool = False, max_trace_spans: int = 200000):
+        """
+        Args:
+            trace: Keep individual spans for a trace file
+            max_trace_spans: Spans kept for the trace at most; later ones are only aggregated
+        """
+        self.trace = trace
+        self.max_trace_spans = max_trace_spans
+        self.started_at = datetime.now(timezone.utc)
+        self._origin = time.perf_counter()
+        self._stages: Dict[str, _StageStats] = defaultdict(_StageStats)
+        self._spans: List[Span] = []
+        self._dropped = 0
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def span(self, stage: str, **tags) -> Iterator[Span]:
+        """
+        Time the block as a span of a stage
+        
+        Exceptions are recorded in the 'error' tag and re-raised.
+        
+        Args:
+            stage: Pipeline stage, e.g. 'search', 'fetch', 'classify'
+            **tags: Backend, model, op and the like; more can be added on the yielded span
+        """
+        span = Span(stage, tags)
+        parent = _current_span.get()
+        token = _current_span.set(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.tags['error'] = type(e).__name__
+            raise
+        finally:
+            span.duration = time.perf_counter() - start
+            span.start = start - self._origin
+            _current_span.reset(token)
+            if parent is not None and parent.thread == span.thread:
+                parent.child_time += span.duration
+            self._record(span)
+    
+    def _record(self, span: Span) -> None:
+        with self._lock:
+            self._stages[span.stage].add(span)
+            if not self.trace:
+                return
+            if len(self._spans) >= self.max_trace_spans:
+                self._dropped += 1
+                return
+            self._spans.append(span)
+            if span.thread not in self._threads:
+                self._threads[span.thread] = threading.current_thread().name
+    
+    def summary(self) -> Dict[str, Any]:
+        """Per-stage counts, latency percentiles and histograms, and the time breakdown"""
+        with self._lock:
+            stages = {stage: stats.summary() for stage, stats in self._stages.items()}
+        instrumented = sum(stats['self_s'] for stats in stages.values())
+        breakdown = sorted(
+            ({'stage': stage, 'self_s': stats['self_s'],
+              'share': round(stats['self_s'] / instrumented, 4) if instrumented else 0.0}
+             for stage, stats in stages.items()),
+            key=lambda entry: entry['self_s'], reverse=True
+        )
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'wall_s': round(time.perf_counter() - self._origin, 3),
+            'stages': stages,
+            'time_breakdown': breakdown,
+        }
+    
+    def write_report(self, path: str, extra: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Write the summary as JSON
+        
+        Args:
+            path: Output file
+            extra: More sections for the report, e.g. run counters
+        """
+        _write_json(path, {**self.summary(), **(extra or {})})
+    
+    def write_trace(self, path: str) -> None:
+        """Write the kept spans in Chrome trace-event format (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self._spans)
+            threads = dict(self._threads)
+            dropped = self._dropped
+        tids = {thread: number for number, thread in enumerate(threads, 1)}
+        
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tids[thread], 'args': {'name': name}}
+                  for thread, name in threads.items()]
+        for span in spans:
+            label = span.tags.get('op') or span.tags.get('backend')
+            events.append({
+                'name': f"{span.stage} {label}" if label else span.stage,
+                'cat': span.stage,
+                'ph': 'X',
+                'ts': round(span.start * 1e6, 1),
+                'dur': round(span.duration * 1e6, 1),
+                'pid': pid,
+                'tid': tids[span.thread],
+                'args': {name: value for name, value in span.tags.items() if value is not None},
+            })
+        _write_json(path, {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'started_at': self.started_at.isoformat(timespec='seconds'), 'dropped_spans': dropped},
+        })
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    """Write JSON through a temporary file, so readers never see a partial file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+_run = RunRecorder()
+_run_lock = threading.Lock()
+
+def start_run(trace: bool = False) -> RunRecorder:
+    """
+    Start recording a new run; spans from then on go to the returned recorder
+    
+    Args:
+        trace: Keep individual spans for a trace file
+    """
+    global _run
+    with _run_lock:
+        _run = RunRecorder(trace)
+        return _run
+
+def current_run() -> RunRecorder:
+    """The recorder spans currently go to"""
+    return _run
+
+def span(stage: str, **tags):
+    """Time a block as a span of the current run (see RunRecorder.span)"""
+    return _run.span(stage, **tags)
+
+def tag(**tags) -> None:
+    """Add tags to the innermost open span of this thread, if any"""
+    current = _current_span.get()
+    if current is not None:
+        current.tag(**tags)
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""
+Incremental JSON reading for large search result payloads
+"""
+import json
+from typing import Any, Dict, IO, Iterator, Union
+
+def iter_json_items(source: Union[str, IO[bytes]], prefix: str = 'items.item') -> Iterator[Dict[str, Any]]:
+    """
+    Yield the elements of a JSON array inside a document without loading it all
+    
+    Uses ijson when it is installed, so items are parsed one at a time from a file or
+    a live response stream (e.g. requests' response.raw). Without ijson the document
+    is loaded in one go and its items are yielded from memory.
+    
+    Args:
+        source: Path to a JSON file or a binary file-like object
+        prefix: ijson path of the array elements ('items.item' for Google Custom Search)
+        
+    Yields:
+        Dict: Each array element
+    """
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            yield from iter_json_items(f, prefix)
+        return
+    
+    try:
+        import ijson
+    except ImportError:
+        ijson = None
+    
+    if ijson is not None:
+        # use_float keeps numbers as float instead of Decimal, like json.load
+        yield from ijson.items(source, prefix, use_float=True)
+        return
+    
+    data = json.load(source)
+    for key in prefix.split('.'):
+        if key == 'item':
+            break
+        data = data.get(key, []) if isinstance(data, dict) else []
+    yield from data
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""
+Lazily parsed JSON objects for stored analysis results
+"""
+import json
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional
+
+class LazyJSONDict(Mapping):
+    """Read-only mapping over a JSON object string, parsed on first access"""
+    
+    __slots__ = ('_raw', '_data')
+    
+    def __init__(self, raw: str):
+        self._raw = raw
+        self._data: Optional[Dict[str, Any]] = None
+    
+    def _parse(self) -> Dict[str, Any]:
+        """Parse the raw JSON, treating invalid JSON as an empty object"""
+        try:
+            data = json.loads(self._raw)
+        except (json.JSONDecodeError, TypeError):
+            return {}
+        return data if isinstance(data, dict) else {}
+    
+    def _load(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._data = self._parse()
+        return self._data
+    
+    def __getitem__(self, key: str) -> Any:
+        return self._load()[key]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._load())
+    
+    def __len__(self) -> int:
+        return len(self._load())
+    
+    def __repr__(self) -> str:
+        if self._data is None:
+            return f"LazyJSONDict(<unparsed, {len(self._raw)} chars>)"
+        return f"LazyJSONDict({self._data!r})"
+    
+    @property
+    def is_parsed(self) -> bool:
+        """Whether the JSON has been parsed yet"""
+        return self._data is not None
+    
+    def to_json(self) -> str:
+        """Return the JSON text without parsing it"""
+        return self._raw
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a plain dict; if not parsed yet, the result is not cached"""
+        if self._data is not None:
+            return dict(self._data)
+        return self._parse()
+
+def analysis_summary(analysis: Mapping[str, Any]) -> Mapping[str, Any]:
+    """The analysis 'summary' object, or an empty one if missing or malformed"""
+    summary = analysis.get('summary')
+    return summary if isinstance(summary, Mapping) else {}
+
+class LazyJSONEncoder(json.JSONEncoder):
+    """Custom JSON encoder for LazyJSONDict objects."""
+    def default(self, obj):
+        if isinstance(obj, LazyJSONDict):
+            return obj.to_dict()
+        return super().default(obj)
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""
+Precomputed facets, sort orders and search index for the HTML report
+"""
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from .lazy_json import analysis_summary
+from .text_extractors import TimeExtractor
+
+# Keeps tokens like "c++", "c#" and "node.js" intact
+TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#.]*')
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'from', 'has', 'have',
+    'he', 'his', 'in', 'is', 'it', 'its', 'of', 'on', 'or', 'that', 'the', 'their', 'this',
+    'to', 'was', 'which', 'while', 'with', 'would', 'will', 'role', 'job',
+})
+
+SORT_KEYS = ('fit_score', 'date_posted', 'company', 'title')
+FACETS = ('recommendation', 'company', 'location', 'technology')
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into lowercase search tokens, dropping stopwords and single characters"""
+    if not text:
+        return []
+    tokens = (token.rstrip('.') for token in TOKEN_PATTERN.findall(text.lower()))
+    return [token for token in tokens if len(token) > 1 and token not in STOPWORDS]
+
+def _posted_at(job: Dict[str, Any]) -> Optional[str]:
+    """Estimate when a job was posted (UTC) from its relative posted time and processing time"""
+    if not job.get('created_at'):
+        return None
+    try:
+        # created_at is the naive local processing time
+        processed_at = datetime.fromisoformat(job['created_at']).astimezone()
+        posted_at = TimeExtractor.posted_at_utc(job.get('date_posted'), processed_at)
+    except ValueError:
+        return None
+    return posted_at.isoformat() if posted_at else None
+
+def index_entry(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compact record of the fields the report index is built from
+    
+    Args:
+        job: Report dictionary from generate_web_report.job_to_dict
+        
+    Returns:
+        Dict: Facet values, sort values and search terms for one job
+    """
+    analysis = job.get('analysis_summary') or {}
+    technologies = analysis_summary(analysis).get('key_technologies')
+    technologies = [tech for tech in technologies if isinstance(tech, str)] if isinstance(technologies, list) else []
+    
+    text = ' '.join(filter(None, [
+        job.get('title'), job.get('company'),
+        analysis.get('job_summary'), analysis.get('fit_summary'), *technologies,
+    ]))
+    
+    return {
+        'id': job['id'],
+        'recommendation': job.get('recommendation'),
+        'company': job.get('company'),
+        'location': job.get('location'),
+        'technologies': technologies,
+        'fit_score': job.get('fit_score'),
+        'posted_at': _posted_at(job),
+        'title': job.get('title'),
+        'terms': sorted(set(tokenize(text))),
+    }
+
+def delta_encode(ids: List[int]) -> List[int]:
+    """Encode ascending ids as differences, which keeps the JSON small"""
+    return [job_id - previous for previous, job_id in zip([0, *ids], ids)]
+
+def build_report_index(entries: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the client-side index from index entries
+    
+    Returns a dictionary with:
+        ids: All job ids, ascending and delta encoded
+        sorts: Job ids in display order for each key in SORT_KEYS
+        facets: For each facet, [value, delta encoded ids] pairs, most common first
+        terms: Search token -> delta encoded ids
+    """
+    entries = sorted(entries, key=lambda entry: entry['id'])
+    
+    facets = {name: defaultdict(list) for name in FACETS}
+    terms = defaultdict(list)
+    for entry in entries:
+        job_id = entry['id']
+        for name in ('recommendation', 'company', 'location'):
+            if entry[name]:
+                facets[name][entry[name]].append(job_id)
+        # A technology listed twice for one job only counts once
+        for technology in dict.fromkeys(entry['technologies']):
+            facets['technology'][technology].append(job_id)
+        for term in entry['terms']:
+            terms[term].append(job_id)
+    
+    # Ties fall back to newest first
+    newest_first = entries[::-1]
+    sorts = {
+        'fit_score': sorted(newest_first, key=lambda entry: -(entry['fit_score'] or 0)),
+        'date_posted': sorted(newest_first, key=lambda entry: entry['posted_at'] or '', reverse=True),
+        'company': sorted(newest_first, key=lambda entry: (entry['company'] or '').casefold()),
+        'title': sorted(newest_first, key=lambda entry: (entry['title'] or '').casefold()),
+    }
+    
+    return {
+        'count': len(entries),
+        'ids': delta_encode([entry['id'] for entry in entries]),
+        'sorts': {key: [entry['id'] for entry in ordered] for key, ordered in sorts.items()},
+        'facets': {
+            name: [
+                [value, delta_encode(ids)]
+                for value, ids in sorted(values.items(), key=lambda item: (-len(item[1]), item[0]))
+            ]
+            for name, values in facets.items()
+        },
+        'terms': {term: delta_encode(ids) for term, ids in sorted(terms.items())},
+    }
\ No newline at end of file
@@ -2,7 +2,52 @@
 Text extraction utilities with regex patterns for job data parsing
 """
 import re
-from typing import Optional, List
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+
+# Patterns are compiled once at import time. Each one is guarded by a cheap substring
+# check on its literal anchor, so most items never reach the regex engine at all.
+COMPANY_TITLE_PATTERN = re.compile(r'@\s*([^\|\-]+?)(?:\s*$|\s*\||\s*\-)')  # "Role @ Company"
+GREENHOUSE_COMPANY_PATTERN = re.compile(r'boards\.greenhouse\.io/([^/]+)/')
+COMPANY_METADATA_PATTERNS = [
+    ('-', re.compile(r'\-\s*([^\-\|]+?)\s*$')),  # "Job Title - Company"
+    ('|', re.compile(r'\|\s*([^\-\|]+?)\s*$')),  # "Job Title | Company"
+    ('at', re.compile(r'at\s+([^\-\|]+?)(?:\s*$|\s*\||\s*\-)')),  # "Job Title at Company"
+]
+
+LOCATION_TITLE_PATTERNS = [
+    ('Remote', re.compile(r'Remote\s*-\s*([^\-\|]+)')),  # "Remote - USA"
+    ('Remote', re.compile(r'([^\-\|]+)\s*-\s*Remote')),  # "USA - Remote"
+    ('-', re.compile(r'\-\s*([^\-\|,]+(?:,\s*[^\-\|]+)*)\s*$')),  # Location at end after dash
+]
+LOCATION_SNIPPET_PATTERN = re.compile(r'Location[:\.]?\s*([^\n\r\.]+)')
+NON_LOCATION_PATTERN = re.compile(r'engineer|developer|software|job|position', re.IGNORECASE)
+REMOTE_PATTERN = re.compile(r'\bremote\b', re.IGNORECASE)
+
+# "Compensation: $150,000 - $200,000" is covered by the plain dollar range pattern
+SALARY_PATTERNS = [
+    ('$', re.compile(r'\$([\d,]+)\s*[–\-]\s*\$([\d,]+)')),  # "$150,000 – $200,000"
+    ('K', re.compile(r'([\d,]+)K\s*[–\-]\s*([\d,]+)K')),  # "150K – 200K"
+]
+SALARY_AMOUNT_PATTERN = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*([kKmM])?\b')
+HOURLY_PATTERN = re.compile(r'hour|/\s*hr\b', re.IGNORECASE)
+# Bounds of a range are joined by a dash or "to", e.g. "150 - 200k", "$150,000 to $200,000"
+SALARY_RANGE_SEPARATOR_PATTERN = re.compile(r'\s*(?:[-–—]|to)\s*[$€£]?\s*', re.IGNORECASE)
+# Retirement plans look like amounts in thousands ("401k match")
+RETIREMENT_PLAN_PATTERN = re.compile(r'\b(?:401|403|457)\s*\(?[kb]\b\)?', re.IGNORECASE)
+
+POSTED_TIME_PATTERN = re.compile(r'(\d+\s+(?:day|hour|minute|second)s?\s+ago)')
+POSTED_AGE_PATTERN = re.compile(r'(\d+)\s+(day|hour|minute|second)s?\s+ago')
+
+def _search_guarded(patterns, text: str) -> Optional[re.Match]:
+    """Return the first match of (anchor, pattern) pairs whose anchor occurs in text"""
+    for anchor, pattern in patterns:
+        if anchor in text:
+            match = pattern.search(text)
+            if match:
+                return match
+    return None
 
 class CompanyExtractor:
     """Extract company names from job search results"""
@@ -10,7 +55,9 @@ class CompanyExtractor:
     @staticmethod
     def extract_from_title(title: str) -> Optional[str]:
         """Extract company from @ pattern in title"""
-        match = re.search(r'@\s*([^\|\-]+?)(?:\s*$|\s*\||\s*\-)', title)
+        if '@' not in title:
+            return None
+        match = COMPANY_TITLE_PATTERN.search(title)
         return match.group(1).strip() if match else None
     
     @staticmethod
@@ -18,41 +65,25 @@ class CompanyExtractor:
         """Extract company from greenhouse.io URLs"""
         if 'greenhouse.io' not in url:
             return None
-        match = re.search(r'boards\.greenhouse\.io/([^/]+)/', url)
+        match = GREENHOUSE_COMPANY_PATTERN.search(url)
         return match.group(1).replace('-', ' ').title() if match else None
     
     @staticmethod
     def extract_from_metadata(og_title: str) -> Optional[str]:
         """Extract company from og:title metadata"""
-        patterns = [
-            r'\-\s*([^\-\|]+?)\s*$',  # "Job Title - Company"
-            r'\|\s*([^\-\|]+?)\s*$',  # "Job Title | Company"
-            r'at\s+([^\-\|]+?)(?:\s*$|\s*\||\s*\-)',  # "Job Title at Company"
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, og_title)
-            if match:
-                return match.group(1).strip()
-        return None
+        match = _search_guarded(COMPANY_METADATA_PATTERNS, og_title)
+        return match.group(1).strip() if match else None
 
 class LocationExtractor:
     """Extract location information from job data"""
     
-    # Common non-location terms to filter out
-    NON_LOCATION_TERMS = ['engineer', 'developer', 'software', 'job', 'position']
-    
     @staticmethod
     def extract_from_title(title: str) -> Optional[str]:
         """Extract location from title patterns"""
-        patterns = [
-            r'Remote\s*-\s*([^\-\|]+)',  # "Remote - USA"
-            r'([^\-\|]+)\s*-\s*Remote',  # "USA - Remote" 
-            r'\-\s*([^\-\|,]+(?:,\s*[^\-\|]+)*)\s*$',  # Location at end after dash
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, title)
+        for anchor, pattern in LOCATION_TITLE_PATTERNS:
+            if anchor not in title:
+                continue
+            match = pattern.search(title)
             if match:
                 potential_location = match.group(1).strip()
                 if not LocationExtractor._contains_non_location_terms(potential_location):
@@ -62,19 +93,25 @@ class LocationExtractor:
     @staticmethod
     def extract_from_snippet(snippet: str) -> Optional[str]:
         """Extract location from job snippet"""
-        match = re.search(r'Location[:\.]?\s*([^\n\r\.]+)', snippet)
+        if 'Location' not in snippet:
+            return None
+        match = LOCATION_SNIPPET_PATTERN.search(snippet)
         return match.group(1).strip() if match else None
     
     @staticmethod
     def detect_remote(title: str) -> bool:
         """Check if job is remote based on title"""
-        return bool(re.search(r'\bremote\b', title.lower()))
+        return bool(REMOTE_PATTERN.search(title))
+    
+    @staticmethod
+    def is_remote(*texts: Optional[str]) -> bool:
+        """Check if any of the given location texts mentions remote work"""
+        return any(text and REMOTE_PATTERN.search(text) for text in texts)
     
     @staticmethod
     def _contains_non_location_terms(text: str) -> bool:
         """Check if text contains terms that indicate it's not a location"""
-        text_lower = text.lower()
-        return any(term in text_lower for term in LocationExtractor.NON_LOCATION_TERMS)
+        return bool(NON_LOCATION_PATTERN.search(text))
 
 class SalaryExtractor:
     """Extract salary information from job data"""
@@ -82,20 +119,52 @@ class SalaryExtractor:
     @staticmethod
     def extract_from_snippet(snippet: str) -> Optional[str]:
         """Extract salary from job snippet"""
-        patterns = [
-            r'\$([\d,]+)\s*[–\-]\s*\$([\d,]+)',  # "$150K – $200K"
-            r'Compensation[:\.]?\s*\$([\d,]+)\s*[–\-]\s*\$([\d,]+)',  # "Compensation: $150K – $200K"
-            r'([\d,]+)K\s*[–\-]\s*([\d,]+)K',  # "150K – 200K"
-        ]
+        match = _search_guarded(SALARY_PATTERNS, snippet)
+        return f"${match.group(1)} - ${match.group(2)}" if match else None
         
-        for pattern in patterns:
-            match = re.search(pattern, snippet)
-            if match:
-                if len(match.groups()) == 2:
-                    return f"${match.group(1)} - ${match.group(2)}"
-                else:
-                    return f"${match.group(1)}"
-        return None
+    @staticmethod
+    def parse_range(text: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Parse a salary text into yearly (min, max) amounts
+        
+        Handles "$150,000 - $200,000", "150K – 200K", "150 - 200k", single amounts and
+        hourly rates (converted at 2080 hours a year). The first salary-sized amount
+        is taken, with the amount after it only when a range separator joins the two.
+        Numbers below 10,000 a year, such as years or headcounts, and retirement plans
+        like 401k are ignored.
+        
+        Returns:
+            Tuple[Optional[int], Optional[int]]: (None, None) when no salary is found
+        """
+        if not text or not any(char.isdigit() for char in text):
+            return None, None
+        
+        text = RETIREMENT_PLAN_PATTERN.sub(' ', text)
+        amounts = [match for match in SALARY_AMOUNT_PATTERN.finditer(text)
+                   if match.group(1).replace(',', '').replace('.', '', 1).isdigit()]
+        hourly = bool(HOURLY_PATTERN.search(text))
+        
+        for index, first in enumerate(amounts):
+            bounds = [first]
+            following = amounts[index + 1] if index + 1 < len(amounts) else None
+            if following and SALARY_RANGE_SEPARATOR_PATTERN.fullmatch(text, first.end(), following.start()):
+                bounds.append(following)
+            # "150 - 200k": the upper bound's suffix applies to a bare lower bound
+            shared_suffix = (bounds[-1].group(2) or '').lower()
+            
+            values = []
+            for bound in bounds:
+                value = float(bound.group(1).replace(',', ''))
+                suffix = (bound.group(2) or '').lower() or (shared_suffix if value < 1000 else '')
+                value *= {'k': 1_000, 'm': 1_000_000}.get(suffix, 1)
+                if hourly and value < 1000:
+                    value *= 2080
+                if value >= 10_000:
+                    values.append(int(value))
+            if values:
+                return min(values), max(values)
+        
+        return None, None
 
 class TimeExtractor:
     """Extract posting time information"""
@@ -103,8 +172,126 @@ class TimeExtractor:
     @staticmethod
     def extract_posted_time(snippet: str) -> str:
         """Extract posted time from snippet (e.g., '2 days ago', '10 hours ago')"""
-        match = re.search(r'(\d+\s+(?:day|hour|minute|second)s?\s+ago)', snippet)
+        if 'ago' not in snippet:
+            return 'Unknown'
+        match = POSTED_TIME_PATTERN.search(snippet)
         return match.group(1) if match else 'Unknown'
+    
+    @staticmethod
+    def parse_age(posted_time: Optional[str]) -> Optional[timedelta]:
+        """Convert a relative posted time such as '2 days ago' to a timedelta"""
+        if not posted_time or 'ago' not in posted_time:
+            return None
+        match = POSTED_AGE_PATTERN.search(posted_time)
+        if not match:
+            return None
+        return timedelta(**{f"{match.group(2)}s": int(match.group(1))})
+    
+    @staticmethod
+    def posted_at_utc(posted_time: Optional[str], fetched_at: datetime) -> Optional[datetime]:
+        """
+        Absolute UTC posting time of a relative or ISO 8601 posted time
+        
+        Args:
+            posted_time: '2 days ago', or an ISO date or date-time (naive ones are taken as UTC)
+            fetched_at: When the text was fetched, timezone-aware
+            
+        Returns:
+            datetime: Timezone-aware UTC time, or None if the posted time is unknown
+        """
+        age = TimeExtractor.parse_age(posted_time)
+        if age is not None:
+            return (fetched_at - age).astimezone(timezone.utc)
+        if not posted_time or not posted_time[:1].isdigit():
+            return None
+        try:
+            parsed = datetime.fromisoformat(posted_time.strip())
+        except ValueError:
+            return None
+        return parsed.astimezone(timezone.utc) if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+@dataclass
+class ExtractedFields:
+    """Fields extracted from a single search result"""
+    company: Optional[str]
+    location: Optional[str]
+    salary: Optional[str]
+    posted_time: str
+
+class ExtractionEngine:
+    """
+    Single-pass extraction of company, location, salary and posted time
+    
+    Runs every strategy of the individual extractors in their priority order, but
+    reads each search result field once and only scans title and snippet for the
+    patterns whose literal anchors they contain.
+    """
+    
+    def extract(self, title: str, snippet: str, link: str = '', og_title: str = '') -> ExtractedFields:
+        """
+        Extract all fields from the parts of a search result
+        
+        Args:
+            title: Result title
+            snippet: Result snippet
+            link: Result URL
+            og_title: og:title from the result metadata, if any
+            
+        Returns:
+            ExtractedFields: The extracted values
+        """
+        # Company: title "@" pattern, then greenhouse URL, then og:title metadata
+        company = None
+        if '@' in title:
+            match = COMPANY_TITLE_PATTERN.search(title)
+            if match:
+                company = match.group(1).strip()
+        if not company and 'greenhouse.io' in link:
+            match = GREENHOUSE_COMPANY_PATTERN.search(link)
+            if match:
+                company = match.group(1).replace('-', ' ').title()
+        if not company and og_title:
+            match = _search_guarded(COMPANY_METADATA_PATTERNS, og_title)
+            if match:
+                company = match.group(1).strip()
+        company = company or None
+        
+        # Location: title patterns, then snippet "Location:", then remote keyword
+        location = LocationExtractor.extract_from_title(title)
+        if not location and 'Location' in snippet:
+            match = LOCATION_SNIPPET_PATTERN.search(snippet)
+            if match:
+                location = match.group(1).strip()
+        if not location:
+            location = 'Remote' if REMOTE_PATTERN.search(title) else None
+        
+        # Salary and posted time both come from the snippet
+        match = _search_guarded(SALARY_PATTERNS, snippet)
+        salary = f"${match.group(1)} - ${match.group(2)}" if match else None
+        
+        posted_time = 'Unknown'
+        if 'ago' in snippet:
+            match = POSTED_TIME_PATTERN.search(snippet)
+            if match:
+                posted_time = match.group(1)
+        
+        return ExtractedFields(company=company, location=location, salary=salary, posted_time=posted_time)
+    
+    def extract_item(self, item: Dict[str, Any]) -> ExtractedFields:
+        """Extract all fields from a raw Google Custom Search result item"""
+        metatags = item.get('pagemap', {}).get('metatags', [{}])
+        og_title = metatags[0].get('og:title', '') if metatags else ''
+        return self.extract(
+            item.get('title', ''),
+            item.get('snippet', ''),
+            item.get('link', ''),
+            og_title
+        )
+    
+    def extract_batch(self, items: Iterable[Dict[str, Any]]) -> List[ExtractedFields]:
+        """Extract all fields from many raw search result items"""
+        extract_item = self.extract_item
+        return [extract_item(item) for item in items]
 
 class ContentAnalyzer:
     """Analyze webpage content for job-related information"""
@@ -0,0 +1,141 @@
+"""
+URL canonicalization utilities for job posting deduplication
+"""
+import re
+import urllib.parse
+from typing import Optional, Callable, List, Tuple
+
+# Query parameters that only track where a click came from, on any site
+TRACKING_PARAMS = {
+    'gh_src', 'lever-source', 'lever-origin', 'lever-via',
+    'referrer', 'refid', 'trk', 'trackingid',
+    'gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid', 'yclid',
+    'iis', 'iisn', 'ccuid', 'sourcetype',
+}
+TRACKING_PREFIXES = ('utm_', 'ga_', 'hsa_', '_hs')
+# Generic keys that are tracking only on these domains (and their subdomains);
+# elsewhere a key like 'ref' or 'source' may select the page
+HOST_TRACKING_PARAMS = {
+    'greenhouse.io': {'source', 'src'},
+    'lever.co': {'source', 'ref'},
+    'ashbyhq.com': {'source', 'src'},
+    'workable.com': {'source', 'ref'},
+    'linkedin.com': {'source', 'src', 'ref', 'campaign'},
+}
+
+class URLCanonicalizer:
+    """Normalize job URLs so that tracking and mirror variants map to one key"""
+    
+    GREENHOUSE_JOB = re.compile(r'^(?:job-)?boards(?P<region>\.eu)?\.greenhouse\.io$')
+    GREENHOUSE_PATH = re.compile(r'^/(?P<company>[^/]+)/jobs/(?P<job_id>\d+)')
+    LEVER_PATH = re.compile(r'^/(?P<company>[^/]+)/(?P<job_id>[0-9a-f\-]{36})(?:/apply)?/?$', re.IGNORECASE)
+    ASHBY_PATH = re.compile(r'^/(?P<company>[^/]+)/(?P<job_id>[0-9a-f\-]{36})(?:/application)?/?$', re.IGNORECASE)
+    WORKABLE_PATH = re.compile(r'^/(?P<company>[^/]+)/j/(?P<job_id>[0-9A-F]+)(?:/apply)?/?$', re.IGNORECASE)
+    LINKEDIN_PATH = re.compile(r'^/jobs/view/(?:[^/]*?-)?(?P<job_id>\d+)/?$')
+    
+    def __init__(self):
+        # Per-ATS rules: (host predicate, rewrite) pairs tried in order
+        self._ats_rules: List[Tuple[Callable[[str], bool], Callable[[urllib.parse.SplitResult], Optional[str]]]] = [
+            (lambda host: bool(self.GREENHOUSE_JOB.match(host)), self._canonicalize_greenhouse),
+            (lambda host: host == 'jobs.lever.co', self._canonicalize_lever),
+            (lambda host: host == 'jobs.ashbyhq.com', self._canonicalize_ashby),
+            (lambda host: host == 'apply.workable.com', self._canonicalize_workable),
+            (lambda host: host.endswith('linkedin.com'), self._canonicalize_linkedin),
+        ]
+    
+    def canonicalize(self, url: str) -> str:
+        """
+        Canonicalize a job URL
+        
+        Args:
+            url: Raw URL from a search result
+            
+        Returns:
+            str: Canonical URL (https, lowercase host, no tracking parameters,
+                 fragment or trailing slash, ATS specific job URL where known)
+        """
+        if not url:
+            return url
+        
+        try:
+            parts = urllib.parse.urlsplit(url.strip())
+        except ValueError:
+            return url
+        
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            return url
+        
+        host = parts.hostname.lower()
+        if parts.port and parts.port not in (80, 443):
+            host = f"{host}:{parts.port}"
+        parts = parts._replace(scheme='https', netloc=host, fragment='')
+        
+        for matches, rewrite in self._ats_rules:
+            if matches(parts.hostname):
+                canonical = rewrite(parts)
+                if canonical:
+                    return canonical
+                break
+        
+        path = re.sub(r'/{2,}', '/', parts.path).rstrip('/')
+        query = self._strip_tracking_params(parts.query, parts.hostname)
+        return urllib.parse.urlunsplit(parts._replace(path=path, query=query))
+    
+    @staticmethod
+    def _strip_tracking_params(query: str, host: str) -> str:
+        """Drop tracking parameters and sort the rest for a stable key"""
+        host_params = set()
+        for domain, names in HOST_TRACKING_PARAMS.items():
+            if host == domain or host.endswith(f".{domain}"):
+                host_params |= names
+        params = [
+            (key, value) for key, value in urllib.parse.parse_qsl(query, keep_blank_values=True)
+            if key.lower() not in TRACKING_PARAMS and key.lower() not in host_params
+            and not key.lower().startswith(TRACKING_PREFIXES)
+        ]
+        return urllib.parse.urlencode(sorted(params))
+    
+    def _canonicalize_greenhouse(self, parts: urllib.parse.SplitResult) -> Optional[str]:
+        """boards/job-boards(.eu).greenhouse.io job pages and embeds"""
+        region = self.GREENHOUSE_JOB.match(parts.hostname).group('region') or ''
+        match = self.GREENHOUSE_PATH.match(parts.path)
+        if match:
+            return f"https://boards{region}.greenhouse.io/{match.group('company').lower()}/jobs/{match.group('job_id')}"
+        
+        # Embedded application form: /embed/job_app?for=<company>&token=<job id>
+        if parts.path.rstrip('/') == '/embed/job_app':
+            params = dict(urllib.parse.parse_qsl(parts.query))
+            if params.get('for') and params.get('token', '').isdigit():
+                return f"https://boards{region}.greenhouse.io/{params['for'].lower()}/jobs/{params['token']}"
+        return None
+    
+    def _canonicalize_lever(self, parts: urllib.parse.SplitResult) -> Optional[str]:
+        """jobs.lever.co/<company>/<uuid>[/apply]"""
+        match = self.LEVER_PATH.match(parts.path)
+        if match:
+            return f"https://jobs.lever.co/{match.group('company').lower()}/{match.group('job_id').lower()}"
+        return None
+    
+    def _canonicalize_ashby(self, parts: urllib.parse.SplitResult) -> Optional[str]:
+        """jobs.ashbyhq.com/<company>/<uuid>[/application]"""
+        match = self.ASHBY_PATH.match(parts.path)
+        if match:
+            return f"https://jobs.ashbyhq.com/{match.group('company').lower()}/{match.group('job_id').lower()}"
+        return None
+    
+    def _canonicalize_workable(self, parts: urllib.parse.SplitResult) -> Optional[str]:
+        """apply.workable.com/<company>/j/<id>[/apply]"""
+        match = self.WORKABLE_PATH.match(parts.path)
+        if match:
+            return f"https://apply.workable.com/{match.group('company').lower()}/j/{match.group('job_id').upper()}"
+        return None
+    
+    def _canonicalize_linkedin(self, parts: urllib.parse.SplitResult) -> Optional[str]:
+        """linkedin.com/jobs/view/<slug>-<id> and ?currentJobId=<id>"""
+        match = self.LINKEDIN_PATH.match(parts.path)
+        if match:
+            return f"https://www.linkedin.com/jobs/view/{match.group('job_id')}"
+        job_id = dict(urllib.parse.parse_qsl(parts.query)).get('currentJobId', '')
+        if job_id.isdigit():
+            return f"https://www.linkedin.com/jobs/view/{job_id}"
+        return None
\ No newline at end of file